@@ -352,6 +352,114 @@ def num2month(input=None, reverse=False, rtn_dict=False):
         return d[input]
 
 
+def get_time_groups(dates=None, freq='season'):
+    """
+    Get group labels (seasons, months or years) for a time axis
+
+    Parameters
+    -------
+    dates (list or pd.DatetimeIndex): dates of the time axis
+    freq (str): groups to make ('season', 'month', 'year' or 'annual')
+
+    Returns
+    -------
+    (list, np.array) of group labels and the group index of each time step
+
+    Notes
+    -------
+     - Seasons are DJF, MAM, JJA and SON (i.e. Dec. is in the DJF of the same
+        year), months are abbreviated names (see num2month)
+    """
+    dates = pd.DatetimeIndex(dates)
+    if freq == 'season':
+        seasons = ['DJF', 'MAM', 'JJA', 'SON']
+        keys = (dates.month.values % 12) // 3
+        labels = [seasons[i] for i in sorted(set(keys))]
+    elif freq == 'month':
+        keys = dates.month.values
+        labels = [num2month(i) for i in sorted(set(keys))]
+    elif freq == 'year':
+        keys = dates.year.values
+        labels = sorted(set(keys))
+    elif freq == 'annual':
+        keys = np.zeros(len(dates), dtype=int)
+        labels = ['Annual']
+    else:
+        raise ValueError("freq must be 'season', 'month', 'year' or "
+                         "'annual' not {}".format(freq))
+    groups = np.searchsorted(np.array(sorted(set(keys))), keys)
+    return labels, groups
+
+
+def aggregate_by_time_groups(arr, dates=None, freq='season', how='mean',
+                             weights=None, add_annual=False, axis=-1):
+    """
+    Get seasonal/monthly/annual means (or sums) of an array in one pass
+
+    Parameters
+    -------
+    arr (np.array): array with a time dimension, e.g. (lon, lat, alt, time)
+    dates (list or pd.DatetimeIndex): dates of the time axis
+    freq (str): groups to make ('season', 'month', 'year' or 'annual')
+    how (str): 'mean' or 'sum' of values in each group
+    weights (np.array): weights for each time step (e.g. days in month), or
+        an array of weights that can be broadcast to arr (e.g. air mass)
+    add_annual (bool): add a group of all time steps (first, as 'Annual')
+    axis (int): index of the time dimension
+
+    Returns
+    -------
+    (np.array, list) of values with the time axis replaced by the groups, and
+    the group labels
+
+    Notes
+    -------
+     - The groups are given as a (time, group) matrix and applied over the time
+        axis with a single matrix multiply, so no copies are made of each group
+        (and groups need not be contiguous, e.g. DJF in a Jan-Dec run)
+     - Masked values are excluded (masked arrays are returned for masked input)
+    """
+    labels, groups = get_time_groups(dates, freq=freq)
+    # Matrix of the weight of each time step (row) in each group (column)
+    matrix = np.zeros((len(groups), len(labels)))
+    matrix[np.arange(len(groups)), groups] = 1.
+    if add_annual:
+        matrix = np.concatenate((np.ones((len(groups), 1)), matrix), axis=1)
+        labels = ['Annual'] + list(labels)
+    if (not isinstance(weights, type(None))) and (np.ndim(weights) == 1):
+        matrix *= np.asarray(weights)[:, None]
+        weights = None
+    # Move time to the last axis (a view)
+    mask = np.ma.getmask(arr)
+    data = np.moveaxis(np.ma.getdata(arr), axis, -1)
+    norm = None
+    if mask is not np.ma.nomask:
+        valid = np.moveaxis(~mask, axis, -1)
+        data = np.where(valid, data, 0)
+        norm = valid
+    if not isinstance(weights, type(None)):
+        weights = np.moveaxis(np.asarray(weights), axis, -1)
+        data = data * weights
+        if isinstance(norm, type(None)):
+            norm = np.broadcast_to(weights, data.shape)
+        else:
+            norm = norm * weights
+    # Sum (weighted) values in each group
+    out = np.matmul(data, matrix)
+    if how == 'mean':
+        if isinstance(norm, type(None)):
+            out /= matrix.sum(axis=0)
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out /= np.matmul(norm, matrix)
+    elif how != 'sum':
+        raise ValueError("how must be 'mean' or 'sum' not {}".format(how))
+    out = np.moveaxis(out, -1, axis)
+    if mask is not np.ma.nomask:
+        out = np.ma.masked_invalid(out)
+    return out, labels
+
+
 def DF_YYYYMMDD_HHMM_2_dt(df, date_header='YYYYMMDD', time_header='HHMM',
                           rmvars=None, epoch=False):
     """
@@ -32,6 +32,8 @@ except ImportError:
 import pandas as pd
 import xarray as xr
 import re
+import collections
+import threading
 from netCDF4 import Dataset
 if sys.version_info.major < 3:
     try:
@@ -289,6 +291,153 @@ def get_air_mass_np(wd=None, times=None, trop_limit=True, AirMassVar='BXHGHT_S__
     return arr
 
 
+# Records found in geos.log files (see scan_geos_log). Lines are matched
+# in a single pass over each (memory mapped) file.
+geos_log_regex = re.compile(
+    br'(?P<OH>Mean OH =    )|'
+    br'(?P<CH4>^CH4.{13}:)|'
+    br'(?P<SIM>=> SIMULATION )|'
+    br'(?P<Mstart>Start time of run)|'
+    br'(?P<Mend>End time of run)|'
+    br'(?P<STE>Strat-Trop Exchange)', re.MULTILINE)
+
+# Records parsed from geos.log files, by filename (see get_geos_log_records)
+geos_log_cache = {}
+
+
+def get_geos_log_files(wd=None, file_type='*geos*log*'):
+    """
+    Get the geos.log files in a directory (or its logs sub-directory)
+
+    Parameters
+    -------
+    wd (str): directory containing log file files
+    file_type (str): glob pattern for the names of the log files
+
+    Returns
+    -------
+    (list)
+    """
+    # Look in the directory, then in wd/logs/ for other names
+    for folder, file_type_ in ((wd, file_type), (wd+'/logs/', file_type),
+                               (wd+'/logs/', 'log.*'),
+                               (wd+'/logs/', '*geos.log.*')):
+        files = sorted(glob.glob(folder+'/'+file_type_))
+        if len(files) > 0:
+            return files
+        err_str = 'WARNING! - no files found (type={} in {})'
+        logging.info(err_str.format(file_type_, folder))
+    return files
+
+
+def scan_geos_log(filename):
+    """
+    Extract all known records (mean OH, CH4, run timing, STE) from a geos.log
+
+    Parameters
+    -------
+    filename (str): name of log file (including directory)
+
+    Returns
+    -------
+    (dict) of records ('OH', 'CH4', 'timing' and 'STE' lines)
+
+    Notes
+    -----
+     - The file is memory mapped and searched once with a single regular
+        expression (geos_log_regex), so lines without records are not decoded
+    """
+    import mmap
+    records = {'OH': [], 'CH4': [], 'timing': {}, 'STE': []}
+    timing = records['timing']
+    if os.path.getsize(filename) == 0:
+        return records
+    with open(filename, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        STE_end = -1
+        for match in geos_log_regex.finditer(mm):
+            # Get the whole line of the match (with its line ending)
+            start = mm.rfind(b'\n', 0, match.start()) + 1
+            end = mm.find(b'\n', match.end()) + 1
+            if end == 0:
+                end = len(mm)
+            line = mm[start:end].decode('utf-8', 'replace')
+            line = line.replace('\r\n', '\n')
+            kind = match.lastgroup
+            if kind == 'OH':
+                records['OH'] += [float(line.split()[3])]
+            elif kind == 'CH4':
+                records['CH4'] += [float(line.split()[-2])/1E9]
+            elif kind == 'SIM':
+                date = line.split('TIME:')[1][:-5].strip()
+                date = time2datetime([time.strptime(date, '%Y/%m/%d %H:%M')])
+                if 'START' in line:
+                    timing['Real Start'] = date[0]
+                if 'END' in line:
+                    timing['Real End'] = date[0]
+            elif kind in ('Mstart', 'Mend'):
+                date = time.strptime(line[30:].strip(), '%Y%m%d %H%M%S')
+                key = {'Mstart': 'Model Start', 'Mend': 'Model End'}[kind]
+                timing[key] = time2datetime([date])[0]
+            elif (kind == 'STE') and (start > STE_end):
+                # Read lines until the end of the section
+                STE_end = mm.find(b'================', start)
+                if STE_end < 0:
+                    STE_end = len(mm)
+                STE_end = mm.rfind(b'\n', 0, STE_end) + 1
+                section = mm[start:STE_end].decode('utf-8', 'replace')
+                records['STE'] += section.replace('\r\n', '\n').splitlines(
+                    True)
+    finally:
+        mm.close()
+    return records
+
+
+def get_geos_log_records(wd=None, files=None, file_type='*geos*log*',
+                         n_workers=4):
+    """
+    Get the records (mean OH, CH4, run timing, STE) from geos.log files
+
+    Parameters
+    -------
+    wd (str): directory containing log file files
+    files (list): log files to use (instead of those found in wd)
+    file_type (str): glob pattern for the names of the log files
+    n_workers (int): number of processes to scan files with
+
+    Returns
+    -------
+    (collections.OrderedDict) of records (see scan_geos_log) by filename
+
+    Notes
+    -----
+     - Records are cached by filename, and only re-read if the modification
+        time or size of the file changes
+    """
+    if isinstance(files, type(None)):
+        files = get_geos_log_files(wd=wd, file_type=file_type)
+    keys = {}
+    for file in files:
+        stat = os.stat(file)
+        keys[file] = (os.path.abspath(file), stat.st_mtime_ns, stat.st_size)
+    to_scan = [i for i in files if keys[i] not in geos_log_cache]
+    if (n_workers > 1) and (len(to_scan) > 1):
+        import multiprocessing
+        pool = multiprocessing.Pool(min(n_workers, len(to_scan)))
+        try:
+            scanned = pool.map(scan_geos_log, to_scan)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        scanned = [scan_geos_log(i) for i in to_scan]
+    for file, records in zip(to_scan, scanned):
+        geos_log_cache[keys[file]] = records
+    return collections.OrderedDict((i, geos_log_cache[keys[i]])
+                                   for i in files)
+
+
 def get_OH_mean(wd, debug=False, file_type='*geos*log*'):
     """
     Get mean OH concentration (1e5 molec/cm3) from geos.log files in directory
@@ -304,41 +453,12 @@ def get_OH_mean(wd, debug=False, file_type='*geos*log*'):
     """
     logging.debug('get_OH_mean called for wd={}'.format(wd))
     # --- Find all geos log files in directory...
-    files = glob.glob(wd+'/'+file_type)
-    if len(files) < 1:
-        err_str = 'WARNING! - no files found (assuming type={})'
-        logging.info(err_str.format(file_type))
-        print(err_str.format(file_type))
-        files = glob.glob(wd+'/logs/'+file_type)
-        if len(files) < 1:
-            err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-            logging.info(err_str.format(file_type))
-            # try
-            file_type = 'log.*'
-            files = glob.glob(wd+'/logs/'+file_type)
-            print('Loooking for {} files instead'.format(file_type))
-            if len(files) < 1:
-                err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-                logging.info(err_str.format(file_type))
-                # try
-                file_type = '*geos.log.*'
-                files = glob.glob(wd+'/logs/'+file_type)
-                print('Loooking for {} files instead'.format(file_type))
-                if len(files) < 1:
-                    err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-                    logging.info(err_str.format(file_type))
-
+    files = get_geos_log_files(wd=wd, file_type=file_type)
     # --- If there are any, then
-    if len(files) > 1:
-        # Loop and extract OH means, take an average if n>0
-        z = []
-        for file in files:
-            with open(file) as f:
-                if debug:
-                    print((file, f, z))
-                for line in f:
-                    if "Mean OH =    " in line:
-                        z += [float(line.split()[3])]
+    if len(files) > 0:
+        # Extract OH means, take an average if n>0
+        records = get_geos_log_records(files=files)
+        z = [i for file in files for i in records[file]['OH']]
         logging.info('mean OH calculated from {} files'.format(len(z)))
         return np.mean(z)
     else:
@@ -366,18 +486,10 @@ def get_CH4_mean(wd, rtn_global_mean=True, rtn_avg_3D_concs=False,
     if debug:
         print(wd)
     # find all geos log files...
-    files = glob.glob(wd+'/*geos*log*')
-
-    # Loop and extract CH4 means, take an average if n>0
-    regex = re.compile('CH4{}:'.format('.'*13))
-    z = []
-    for file in files:
-        with open(file) as f:
-            if debug:
-                print((file, f, z))
-            for line in f:
-                if re.match(regex, line):
-                    z += [float(line.split()[-2])/1E9]
+    files = get_geos_log_files(wd=wd)
+    # Extract CH4 means, take an average if n>0
+    records = get_geos_log_records(files=files)
+    z = [i for file in files for i in records[file]['CH4']]
     if debug:
         print((z, np.mean(z)))
     if rtn_global_mean:
@@ -552,9 +664,154 @@ def get_HEMCO_output(wd=None, files=None, filename=None, vars=None,
     return arr
 
 
+def get_GC_output_hyperslab(ncfile=None, lon=None, lat=None, time=None,
+                            time_units=None, start=None, end=None,
+                            levels=None, surface_only=False, lat_range=None,
+                            lon_range=None, trop_limit=False):
+    """
+    Get the indices of a hyperslab (time window, levels, lat/lon box) of output
+
+    Parameters
+    ----------
+    ncfile (netCDF4.Dataset or xr.Dataset): file to get lon, lat and time from
+    lon, lat (np.array): longitude and latitude (centres) of the grid
+    time (np.array): times of the output (in time_units)
+    time_units (str): units of time (e.g. 'hours since 1985-01-01 00:00:00')
+    start, end (datetime.datetime): only select times from start to (before) end
+    levels (tuple): (first, last+1) model level indices to select, e.g. (0, 38)
+    surface_only (bool): only select the surface (first) model level
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to select
+    trop_limit(bool): limit to "chemical troposphere" (level 38 of model)
+
+    Returns
+    -------
+    (dict) of slices (or index arrays) for the 'time', 'lon', 'lat' and 'lev'
+    dimensions
+
+    Notes
+    -----
+     - Contiguous selections are given as slices, so they can be read from a
+     NetCDF file as a single hyperslab.
+     - For a lon_range that crosses the date line, give min > max
+     (e.g. (170, -170))
+    """
+    def indices2slice(ind):
+        """ Return a slice if indices are contiguous """
+        if (len(ind) > 0) and np.all(np.diff(ind) == 1):
+            return slice(int(ind[0]), int(ind[-1])+1)
+        return ind
+    # Get the coordinates (only those needed) from the NetCDF file
+    if not isinstance(ncfile, type(None)):
+        def get_coord(names):
+            name = [i for i in names if i in ncfile.variables][0]
+            return ncfile.variables[name]
+        if any([not isinstance(i, type(None)) for i in (start, end)]):
+            time = get_coord(['time'])
+            if hasattr(time, 'attrs'):
+                time_units = time.attrs['units']
+            else:
+                time_units = time.units
+            time = np.asarray(time[:])
+        if not isinstance(lat_range, type(None)):
+            lat = np.asarray(get_coord(['latitude', 'lat'])[:])
+        if not isinstance(lon_range, type(None)):
+            lon = np.asarray(get_coord(['longitude', 'lon'])[:])
+    hyperslab = {}
+    # Time window (start is inclusive, end is exclusive)
+    if not isinstance(time, type(None)) and \
+            any([not isinstance(i, type(None)) for i in (start, end)]):
+        from netCDF4 import date2num
+        time = np.asarray(time)
+        bool_ = np.ones(time.shape, dtype=bool)
+        if not isinstance(start, type(None)):
+            bool_ &= time >= date2num(start, time_units)
+        if not isinstance(end, type(None)):
+            bool_ &= time < date2num(end, time_units)
+        hyperslab['time'] = indices2slice(np.nonzero(bool_)[0])
+    # Model levels
+    if surface_only:
+        levels = (0, 1)
+    if not isinstance(levels, type(None)) or trop_limit:
+        if isinstance(levels, slice):
+            levels = (levels.start, levels.stop)
+        first, last = (0, None) if isinstance(levels, type(None)) else levels
+        if trop_limit:
+            last = 38 if isinstance(last, type(None)) else min(last, 38)
+        hyperslab['lev'] = slice(first, last)
+    # Lat/lon box
+    if not isinstance(lat_range, type(None)):
+        lat = np.asarray(lat)
+        bool_ = (lat >= min(lat_range)) & (lat <= max(lat_range))
+        hyperslab['lat'] = indices2slice(np.nonzero(bool_)[0])
+    if not isinstance(lon_range, type(None)):
+        lon = np.asarray(lon)
+        lon_min, lon_max = lon_range
+        if lon_min <= lon_max:
+            bool_ = (lon >= lon_min) & (lon <= lon_max)
+        else:
+            bool_ = (lon >= lon_min) | (lon <= lon_max)
+        hyperslab['lon'] = indices2slice(np.nonzero(bool_)[0])
+    return hyperslab
+
+
+def get_generic_dim_name(dim):
+    """
+    Get generic name ('time', 'lon', 'lat' or 'lev') for a NetCDF dimension
+
+    Parameters
+    ----------
+    dim (str): name of dimension (e.g. 'longitude' or 'model_level_number')
+
+    Returns
+    -------
+    (str) or None if not a time, lon, lat or level dimension
+    """
+    if dim.startswith('time'):
+        return 'time'
+    elif 'lon' in dim:
+        return 'lon'
+    elif 'lat' in dim:
+        return 'lat'
+    elif ('lev' in dim) or ('alt' in dim):
+        return 'lev'
+    return None
+
+
+def select_hyperslab(arr, dims, hyperslab):
+    """
+    Select a hyperslab from an array, NetCDF variable or dask array
+
+    Parameters
+    ----------
+    arr (array like): netCDF4 variable, np.array or dask array
+    dims (list): names of the dimensions of arr (e.g. ('time', 'longitude',...))
+    hyperslab (dict): slices/indices to select (from get_GC_output_hyperslab)
+
+    Returns
+    -------
+    (np.array or dask array)
+    """
+    index = [hyperslab.get(get_generic_dim_name(i), slice(None))
+             for i in dims]
+    # NetCDF variables are indexed orthogonally, so read in a single call
+    if hasattr(arr, 'dimensions'):
+        return arr[tuple(index)]
+    # Otherwise, select slices first then any index arrays one axis at a time
+    arr = arr[tuple([i if isinstance(i, slice) else slice(None)
+                     for i in index])]
+    for n, ind in enumerate(index):
+        if not isinstance(ind, slice):
+            arr = arr[(slice(None),)*n + (ind,)]
+    return arr
+
+
+@cache_array_output
 def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
                   r_res=False, restore_zero_scaling=True, r_list=False, trop_limit=False,
-                  dtype=np.float32, use_NetCDF=True, verbose=False, debug=False):
+                  dtype=np.float32, use_NetCDF=True, use_bpch_index=False,
+                  lazy=False, start=None, end=None, levels=None,
+                  surface_only=False, lat_range=None, lon_range=None,
+                  contiguous=False, verbose=False, debug=False):
     """
     Return data from a directory containing NetCDF/ctm.bpch files via PyGChem (>= 0.3.0 )
 
@@ -571,6 +828,13 @@ def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
     trop_limit(bool): limit to "chemical troposphere" (level 38 of model)
     dtype (type): type of variable to be returned
     use_NetCDF(bool): set==True to use NetCDF rather than iris cube of output
+    use_bpch_index(bool): read datablocks straight from bpch files via an index
+    lazy (bool): return (lazy) dask arrays, only computed when requested
+    start, end (datetime.datetime): only return times from start to (before) end
+    levels (tuple): (first, last+1) model level indices to return, e.g. (0, 38)
+    surface_only (bool): only return the surface (first) model level
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to return
+    contiguous (bool): return a (C) contiguous copy rather than a view
     verbose (bool): legacy debug option, replaced by python logging
     debug (bool): legacy debug option, replaced by python logging
 
@@ -593,6 +857,21 @@ def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
       print full dataset extracted to screen to see active diagnostics.
      - Species and category variables are maintained ( and translated ) to allow for
       backwards compatibility with functions written for pygchem version 0.2.0
+     - With use_bpch_index=True, no NetCDF is made. Only the datablocks of the
+      requested variables are read (see bpch2netCDF.get_bpch_index)
+     - With lazy=True, the scaling, trop_limit slicing, axis reordering and
+      concatenation are added to a dask graph rather than applied to copies in
+      memory. Call .compute() (or np.array) on the output to get values.
+     - The time window (start, end), levels/surface_only and lat/lon box
+      (lat_range, lon_range) are applied as the NetCDF is read, so only the
+      selected data is read from disk. trop_limit is applied in the same way.
+      The level dimension is kept for surface_only (i.e. its length is 1).
+     - r_res requires the full (i.e. not a lat/lon box) horizontal grid.
+     - Arrays are ordered (lon, lat, lev, time) using the dimension names of
+      the variables, and are returned as views of the data as read (i.e. not
+      copies), unless contiguous=True.
+     - Output arrays can be cached on disk for repeated calls, see
+      core.set_array_cache
     """
 # bjn
 # This function is not completly clear to me, and could do with a re-write
@@ -629,25 +908,95 @@ def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
         if isinstance(vars, type(None)):
             vars = ['IJ_AVG_S__O3']
 
+    # Selections to apply as data is read (a hyperslab of the variables)
+    hyperslab_kwargs = {
+        'start': start, 'end': end, 'levels': levels,
+        'surface_only': surface_only, 'lat_range': lat_range,
+        'lon_range': lon_range, 'trop_limit': trop_limit,
+    }
+
+    # Read the requested datablocks directly from the bpch files
+    if use_NetCDF and use_bpch_index:
+        from .bpch2netCDF import get_bpch_index, read_bpch_var_from_index
+        from .bpch2netCDF import get_bpch_lon_lat
+        index = get_bpch_index(folder=wd)
+        arr, arr_dims = [], []
+        for var in vars:
+            logging.debug("reading bpch datablocks for {var}".format(var=var))
+            var_data, units = read_bpch_var_from_index(folder=wd, var=var,
+                                                       index=index,
+                                                       start=start, end=end,
+                                                       rtn_units=True)
+            # Select levels and lat/lon box (time is selected in the read)
+            row = index.loc[index['var'] == var, :].iloc[0]
+            header = {
+                'lonres': row['lonres'], 'latres': row['latres'],
+                'halfpolar': row['halfpolar'],
+                'shape': (row['ni'], row['nj'], row['nl']),
+                'origin': (row['i0'], row['j0'], row['l0']),
+            }
+            lon, lat = get_bpch_lon_lat(header)[:2]
+            hyperslab = get_GC_output_hyperslab(lon=lon, lat=lat,
+                                                **dict(hyperslab_kwargs,
+                                                       start=None, end=None))
+            dims = ('time', 'lon', 'lat', 'lev')[:var_data.ndim]
+            var_data = select_hyperslab(var_data, dims, hyperslab)
+            if restore_zero_scaling and (get_unit_scaling(units) != 1):
+                var_data = np.divide(var_data, get_unit_scaling(units))
+            arr.append(var_data)
+            arr_dims.append(dims)
+
+    # Open NetCDF lazily (via xarray/dask). Convert ctm.bpch if not done.
+    elif use_NetCDF and lazy:
+        import os.path
+        fname = os.path.join(wd, 'ctm.nc')
+        with NetCDF_read_lock:
+            if not os.path.isfile(fname):
+                from .bpch2netCDF import convert_to_netCDF
+                convert_to_netCDF(wd)
+        logging.debug("Opening netCDF file {} lazily".format(fname))
+        ds = xr.open_dataset(fname, chunks={}, decode_times=False)
+        hyperslab = get_GC_output_hyperslab(ncfile=ds, **hyperslab_kwargs)
+        arr, arr_dims = [], []
+        for var in vars:
+            if var not in ds.data_vars:
+                logging.warning("Variable {var} not found in netCDF, "
+                                "will attempt renaming".format(var=var))
+                var = get_ctm_nc_var(var)
+            var_data = select_hyperslab(ds[var].data, ds[var].dims, hyperslab)
+            if restore_zero_scaling:
+                try:
+                    units = ds[var].attrs['ctm_units']
+                    var_data = var_data / get_unit_scaling(units)
+                except KeyError:
+                    logging.warning(
+                        "Scaling not adjusted to previous approach")
+            arr.append(var_data)
+            arr_dims.append(ds[var].dims)
+
     # Work with NetCDF. Convert ctm.bpch to NetCDF if not already done.
-    if use_NetCDF:
+    elif use_NetCDF:
 
         # Check for compiled NetCDF file
         # If not found, create NetCDF file from ctm.bpch files
         import os.path
         fname = os.path.join(wd, 'ctm.nc')
-        if not os.path.isfile(fname):
-            from .bpch2netCDF import convert_to_netCDF
-            convert_to_netCDF(wd)
-
-        logging.debug("Opening netCDF file {fname}".format(fname=fname))
-        # "open" NetCDF + extract requested variables as numpy arr.
-        netCDF_data = Dataset(fname, 'r')
-        arr = []
+        with NetCDF_read_lock:
+            if not os.path.isfile(fname):
+                from .bpch2netCDF import convert_to_netCDF
+                convert_to_netCDF(wd)
+
+            logging.debug("Opening netCDF file {fname}".format(fname=fname))
+            # "open" NetCDF + extract requested variables as numpy arr.
+            netCDF_data = get_NetCDF_handle(fname)
+            hyperslab = get_GC_output_hyperslab(ncfile=netCDF_data,
+                                                **hyperslab_kwargs)
+        arr, arr_dims = [], []
         for var in vars:
             try:
                 logging.debug("opening variable {var}".format(var=var))
                 var_data = netCDF_data.variables[var]
+                name = var
             except:
                 logging.warning("Variable {var} not found in netCDF"
                                 .format(var=var))
@@ -655,6 +1004,7 @@ def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
                 try:
                     abrv_var = get_ctm_nc_var(var)
                     var_data = netCDF_data.variables[abrv_var]
+                    name = abrv_var
                 except KeyError:
                     logging.error("Renamed variable {var} not found in netCDF"
                                   .format(var=var))
@@ -701,15 +1051,27 @@ def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
 
 ############################################################################
 #    # This is not in a working state currently - needs work
+            # Only read the selected hyperslab of the variable
+            with NetCDF_read_lock:
+                # (get the handle again, as another thread may have closed it)
+                var_data = get_NetCDF_handle(fname).variables[name]
+                try:
+                    units = var_data.ctm_units
+                except AttributeError:
+                    units = None
+                dims = var_data.dimensions
+                var_data = select_hyperslab(var_data, dims, hyperslab)
+
             if restore_zero_scaling:
                 try:
-                    var_data = np.divide(
-                        var_data, get_unit_scaling(var_data.ctm_units))
+                    if get_unit_scaling(units) != 1:
+                        var_data = np.divide(var_data, get_unit_scaling(units))
                 except:
                     logging.warning(
                         "Scaling not adjusted to previous approach")
 
-            arr.append(var_data[:])
+            arr.append(var_data)
+            arr_dims.append(dims)
 
 ####--- The above re-write does not work so still using old version ---###
 
@@ -779,70 +1141,38 @@ def get_GC_output(wd, vars=None, species=None, category=None, r_cubes=False,
     # Process extracted data to gamap GC format and return as numpy
     if not r_cubes:
 
-        # Limit to GEOS-Chem "chemical troposphere'
-        if trop_limit:
-            arr = [i[..., :38] for i in arr]
-
-        # Convert to GC standard 4D fmt. - lon, lat, alt, time
-        if len((arr[0].shape)) == 4:
-            logging.info('prior to roll axis: {}'.format(
-                *[i.shape for i in arr]))
-            arr = [np.rollaxis(i, 0, 4) for i in arr]
-            logging.info('post roll axis: {}'.format(*[i.shape for i in arr]))
-
-        # Convert to GC standard 3D fmt. - lon, lat, time
-        # two reasons why 3D (  missing time dim  or  missing alt dim )
-        # <= update, there must be a better gotcha than this...
-        if ((len((arr[0].shape)) == 3) \
-            # -- '4x5'
-            and ((72, 46, 47) != arr[0].shape) \
-            and ((72, 46, 38) != arr[0].shape) \
-            # also consider for vertical levels=72 (full_vertical_grid=True)
-            and ((72, 46, 72) != arr[0].shape) \
-            # and the prod/loss reduced grid
-            and ((72, 46, 59) != arr[0].shape) \
-            # -- '2x2.5'
-            and ((144, 91, 47) != arr[0].shape) \
-            and ((144, 91, 38) != arr[0].shape) \
-            # -- '0.25x0.3125':
-            and ((177, 115, 47) != arr[0].shape) \
-            and ((177, 115, 38) != arr[0].shape) \
-            # -- '0.25x0.3125_CH':
-            and ((225, 161, 47) != arr[0].shape) \
-            and ((225, 161, 38) != arr[0].shape) \
-            # -- '0.25x0.3125_WA':
-            and ((145, 89, 47) != arr[0].shape) \
-            and ((145, 89, 38) != arr[0].shape) \
-            # -- '0.25x0.3125_WA':
-            and ((145, 133, 47) != arr[0].shape) \
-            and ((145, 133, 38) != arr[0].shape) \
-            # -- '0.5x0.625' - SA grid
-            and ((121, 81, 47) != arr[0].shape) \
-                and ((121, 81, 38) != arr[0].shape)):
-
-            logging.info('prior roll axis: {}'.format(*[str(i.shape)
-                                                        for i in arr]))
-            arr = [np.rollaxis(i, 0, 3) for i in arr]
-            logging.info('post roll axis: {}'.format(*[str(i.shape)
-                                                       for i in arr]))
-
-        # --- loop variables post processing and force inclusions of time dim if applicable
+        # NOTE: trop_limit (limit to GEOS-Chem "chemical troposphere') is
+        # applied when the data is read (see get_GC_output_hyperslab)
+
+        # Convert to GC standard fmt. - lon, lat, alt, time - using the names
+        # of the dimensions. (np.transpose returns a view, not a copy)
+        order = ['lon', 'lat', 'lev', 'time']
         need_time = ['IJ_AVG', 'GMAO', 'BXHGHT', 'TIME_TPS_', 'PORL_L_S_']
         for n, var in enumerate(vars):
+            dims = [get_generic_dim_name(i) for i in arr_dims[n]]
+            axes = sorted(range(len(dims)), key=lambda x: (
+                order.index(dims[x]) if dims[x] in order else len(order), x))
+            logging.debug('reordering axes of {} from {}'.format(
+                var, arr_dims[n]))
+            arr[n] = np.transpose(arr[n], axes)
 
             # Add altitude dimension to 2D (lon, lat)
-            # a bug might occur for emission etc ( where lon, lat, time are dims )
             if len((arr[n].shape)) == 2:
                 arr[n] = arr[n][..., None]
 
             # ensure output for categories in need_time list have 4 dims
-            if any([(i in var) for i in need_time]) and (len(arr[n].shape) == 3):
+            if any([(i in var) for i in need_time]) and \
+                    ('time' not in dims) and (len(arr[n].shape) == 3):
                 arr[n] = np.expand_dims(arr[n], -1)
 
             # Convert type if dtype not float32
             # ( needed for some arrays e.g. air mass )
             if dtype != np.float32:
-                arr[n] = arr[n].astype(dtype)
+                arr[n] = arr[n].astype(dtype, copy=False)
+
+            if contiguous and isinstance(arr[n], np.ndarray) and \
+                    (not arr[n].flags['C_CONTIGUOUS']):
+                arr[n] = arr[n].copy(order='C')
 
         # --- concatenate
         # For multiple vars, concatenate to var, lon, lat, lat, time
@@ -902,7 +1232,8 @@ def get_gc_res(wd, filename='ctm.nc'):
         convert_to_netCDF(wd, filename=filename)
 
     # "open" NetCDF + extract time
-    with Dataset(fname, 'r') as rootgrp:
+    with NetCDF_read_lock:
+        rootgrp = get_NetCDF_handle(fname)
         lon = rootgrp['longitude']
         lat = rootgrp['latitude']
 #            lvls = rootgrp['model_level_number']
@@ -1237,26 +1568,9 @@ def get_STRAT_TROP_exchange_from_geos_log(fn=None, ver='3.0',
     """
     logging.info('get_STRAT_TROP_exchange_from_geos_log called for: '.format(
         fn))
-    # --- Open the file
-    file_ = open(fn, 'r')
-    # Read in just the TROP-STRAT exchange section
-    start_line = 'Strat-Trop Exchange'
-    end_line = '================'
-    # --- Loop and extract lines of file with data on exchange
-    readline = False
-    lines = []
-    for row in file_:
-        # once at prod/loss section, start added to list
-        if start_line in row:
-            readline = True
-        # if not at end of prod/loss section, add to list
-        if end_line in row:
-            readline = False
-        if readline:
-            try:
-                lines.append(row)
-            except:
-                lines = [row]
+    # --- Get the lines of the file with data on exchange
+    # (between "Strat-Trop Exchange" and "================", see scan_geos_log)
+    lines = list(get_geos_log_records(files=[fn])[fn]['STE'])
     # --- Process extracted lines
     # remove starting lines
     headers = [i.strip() for i in lines[5].split('    ')]
@@ -1333,7 +1647,7 @@ def get_gc_years(wd=None, filename='ctm.nc', set_=True,
     Return list of years in GEOS-Chem output (ctm.bpch or NetCDF)
     """
     dates = get_gc_datetime(wd=wd, filename=filename)
-    return [i.year for i in dates]
+    return list(dates.year)
 
 
 def get_gc_months(wd=None, filename='ctm.nc',
@@ -1343,30 +1657,39 @@ def get_gc_months(wd=None, filename='ctm.nc',
     """
     dates = get_gc_datetime(wd=wd, filename=filename,
                             debug=debug, verbose=verbose)
-    return [i.month for i in dates]
+    return list(dates.month)
+
+
+# Decoded time axes of NetCDF files, by filename and modification time
+# (see get_gc_datetime)
+gc_datetime_cache = {}
 
 
 def get_gc_datetime(wd=None, spec='O3', cat='IJ-AVG-$',
                     filename='ctm.nc', date_str='hours since %Y-%m-%d %H:%M:%S',
-                    verbose=False, debug=False):
+                    rtn_list=False, verbose=False, debug=False):
     """
-    Return list of months in GEOS-Chem output (ctm.bpch or NetCDF)
+    Return datetimes of GEOS-Chem output (ctm.bpch or NetCDF)
 
     Parameters
     ----------
     cat (str): GAMAP species category
     debug (bool): legacy debug option, replaced by python logging
     filename (Str): name of NetCDF file (e.g. ctm.nc or ts_ctm.nc)
+    date_str (str): format of time units, if not understood by pandas
+    rtn_list (bool): return a list of datetime.datetime objects
     spec (str): species/tracer/variable name
     ver (str): The GEOS-Chem halogen version that is being used
     wd (str): Specify the wd to get the results from a run.
 
     Returns
     -------
-    (list)
+    (pd.DatetimeIndex) or (list) if rtn_list==True
 
     Notes
     -----
+     - The time axis is decoded in a single (vectorised) operation and cached
+     for each file (until the file is modified).
     """
     logging.info('get_gc_datetime called @: {} with file: {}'.format(wd,
                                                                      filename))
@@ -1376,52 +1699,44 @@ def get_gc_datetime(wd=None, spec='O3', cat='IJ-AVG-$',
     if not os.path.isfile(fname):
         from .bpch2netCDF import convert_to_netCDF
         convert_to_netCDF(wd)
-    # "open" NetCDF + extract time
-    with Dataset(fname, 'r') as rootgrp:
-        dates = rootgrp['time']
-        unit_str = str(dates.units)
+    key = (os.path.abspath(fname), os.path.getmtime(fname))
+    if key not in gc_datetime_cache:
+        # "open" NetCDF + extract time
+        with NetCDF_read_lock:
+            rootgrp = get_NetCDF_handle(fname)
+            unit_str = str(rootgrp['time'].units)
+            dates = np.atleast_1d(np.array(rootgrp['time'][:],
+                                           dtype=np.float64))
         if verbose:
-            print((dates, dates.units, unit_str))
-        # Get units from cube, default is 'hours since 1985-01-01 00:00:00'
-        if 'hours since' in unit_str:
-            if isinstance(date_str, type(None)):
-                date_str = 'hours since %Y-%m-%d %H:%M:%S'
-            time_unit = 'hours'
-        elif 'minutes since' in unit_str:
-            if isinstance(date_str, type(None)):
-                date_str = 'minutes since %Y-%m-%d %H:%M:%S'
-            time_unit = 'minutes'
-        elif 'days since' in unit_str:
-            if isinstance(date_str, type(None)):
-                date_str = 'days since %Y-%m-%d %H:%M:%S'
-            time_unit = 'days'
-        else:
+            print((dates, unit_str))
+        # Get units from file, default is 'hours since 1985-01-01 00:00:00'
+        time_units = {
+            'days': 'D', 'hours': 'h', 'minutes': 'min', 'seconds': 's'
+        }
+        time_unit = unit_str.split(' since ')[0].strip()
+        if time_unit not in time_units:
             err_str = 'WARNING: time unit not setup: {}'.format(unit_str)
             print(err_str)
             logging.info(err_str)
             sys.exit()
         # calculate start time
-        starttime = time.strptime(unit_str, date_str)
-        starttime = time2datetime([starttime])[0]
-        dates = np.array(dates)
-    logging.info('file start date: {}'.format(starttime))
-    # allow for single date output <= is there a better gotcha than this?
-    if len(dates.shape) == 0:
-        dates = [float(dates)]
-    # Convert to date time
-    if time_unit == 'hours':
-        dates = [add_hrs(starttime, i) for i in dates]
-    elif time_unit == 'minutes':
-        dates = [add_minutes(starttime, i) for i in dates]
-    elif time_unit == 'days':
-        dates = [add_days(starttime, i) for i in dates]
-    else:
-        err_str = "processing not setup for unit: '{}' ".format(date_str)
-        print(err_str)
-        logging.info(err_str)
-        sys.exit()
+        try:
+            starttime = pd.Timestamp(unit_str.split(' since ')[1].strip())
+        except ValueError:
+            starttime = time.strptime(unit_str, date_str)
+            starttime = pd.Timestamp(time2datetime([starttime])[0])
+        logging.info('file start date: {}'.format(starttime))
+        # Convert to date time (allowing for single date output)
+        dates = starttime + pd.to_timedelta(dates, unit=time_units[time_unit])
+        # Only keep the latest version of the file's time axis
+        for old_key in [i for i in gc_datetime_cache if i[0] == key[0]]:
+            del gc_datetime_cache[old_key]
+        gc_datetime_cache[key] = pd.DatetimeIndex(dates)
+    dates = gc_datetime_cache[key]
     logging.debug('1st date dates {}'.format(dates[:10]))
     # Return datetime objects
+    if rtn_list:
+        return list(dates.to_pydatetime())
     return dates
 
 
@@ -1797,12 +2112,16 @@ def get_gc_alt(alt, unit='km'):
 
 
 def species_v_v_to_Gg(arr, spec, a_m=None, Iodine=True, All=False,
-                      Ox=False, wd=None, debug=False):
+                      Ox=False, wd=None, out=None, debug=False):
     """
     Convert array of species in v/v to Gg (of spec)
 
     Parameters
     -------
+    arr (array): array of v/v, or a stack of arrays (species, lon, lat, ...)
+    spec (str or list): species name (or list of names, if arr is stacked)
+    a_m (np.array): 4D array of air mass
+    out (array): array to write output to (pass arr to convert in place)
 
     Returns
     -------
@@ -1824,22 +2143,31 @@ def species_v_v_to_Gg(arr, spec, a_m=None, Iodine=True, All=False,
         print([i.shape for i in (moles, arr)])
     # I mass ( moles => mass (g) => Gg (in units of I ) )
     if ((Iodine) and ((not Ox) and (not All))):
-        arr = ((arr * moles) * 127.) / 1E9 * spec_stoich(spec)
+        spec_factor = get_spec_conversion_vector(spec, prop='stoich') * 127.
     # O3 mass ( moles => mass (g) => Gg (in units of O3 ) )
-    if ((Iodine) and (Ox)):
-        arr = ((arr * moles) * (16.*3.)) / 1E9
+    elif ((Iodine) and (Ox)):
+        spec_factor = (16.*3.)
     #  In "species" mass terms ( moles => mass (g) => Gg (in units of spec ) )
-    if ((not Iodine) and (All)):
-        arr = ((arr * moles) * (species_mass(spec))) / 1E9
-    return arr
+    elif ((not Iodine) and (All)):
+        spec_factor = get_spec_conversion_vector(spec)
+    else:
+        return arr
+    return unit_conversion_kernel(arr, moles / 1E9, spec_factor, out=out)
 
 
 # ----
 # X.XX - retrive volume for geos chem run ( in cm3 )
 # ----
+@cache_array_output
 def get_volume_np(box_height=None, s_area=None, res='4x5',
                   wd=None, trop_limit=False, debug=False):
-    """ Get grid box volumes for CTM output in cm3 """
+    """
+    Get grid box volumes for CTM output in cm3
+
+    Notes
+    -----
+     - Output arrays can be cached on disk, see core.set_array_cache
+    """
     logging.info('get_volume_np called for res={}'.format(res))
     if not isinstance(box_height, np.ndarray):
         try:
@@ -2013,42 +2341,23 @@ def get_DU_mean(spec='O3', s_area=None, a_m=None, t_p=None, O3_arr=None, wd=None
     -------
     (array)
 
+    Notes
+    -----
+     - Variables not provided are read from wd in time chunks
+        (see get_trop_burdens4specs)
     """
     if not isinstance(s_area, np.ndarray):
         print("Extracting s_area in 'get_DU_mean'")
         s_area = get_surface_area(res)[..., 0]  # m2 land map
-    if not isinstance(a_m, np.ndarray):
-        print("Extracting a_m in 'get_DU_mean'")
-        a_m = get_air_mass_np(wd=wd, trop_limit=trop_limit,
-                              debug=debug)
-    if not isinstance(t_p, np.ndarray):
-        print("Extracting t_p in 'get_DU_mean'")
-        t_p = get_GC_output(wd=wd, vars=[u'TIME_TPS__TIMETROP'],
-                            trop_limit=trop_limit, debug=debug)
-    if not isinstance(O3_arr, np.ndarray):
-        print("Extracting arr in 'get_DU_mean'")
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+spec],
-                            trop_limit=trop_limit, debug=debug)
-    else:
-        arr = O3_arr
-    if debug:
-        print([(i.shape, i.mean()) for i in (s_area, a_m, t_p, arr)])
-    # Get molec. of air to get moles of spec
-    # molecs air
-    molecs_air = (a_m*1E3) / constants('RMM_air') * constants('AVG')
-    # molecules O3
-    arr = np.ma.array(arr) * molecs_air
-    # average of time within the troposphere
-    # cut columns to tropopause
-    arr = np.sum(arr * t_p, axis=2)
-    # average over time
-    arr = arr.mean(axis=2)
-    # convert to DU
-    arr = arr / s_area  # adjust to per area
-    arr = arr / constants('mol2DU')  # convert to DU
-    if area_weight:
-        arr = np.sum(arr * s_area)/np.sum(s_area)  # weight by area
-    return arr
+    ars = {}
+    if isinstance(O3_arr, np.ndarray):
+        ars[spec] = O3_arr
+    # Sum molecules of spec in tropospheric columns, averaged over time,
+    # then convert to DU (and weight by area)
+    return get_trop_burdens4specs([spec], wd=wd, a_m=a_m, t_p=t_p, ars=ars,
+                                  s_area=s_area, units='DU',
+                                  summate=area_weight, trop_limit=trop_limit,
+                                  res=res, debug=debug)[spec]
 
 
 def get_POxLOx(ctms=None, vol=None, all_data=False, t_p=None, ver='1.6',
@@ -2246,6 +2555,8 @@ def molec_weighted_avg(arr, wd=None, vol=None, t_p=None,
         and arr have the same shape
     Molecs is the same as n_air ( [molec air/m3] * [m3]  vs.
        air mass [kg] / RMM [kg mol^-1] * Avogadros [mol^-1] )
+    Masked values (and the stratosphere) are excluded via the "where"
+       argument of the sums (see get_trop_mask), and plain arrays are returned
     """
     logging.info(
         'molec_weighted_avg called for arr.shape={}'.format(arr.shape))
@@ -2260,33 +2571,51 @@ def molec_weighted_avg(arr, wd=None, vol=None, t_p=None,
         molecs = n_air * vol  # [molec air]
         if annual_mean:
             molecs = molecs.mean(axis=-1)
-    # Limit for troposphere?
-    if trop_limit:
+    # Weights/mask for the troposphere (kept as a compact array)
+    # NOTE: if t_p is provided, the stratosphere is taken to have already been
+    # removed from arr (e.g. by multiplying through by t_p, see KPP.py)
+    weights, keep = None, None
+    if trop_limit and rm_strat and isinstance(t_p, type(None)):
         # Get species time Tropopause diagnostic
-        if isinstance(t_p, type(None)) and rm_strat:
-            t_p = get_GC_output(wd=wd, vars=['TIME_TPS__TIMETROP'],
-                                trop_limit=trop_limit)
-            # Mask for troposphere
-            arr, molecs = mask4troposphere([arr, molecs], t_ps=t_p, res=res,
-                                           use_time_in_trop=True,
-                                           multiply_method=multiply_method)
+        t_p = get_GC_output(wd=wd, vars=['TIME_TPS__TIMETROP'],
+                            trop_limit=trop_limit)
+        mask = get_trop_mask(t_ps=t_p, ndim=len(arr.shape), res=res,
+                             use_time_in_trop=True,
+                             multiply_method=multiply_method)
+        if multiply_method:
+            weights = mask
+        else:
+            keep = mask
     # If masked array provided, applied same mask to molecules
     if isinstance(arr, np.ma.core.MaskedArray):
-        try:
-            molecs = np.ma.array(molecs, mask=arr.mask)
-        except:  # MaskError:
-            print(("MaskError for array shapes in 'molec_weighted_avg': ",
-                   [i.shape for i in (molecs, arr)]))
+        if np.ma.getmask(arr) is not np.ma.nomask:
+            if isinstance(keep, type(None)):
+                keep = ~arr.mask
+            else:
+                keep = keep & ~arr.mask
+        arr = arr.data
     # Weight over which axis?
     if weight_lon and (not weight_lat):  # 1st axis
-        return (arr * molecs).sum(axis=LON_axis)/molecs.sum(axis=LON_axis)
+        axis = LON_axis
     elif weight_lat and (not weight_lon):  # 2nd axis (LON, LAT, ALT, TIME )
-        return (arr * molecs).sum(axis=LAT_axis)/molecs.sum(axis=LAT_axis)
+        axis = LAT_axis
     elif weight_lat and weight_lon:  # 1st+2nd axis (LON, LAT, ALT, TIME )
-        return (arr * molecs).sum(axis=LAT_axis).sum(axis=LON_axis) /  \
-            molecs.sum(axis=LAT_axis).sum(axis=LON_axis)
+        axis = (LON_axis, LAT_axis)
     else:  # weight whole array to give single number
-        return (arr * molecs).sum()/molecs.sum()
+        axis = None
+    # Molecules (weighted by time in the troposphere)
+    if not isinstance(weights, type(None)):
+        molecs = molecs * weights
+    tmp = np.multiply(arr, molecs)
+    # (the species array is also weighted by time in the troposphere)
+    if not isinstance(weights, type(None)):
+        np.multiply(tmp, weights, out=tmp)
+    # Sum only the values not masked
+    if isinstance(keep, type(None)):
+        return tmp.sum(axis=axis) / molecs.sum(axis=axis)
+    keep = np.broadcast_to(keep, tmp.shape)
+    return np.sum(tmp, axis=axis, where=keep) / \
+        np.sum(np.broadcast_to(molecs, tmp.shape), axis=axis, where=keep)
 
 
 def get_number_density_variable(wd=None, trop_limit=True):
@@ -2302,59 +2631,44 @@ def get_number_density_variable(wd=None, trop_limit=True):
     return n_air
 
 
-def split_4D_array_into_seasons(arr, annual_plus_seasons=True,
+def split_4D_array_into_seasons(arr, annual_plus_seasons=True, dates=None,
                                 debug=False):
     """
     Split 4D ( lon, lat, alt, time) output by season, then take
     average of the seasons
 
     NOTE(s):
-     - currently seasons index is mannual set assuming Jan-Dec
-     - TODO - update to use extract data?
+     - if dates are not given, monthly output from January is assumed
+     - Seasons are averaged in a single pass (see aggregate_by_time_groups)
     """
     if debug:
         print((arr.shape))
-    if annual_plus_seasons:
-        seasons = ['Annual', 'DJF', 'MAM', 'JJA', 'SON']
-        # assume calender month order
-        # ( this can be automated using get_GC_datetime )
-        indices = [
-            list(range(0, 12)), [11, 0, 1], [2, 3, 4], [5, 6, 7], [8, 9, 10]
-        ]
-    else:
-        seasons = ['DJF', 'MAM', 'JJA', 'SON']
+    if isinstance(dates, type(None)):
         # assume calender month order
-        # ( this can be automated using get GC datetime )
-        indices = [[11, 0, 1], [2, 3, 4], [5, 6, 7], [8, 9, 10]]
-    ars = []
-    # Extract data by month
-    for n, s in enumerate(seasons):
-        if debug:
-            print((s, n, indices[n]))
-        ars += [[arr[..., i] for i in indices[n]]]
-    # Average by season
+        dates = pd.date_range('2000-01-01', periods=arr.shape[-1], freq='MS')
+    arr, seasons = aggregate_by_time_groups(arr, dates=dates, freq='season',
+                                            add_annual=annual_plus_seasons)
     if debug:
-        print(([np.ma.array(i).shape for i in ars], seasons))
-    ars = [np.ma.array(i).mean(axis=0) for i in ars]
-    if debug:
-        print(([i.shape for i in ars], np.ma.array(ars).mean(), seasons))
+        print((arr.shape, arr.mean(), seasons))
     # Return list array averaged by season
-    return ars, seasons
+    return [arr[..., n] for n in range(len(seasons))], seasons
 
 
 def convert_v_v2ngm3(arr, wd=None, spec='AERI', trop_limit=True,
-                     s_area=None, vol=None, a_m=None, res='4x5', debug=False):
+                     s_area=None, vol=None, a_m=None, res='4x5', out=None,
+                     debug=False):
     """
     Take v/v array for a species, and conver this to mass loading
     units used as standard are ng/m3
 
     Parameters
     -------
-    spec (str): species/tracer/variable name
+    spec (str): species/tracer/variable name (or list, if arr is stacked)
     a_m (np.array): 4D array of air mass
     vol (array): volume contained in each grid box (cm^-3)
     trop_limit (bool): limit 4D arrays to troposphere
     res (str): the resolution if wd not given (e.g. '4x5' )
+    out (array): array to write output to (pass arr to convert in place)
 
     Returns
     -------
@@ -2370,12 +2684,11 @@ def convert_v_v2ngm3(arr, wd=None, spec='AERI', trop_limit=True,
                             dtype=np.float64)
     # Get moles  ( converting airmass from kg 1st)
     mols = a_m*1E3/constants('RMM_air')
-    # Adjust to mols, then mass
-    arr = arr*mols*species_mass(spec)
+    # Adjust to mols, then mass, and convert to (nano, x1E9)g/m3
+    arr = unit_conversion_kernel(arr, mols*1E9/vol,
+                                 get_spec_conversion_vector(spec), out=out)
     if debug:
-        print((species_mass(spec), np.sum(arr)))
-    # Convert to (nano, x1E9)g/m3
-    arr = arr*1E9/vol
+        print((spec, np.sum(arr)))
     return arr
 
 
@@ -2418,7 +2731,7 @@ def convert_v_v2ugm3(arr, wd=None, spec='AERI', trop_limit=True,
 
 def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
                        region='All', monthly=False, mask3D=True, trop_limit=True,
-                       prt_by_3D_region=False, hPa=None, wd=None,
+                       prt_by_3D_region=False, hPa=None, wd=None, dates=None,
                        verbose=True, debug=False):
     """ Print zonal/surface area weighted values for seasons """
     if verbose:
@@ -2430,7 +2743,9 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
     # Get surface area
     s_area = get_surface_area(res=res)  # m2 land map
     s_area = s_area[..., 0]
-    months = list(range(12))
+    if isinstance(dates, type(None)):
+        # assume monthly output from January
+        dates = pd.date_range('2000-01-01', periods=arr.shape[-1], freq='MS')
     # --- If region provided, mask elsewhere - else
     if ('asked' not in str(type(arr))):
         print('WARNING: converting array to masked array')
@@ -2442,7 +2757,7 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
                      use_multiply_method=False,
                      trop_limit=trop_limit)[..., :38]
     print([i.shape for i in (m, arr.mask)])
-    m = np.ma.concatenate([m[..., None]] * len(months), axis=-1)
+    m = np.repeat(m[..., None], len(dates), axis=-1)
     # Mask array individually
     print([i.shape for i in (m, arr.mask, arr)])
     arr = np.ma.array(arr, mask=np.ma.mask_or(m, arr.mask))
@@ -2457,15 +2772,15 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
     s_area = np.ma.array(s_area, mask=m[..., 0, 0])
     # --- Split array by seasons ( on months if monthly==True)
     if monthly:
-        # this is assuming monthly output
-        ars = [arr[..., i] for i in range(12)]
-        seasons = list(num2month(rtn_dict=True).values())
-        # Also plot annual value
-        ars += [arr.mean(axis=-1)]
-        seasons += ['Annual']
+        freq = 'month'
     else:
-        ars, seasons = split_4D_array_into_seasons(arr,
-                                                   annual_plus_seasons=True)
+        freq = 'season'
+    ars, seasons = aggregate_by_time_groups(arr, dates=dates, freq=freq,
+                                            add_annual=True)
+    ars = [ars[..., n] for n in range(len(seasons))]
+    # Also plot annual value (last, for months)
+    if monthly:
+        ars, seasons = ars[1:] + ars[:1], seasons[1:] + seasons[:1]
     # --- Print values by 3D region
     if prt_by_3D_region:
 
@@ -2528,11 +2843,161 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
             print((npstr.format(s,  *vars)))
 
 
+def get_fam_definition4fam_data_extractor(fam, ver='3.0'):
+    """
+    Get the tracers, stoichiometry and scaling of a family of (IJ_AVG_S) tracers
+
+    Parameters
+    -------
+    fam (str): "family" to extract ( e.g. NOy, NOx, Bry, ... )
+    ver (str): GEOSChem version with halogens (default = 3.0)
+
+    Returns
+    -------
+    (tuple) of tracers (list), reference species for stoichiometry (str or
+    None), scale (float) and units (str). Or None if the family is not a
+    (weighted) sum of tracers.
+
+    Notes
+    -----
+     - These are the families summed from tracers in fam_data_extractor
+    """
+    if fam == 'NOx':
+        return ['NO2', 'NO'], None, 1E12, 'pmol mol${^-1}$'
+    elif fam == 'NOy':
+        return GC_var('NOy'), 'N', 1E12, 'pmol mol${^-1}$'
+    elif fam in ('NIT_ALL', 'TNO3'):
+        scale, units = 1E12, 'pmol mol${^-1}$'
+        if fam == 'TNO3':
+            scale, units = 1, 'nmol mol${^-1}$'
+        return ['HNO3', 'NIT', 'NITs'], 'N', scale, units
+    elif fam == 'SO4':
+        return ['SO4', 'SO4s'], 'S', 1E12, 'pmol mol${^-1}$'
+    elif fam == 'NH4':
+        return ['NH4'], 'N', 1E12, 'pmol mol${^-1}$'
+    elif fam == 'O3':
+        NIU, scale = tra_unit(fam, IUPAC_unit=True, scale=True)
+        return ['O3'], None, scale, 'nmol mol${^-1}$'
+    elif fam == 'Bry':
+        specs = GC_var('Bry')
+        if ver == 'v11-1':
+            specs.pop(specs.index('IBr'))
+        return specs, 'Br', 1, 'v/v'
+    elif fam == 'Iy':
+        return GC_var('Iy'), 'I', 1, 'v/v'
+    elif fam == 'Cly':
+        specs = GC_var('Cly')
+        if ver == 'v11-1':
+            specs.pop(specs.index('ICl'))
+        return specs, 'Cl', 1, 'v/v'
+    elif fam == 'ClOx':
+        return ['Cl', 'ClO', 'Cl2O2', 'ClOO', ], 'Cl', 1, 'v/v'
+    elif fam == 'VOC':
+        specs = [
+            'ALK4', 'ISOP', 'ACET', 'MEK',  'ALD2', 'PRPE', 'C2H6', 'C3H8'
+        ]
+        return specs, None, 1E9, 'nmol(C) mol${^-1}$'
+    return None
+
+
+def fam_data_extractor4fams(wd=None, fams=None, trop_limit=True, ver='3.0',
+                            annual_mean=True, t_ps=None, a_m=None, vol=None,
+                            res='4x5', title=None, use_time_in_trop=True,
+                            multiply_method=True, rtn_units=False,
+                            dtype=None, debug=False):
+    """
+    Extract data for a list of families, reading each tracer only once
+
+    Parameters
+    -------
+    fams (list): "families" to extract ( e.g. NOy, NOx, Bry, POx, ... )
+    dtype (type): type of the arrays returned for (summed) families (if None,
+    the type of the first tracer read is used)
+    (other parameters are as for fam_data_extractor)
+
+    Returns
+    -------
+    (dict) of arrays for each family, and optionally a dictionary of units
+
+    Notes
+    -----
+     - Tracers used in more than one family (e.g. NO2 in NOx and NOy) are read
+     once and the stoichiometry-weighted (and scaled) values are added to
+     preallocated arrays for each family.
+     - Families that are not sums of tracers (e.g. OH, HOx, PM2.5) are
+     extracted with fam_data_extractor.
+     - Masked tracer values are counted as zero in the sums and a family
+     value is only masked where all of the family's tracers are masked.
+    """
+    logging.info('fam_data_extractor4fams called for {}'.format(fams))
+    defs = dict([(i, get_fam_definition4fam_data_extractor(i, ver=ver))
+                 for i in fams])
+    linear_fams = [i for i in fams if not isinstance(defs[i], type(None))]
+    # Get weights (stoichiometry * scale) for each tracer in each family
+    weights = collections.OrderedDict()
+    for fam in linear_fams:
+        specs, ref_spec, scale, NIU = defs[fam]
+        for spec in specs:
+            weight = scale
+            if not isinstance(ref_spec, type(None)):
+                weight = spec_stoich(spec, ref_spec=ref_spec) * scale
+            weights.setdefault(spec, []).append((fam, weight))
+    # Read each tracer once and add to the families it is in
+    data, masks, tmp = {}, {}, None
+    for spec in weights:
+        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+spec],
+                            trop_limit=trop_limit)
+        mask = np.ma.getmask(arr)
+        arr = np.ma.filled(arr, 0)
+        if isinstance(tmp, type(None)):
+            if isinstance(dtype, type(None)):
+                dtype = arr.dtype
+            tmp = np.empty(arr.shape, dtype=dtype)
+            for fam in linear_fams:
+                data[fam] = np.zeros(arr.shape, dtype=dtype)
+        for fam, weight in weights[spec]:
+            np.multiply(arr, weight, out=tmp)
+            data[fam] += tmp
+            # A family value is masked only where all its tracers are
+            # (as for the masked sum over tracers in fam_data_extractor)
+            if fam not in masks:
+                masks[fam] = mask
+            elif (masks[fam] is np.ma.nomask) or (mask is np.ma.nomask):
+                masks[fam] = np.ma.nomask
+            else:
+                masks[fam] = masks[fam] & mask
+    for fam in linear_fams:
+        if np.any(masks.get(fam, np.ma.nomask)):
+            data[fam] = np.ma.array(data[fam], mask=masks[fam])
+    # --- Mask for troposphere if t_ps provided (& trop_limit=True)
+    if not isinstance(t_ps, type(None)) and trop_limit and \
+            (len(linear_fams) > 0):
+        ars = mask4troposphere([data[i] for i in linear_fams], t_ps=t_ps,
+                               use_time_in_trop=use_time_in_trop,
+                               multiply_method=multiply_method)
+        data.update(dict(zip(linear_fams, ars)))
+    # Take average (mean) over time? (if annual_mean==True)
+    if annual_mean:
+        for fam in linear_fams:
+            data[fam] = data[fam].mean(axis=-1)
+    units = dict([(i, defs[i][-1]) for i in linear_fams])
+    # Extract the other families individually
+    for fam in [i for i in fams if i not in linear_fams]:
+        data[fam], units[fam] = fam_data_extractor(
+            wd=wd, fam=fam, trop_limit=trop_limit, ver=ver,
+            annual_mean=annual_mean, t_ps=t_ps, a_m=a_m, vol=vol, res=res,
+            title=title, use_time_in_trop=use_time_in_trop,
+            multiply_method=multiply_method, rtn_units=True, debug=debug)
+    if rtn_units:
+        return data, units
+    return data
+
+
 def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
                        annual_mean=True, t_ps=None, a_m=None, vol=None, res='4x5',
                        title=None, rtn_list=False, use_time_in_trop=True,
                        multiply_method=True, rtn_specs=False, verbose=False,
-                       rtn_units=False,
+                       rtn_units=False, fams=None,
                        units=None, debug=False):
     """
     Driver to extract data for a given family requested
@@ -2540,6 +3005,7 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
     Parameters
     -------
     fam (str): "family" to extract ( e.g. NOy, NOx, POx, CH4 loss rate, ... )
+    fams (list): "families" to extract together (returns a dictionary)
     a_m (array): array of air mass
     vol (array): volumne of grid boxes
     trop_limit (bool): limit output to "chemical troposphere" (level 38 )
@@ -2566,26 +3032,52 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
      - to return species extract, set  rtn_species=True
      - this function should be used in preference to other bulk output
      extractors in this module.
+     - If a list of families is given (fams), the tracers for all the families
+     are read once (see fam_data_extractor4fams)
     """
+    if not isinstance(fams, type(None)):
+        return fam_data_extractor4fams(wd=wd, fams=fams, trop_limit=trop_limit,
+                                       ver=ver, annual_mean=annual_mean,
+                                       t_ps=t_ps, a_m=a_m, vol=vol, res=res,
+                                       title=title, rtn_units=rtn_units,
+                                       use_time_in_trop=use_time_in_trop,
+                                       multiply_method=multiply_method,
+                                       dtype=np.float64, debug=debug)
     func_call_str = 'fam_data_extractor called for ', fam, wd, title, res
     logging.info(func_call_str)
     if verbose:
         print(func_call_str)
-    # --- Nitrogen Oxides NOx ( NO + NO2)
-    if fam == 'NOx':
-        # Select species in family
-        specs = ['NO2', 'NO']
-        scale = 1E12
-#        units, scale = tra_unit(specs[0], IUPAC_unit=True, scale=True)
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit)
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
-        units = 'pmol mol${^-1}$'
+    # --- Families that are (weighted) sums of tracers (NOx, NOy, Bry, ...)
+    defn = get_fam_definition4fam_data_extractor(fam, ver=ver)
+    if not isinstance(defn, type(None)):
+        specs, ref_spec, scale, units = defn
+        if rtn_list and (len(specs) == 1) and isinstance(ref_spec, type(None)):
+            # Single tracers (e.g. O3) are returned as a scaled array
+            arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+specs[0]],
+                                trop_limit=trop_limit)
+            arr = arr * scale
+        elif rtn_list and isinstance(ref_spec, type(None)):
+            # Return the (unscaled) tracers as extracted (e.g. NOx, VOC)
+            arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
+                                trop_limit=trop_limit)
+            if debug:
+                print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
+        elif rtn_list:
+            # Extract data
+            arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
+                                trop_limit=trop_limit, r_list=True)
+            # Adjust to stoichiometry (the scale is only applied to sums)
+            arr = [arr[n]*spec_stoich(i, ref_spec=ref_spec)
+                   for n, i in enumerate(specs)]
+            if debug:
+                print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
+        else:
+            # Use the same (single) definition as for a list of families
+            # (masking and averaging over time are done below)
+            arr = fam_data_extractor4fams(wd=wd, fams=[fam],
+                                          trop_limit=trop_limit, ver=ver,
+                                          annual_mean=False, t_ps=None,
+                                          debug=debug)[fam]
     # --- OH ( in molec/cm3 )
     elif fam == 'OH':
         # Set specs list to just contain fam
@@ -2639,234 +3131,41 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
             scale = 1E12
             units = 'pmol mol${^-1}$'
             arr = arr * scale
-    # --- NOy
-    elif fam == 'NOy':
+    # Get Ox prod (POx/POX) ([molec/cm3/s])
+    elif fam == 'POX':
+        # Set specs list to just contain fam
+        specs = [fam]
         # Select species in family
-        #        specs = GC_var('N_specs' )
-        #        if (ver == '3.0') or (ver == '4.0') :
-        #            if not any( [ (title != i) for i in 'NOHAL', 'BROMINE' ]):
-        #                specs  += ['ClNO2', 'ClNO3']
-        specs = GC_var('NOy')
-#        units, scale = tra_unit(specs[0], IUPAC_unit=True, scale=True)
-        scale = 1E12
+        arr = get_GC_output(wd=wd, vars=['PORL_L_S__'+fam],
+                            trop_limit=trop_limit)
+        units = 'molec. cm$^{-3}$ s$^{-1}$'
+    # Get Ox prod (POx/POX) ([molec/cm3/s])
+    elif fam == 'CH4 loss':
+        # Set specs list to just contain fam
+        specs = [fam]
+        # Select species in family
+        arr = get_CH4_lifetime(wd=wd, use_OH_from_geos_log=False,
+                               average_value=False)
+        # Want in units of yr^-1
+        arr = 1/arr
+        units = 'yr$^{-1}$'
+    # --- Get PM2.5 (Approximation from gas-phase species )
+    elif fam == 'PM2.5':
+        # Select species in family
+        specs = [
+            'BCPI', 'NH4', 'OCPI', 'SO4', 'BCPO', 'SALA', 'DST1', 'DST2', 'NIT', 'OCPO'
+        ]
         # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
+        ars = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
                             trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
+        ars = convert_tracers2PM25(specs=specs, ars=ars)
+        arr = np.array(ars)
         if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
-        units = 'pmol mol${^-1}$'
-    # --- All NIT (inc. HNO3)
-    elif fam == 'NIT_ALL':
-        # Select species in family
-        specs = 'HNO3', 'NIT', 'NITs'
-        scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
-        units = 'pmol mol${^-1}$'
-    # --- all sulfate
-    elif fam == 'SO4':
-        # Select species in family
-        specs = 'SO4', 'SO4s',
-        scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='S')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
-        units = 'pmol mol${^-1}$'
-    # --- all sulfate
-    elif fam == 'NH4':
-        # Select species in family
-        #        specs = GC_var('NIT_ALL' )
-        specs = 'NH4',
-        scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
-        units = 'pmol mol${^-1}$'
-
-    # --- Ozone (O3)
-    elif fam == 'O3':
-        # Set specs list to just contain fam
-        specs = [fam]
-        # Select species in family
-        units, scale = tra_unit(fam, IUPAC_unit=True, scale=True)
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+fam],
-                            trop_limit=trop_limit)
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
-        arr = arr * scale
-        units = 'nmol mol${^-1}$'
-
-    # Get Ox prod (POx/POX) ([molec/cm3/s])
-    elif fam == 'POX':
-        # Set specs list to just contain fam
-        specs = [fam]
-        # Select species in family
-        arr = get_GC_output(wd=wd, vars=['PORL_L_S__'+fam],
-                            trop_limit=trop_limit)
-        units = 'molec. cm$^{-3}$ s$^{-1}$'
-    # Get Ox prod (POx/POX) ([molec/cm3/s])
-    elif fam == 'CH4 loss':
-        # Set specs list to just contain fam
-        specs = [fam]
-        # Select species in family
-        arr = get_CH4_lifetime(wd=wd, use_OH_from_geos_log=False,
-                               average_value=False)
-        # Want in units of yr^-1
-        arr = 1/arr
-        units = 'yr$^{-1}$'
-    # ---  Inorganic bromine ( Bry )
-    elif fam == 'Bry':
-        # Select species in family
-        specs = GC_var('Bry')
-        # Also consider Br- on SS
-#        specs += [ 'BrSALA', 'BrSALC', ]
-        if ver == 'v11-1':
-            specs.pop(specs.index('IBr'))
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='Br')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
-        units = 'v/v'
-    # ---  Inorganic iodine ( Iy )
-    elif fam == 'Iy':
-        # Select species in family
-        specs = GC_var('Iy')
-        # Also include iodine aerosol and CH3I
-#        specs = GC_var('Iy' ) + ['AERI', 'ISALA', 'ISALC', 'CH3I' ]
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='I')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
-        units = 'v/v'
-    # ---  Inorganic iodine ( Cly )
-    elif fam == 'Cly':
-        # Select species in family
-        specs = GC_var('Cly')
-        if ver == 'v11-1':
-            specs.pop(specs.index('ICl'))
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='Cl')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
-        units = 'v/v'
-    # ---  Reactive chlorine ( ClOx )
-    elif fam == 'ClOx':
-        # Select species in family
-        specs = ['Cl', 'ClO', 'Cl2O2', 'ClOO', ]
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='Cl')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
-        units = 'v/v'
-    # --- Nitrogen Oxides NOx ( NO + NO2)
-    elif fam == 'VOC':
-        # Select species in family
-        specs = [
-            'ALK4', 'ISOP', 'ACET', 'MEK',  'ALD2', 'PRPE', 'C2H6', 'C3H8'
-        ]
-        scale = 1E9
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit)
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
-        units = 'nmol(C) mol${^-1}$'
-    # --- Get PM2.5 (Approximation from gas-phase species )
-    elif fam == 'PM2.5':
-        # Select species in family
-        specs = [
-            'BCPI', 'NH4', 'OCPI', 'SO4', 'BCPO', 'SALA', 'DST1', 'DST2', 'NIT', 'OCPO'
-        ]
-        # Extract data
-        ars = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        ars = convert_tracers2PM25(specs=specs, ars=ars)
-        arr = np.array(ars)
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
+            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
         if not rtn_list:
             arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
             arr = arr.sum(axis=-1) * scale
         units = 'ug m${^-3}$'
-    # --- NOy
-    elif fam == 'TNO3':
-        # Select species in family
-        specs = ['HNO3', 'NIT', 'NITs']
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
-        units = 'nmol mol${^-1}$'
     # --- Try extracting as a species rather than family?
     else:
         try:
@@ -3158,10 +3457,11 @@ def fam_data_extractor4ts_bpch_files(spec='NOy', wd=None,
         # Get output for all speices
         data_l = []
         # "Open" NetCDF ... Metadata...
-        with Dataset(wd+'/'+filename, 'r') as rootgrp:
-            for fam_spec in specs:
-                # Extract
-                print(("Extracting spec='{}'".format(fam_spec)))
+        for fam_spec in specs:
+            # Extract
+            print(("Extracting spec='{}'".format(fam_spec)))
+            with NetCDF_read_lock:
+                rootgrp = get_NetCDF_handle(wd+'/'+filename)
                 data_ = rootgrp['IJ_AVG_S__'+fam_spec]
                 print(('Extracted data:', data_))
                 print(('data shape: ', data_.shape))
@@ -3197,7 +3497,7 @@ def fam_data_extractor4ts_bpch_files(spec='NOy', wd=None,
 
 
 def convert_spec_v_v_2_ugm3(spec=None, data=None, explicitly_calc=False,
-                            press=None, T=None):
+                            press=None, T=None, out=None):
     """
     Convert mixing ratio (v/v) to ug m^-3
 
@@ -3207,10 +3507,17 @@ def convert_spec_v_v_2_ugm3(spec=None, data=None, explicitly_calc=False,
     data (array): array of data
     press (float or array): pressure (hPa) as a float on array with size of data
     T (float or array): temperature (K) as a float on array with size of data
+    out (array): array to write output to (default: data, i.e. in place, if
+        data is an array of floats)
 
     Returns
     -------
     (array)
+
+    Notes
+    -----
+     - A list of species can be given as spec if data is a stack of species
+        arrays (species, ...)
     """
     logging.info('convert_spec_v_v_2_ugm3 called for spec={}'.format(spec))
     # Get Air density
@@ -3238,14 +3545,14 @@ def convert_spec_v_v_2_ugm3(spec=None, data=None, explicitly_calc=False,
     #  (1/(g/mol)) = (mol/g) ; (mol/g) * (g/cm3) = mol/cm3
     MOLS = (1/RMM_air) * AIRDEN
     # --- convert spec
-    # v/v * mols/cm3 = mols of X per cm3;
-    data *= MOLS
-    # convert to grams of X per cm3; ( * RMM of species )
-    data *= species_mass(spec)
-    # convert to ug per cm3 (*1E6)
-    data *= 1E6
-    # convert to ug per m3 (*1E6)
-    data *= 1E6
+    # v/v * mols/cm3 = mols of X per cm3; convert to grams of X per cm3
+    # ( * RMM of species ), then to ug per cm3 (*1E6) and ug per m3 (*1E6)
+    # (arrays of floats are converted in place, unless out is given)
+    if isinstance(out, type(None)) and isinstance(data, np.ndarray) and \
+            np.issubdtype(data.dtype, np.floating):
+        out = data
+    data = unit_conversion_kernel(data, MOLS*1E12,
+                                  get_spec_conversion_vector(spec), out=out)
     units = '$\mu$g m$^{-3}$'
     # scale data and return
     return data
@@ -3277,6 +3584,10 @@ def get_LOC_df_from_NetCDF(site=None, spec='O3', wd=None, res=None,
     Returns
     -------
     (pd.DataFrame object)
+
+    Notes
+    -----
+     - To extract many sites and/or species, use get_LOCs_df_from_NetCDF
     """
     if debug:
         err_str = 'get_LOC_df_from_NetCDF called for {} ({},{}) ({},{})'
@@ -3302,7 +3613,8 @@ def get_LOC_df_from_NetCDF(site=None, spec='O3', wd=None, res=None,
         LON_ind = get_gc_lon(LON, res=res, wd=wd, filename=filename)
         LAT_ind = get_gc_lat(LAT, res=res, wd=wd, filename=filename)
     # Extract data for location
-    with Dataset(wd+'/'+filename, 'r') as rootgrp:
+    with NetCDF_read_lock:
+        rootgrp = get_NetCDF_handle(wd+'/'+filename)
         data = rootgrp['IJ_AVG_S__'+spec]
         if verbose:
             print(('Extracted data:', data))
@@ -3336,9 +3648,183 @@ def get_LOC_df_from_NetCDF(site=None, spec='O3', wd=None, res=None,
         return df
 
 
+def get_LOCs_df_from_NetCDF(sites=None, specs=['O3'], wd=None, res=None,
+                            filename='ts_ctm.nc', LONs=None, LATs=None,
+                            LON_inds=None, LAT_inds=None, prefix='IJ_AVG_S__',
+                            long_form=False, rtn_units=False):
+    """
+    Extract *ts*bpch* (1D) data from file for many sites and species at once
+
+    Parameters
+    ----------
+    sites (list): names of locations (must be present in "get_loc" dictionary)
+    specs (list): species/tracer/variable names
+    res (str): resolution of the model input (e.g. 4x5, 2x2.5 )
+    wd (str): the directory to search for file in
+    filename (str): name of NetCDF file to extract from
+    LONs (np.array): longitudes in units of degrees East (if no sites given)
+    LATs (np.array): latitudes in units of degrees North (if no sites given)
+    LON_inds, LAT_inds (np.array): (Optional) lon and lat indices of locations
+    prefix (str): prefix of the variable names in the NetCDF (diag. category)
+    long_form (bool): return a "long form" DataFrame (a row per value)
+    rtn_units (bool): also return a dictionary of units for each species
+
+    Returns
+    -------
+    (pd.DataFrame object) with a column for each (site, species) pair, or with
+    columns of datetime, site, spec and value if long_form==True
+
+    Notes
+    -----
+     - The grid box indices of all the sites are found in one step and each
+     variable is read from the file once (for all sites).
+     - Without site names, sites are labelled by "LON,LAT"
+    """
+    # Get LAT and LON for sites, if values not given.
+    if isinstance(LONs, type(None)) or isinstance(LATs, type(None)):
+        if isinstance(sites, type(None)):
+            err_msg = 'LONs+LATs or sites must be provided!'
+            logging.error(err_msg)
+            raise ValueError(err_msg)
+        loc_dict = get_loc(rtn_dict=True)
+        sites_not_defined = [i for i in sites if i not in loc_dict]
+        if len(sites_not_defined) > 0:
+            err_msg = 'Sites not defined in get_loc: {}'.format(
+                sites_not_defined)
+            logging.error(err_msg)
+            raise KeyError(err_msg)
+        LONs = [loc_dict[i][0] for i in sites]
+        LATs = [loc_dict[i][1] for i in sites]
+    LONs, LATs = np.asarray(LONs, dtype=float), np.asarray(LATs, dtype=float)
+    if isinstance(sites, type(None)):
+        sites = ['{},{}'.format(*i) for i in zip(LONs, LATs)]
+    # Find indices for grid boxes (of all the sites in a single step)
+    if isinstance(LON_inds, type(None)) or isinstance(LAT_inds, type(None)):
+        lon_c, lat_c, NIU = get_latlonalt4res(res=res, wd=wd,
+                                              filename=filename)
+        LON_inds = np.abs(lon_c[None, :] - LONs[:, None]).argmin(axis=1)
+        LAT_inds = np.abs(lat_c[None, :] - LATs[:, None]).argmin(axis=1)
+    # Only read the grid boxes needed (array shape = TIME, LON, LAT)
+    ulon_inds, lon_pos = np.unique(LON_inds, return_inverse=True)
+    ulat_inds, lat_pos = np.unique(LAT_inds, return_inverse=True)
+    data, units = {}, {}
+    for spec in specs:
+        with NetCDF_read_lock:
+            rootgrp = get_NetCDF_handle(wd+'/'+filename)
+            var = spec if (spec in rootgrp.variables) else prefix+spec
+            arr = rootgrp[var][:, ulon_inds, ulat_inds]
+            units[spec] = getattr(rootgrp[var], 'cf_units',
+                                  'UNITS NOT IN FILE')
+        data[spec] = np.ma.filled(arr, np.nan)[:, lon_pos, lat_pos]
+    # Extract dates in NetCDF
+    dates = get_gc_datetime(filename=filename, wd=wd)
+    # Make dataframe (with columns for each site and species) and return
+    columns = pd.MultiIndex.from_product([sites, specs],
+                                         names=['site', 'spec'])
+    values = np.stack([data[i] for i in specs], axis=-1)
+    df = pd.DataFrame(values.reshape(len(dates), -1), index=dates,
+                      columns=columns)
+    df.index.name = 'datetime'
+    if long_form:
+        nsites, nspecs = len(sites), len(specs)
+        df = pd.DataFrame({
+            'datetime': np.repeat(dates, nsites*nspecs),
+            'site': np.tile(np.repeat(sites, nspecs), len(dates)),
+            'spec': np.tile(specs, len(dates)*nsites),
+            'value': values.ravel(),
+        })
+    if rtn_units:
+        return df, units
+    return df
+
+
+# Per species conversion vectors, by property and species
+# (see get_spec_conversion_vector)
+spec_conversion_vector_cache = {}
+
+
+def get_spec_conversion_vector(specs=None, prop='RMM', ref_spec=None,
+                               ndim=1):
+    """
+    Get a vector of per species conversion factors (RMM or stoichiometry)
+
+    Parameters
+    ----------
+    specs (list): species/tracer/variable names (or a single name as a str)
+    prop (str): property to get ('RMM' via species_mass, or 'stoich' via
+        spec_stoich)
+    ref_spec (str): reference species for stoichiometry (e.g. 'I')
+    ndim (int): number of dimensions of the (stacked) array the vector will
+        be applied to. The species axis is assumed to be the first.
+
+    Returns
+    -------
+    (np.array) of shape (nspecs, 1, ...) or a float if specs is a str
+
+    Notes
+    -----
+     - vectors are only looked up once per set of species and then cached
+    """
+    if isinstance(specs, str):
+        return get_spec_conversion_vector([specs], prop=prop,
+                                          ref_spec=ref_spec)[0]
+    key = (prop, ref_spec, tuple(specs))
+    if key not in spec_conversion_vector_cache:
+        if prop == 'RMM':
+            vals = [species_mass(i) for i in specs]
+        elif prop == 'stoich':
+            vals = [spec_stoich(i, ref_spec=ref_spec) for i in specs]
+        else:
+            raise ValueError("prop must be 'RMM' or 'stoich' not {}".format(
+                prop))
+        vector = np.array(vals, dtype=np.float64)
+        vector.flags.writeable = False
+        spec_conversion_vector_cache[key] = vector
+    vector = spec_conversion_vector_cache[key]
+    return vector.reshape((-1,) + (1,)*(ndim-1))
+
+
+def unit_conversion_kernel(arr, field_factor=1., spec_factor=None, out=None):
+    """
+    Apply a unit conversion to an array, or a stack of species arrays
+
+    Parameters
+    ----------
+    arr (array): array to convert, either for a single species
+        (lon, lat, lev, time) or stacked (species, lon, lat, lev, time)
+    field_factor (float or array): conversion factor shared by all species
+        (e.g. moles of air / grid box volume), broadcast over arr
+    spec_factor (float or array): per species conversion factor (e.g. RMM),
+        a vector of length nspecies is applied along the first axis
+    out (array): array to write the output to (pass arr to convert in place)
+
+    Returns
+    -------
+    (array)
+
+    Notes
+    -----
+     - factors are combined before they are applied, so the (larger) stacked
+        array is only passed over once or twice, with no temporary copies
+    """
+    if not isinstance(spec_factor, type(None)):
+        spec_factor = np.asarray(spec_factor)
+        if spec_factor.size == 1:
+            # Fold scalar factors into the (smaller) shared field
+            field_factor = field_factor * spec_factor.item()
+            spec_factor = None
+        elif (spec_factor.ndim == 1) and (np.ndim(arr) > 1):
+            spec_factor = spec_factor.reshape(
+                (-1,) + (1,)*(np.ndim(arr)-1))
+    out = np.multiply(arr, field_factor, out=out)
+    if not isinstance(spec_factor, type(None)):
+        np.multiply(out, spec_factor, out=out)
+    return out
+
+
 def convert_v_v_2_molec_cm3(arr=None, wd=None, vol=None, a_m=None,
                             mols=None, res='4x5', trop_limit=True,
-                            explicitly_calc=True, debug=False):
+                            explicitly_calc=True, out=None, debug=False):
     """
     Converts mixing ratio (v/v) into number density (molec/cm3).
 
@@ -3350,6 +3836,7 @@ def convert_v_v_2_molec_cm3(arr=None, wd=None, vol=None, a_m=None,
     trop_limit (bool): limit output to "chemical troposphere" (level 38 )
     res (str): resolution of the model input (e.g. 4x5, 2x2.5 )
     explicitly_calc (bool): Explicitly calculate the air mass
+    out (array): array to write output to (pass arr to convert in place)
 
     Returns
     -------
@@ -3359,6 +3846,7 @@ def convert_v_v_2_molec_cm3(arr=None, wd=None, vol=None, a_m=None,
     -------
     required variables of volume (vol) and airmass (a_m) can be provided as
     arguements or are extracted online (from provided wd )
+     - arr can also be a stack of species arrays (species, lon, lat, lev, time)
     """
     logging.info('convert_v_v_2_molec_cm3 called for res={}'.format(res))
     if explicitly_calc:
@@ -3375,10 +3863,8 @@ def convert_v_v_2_molec_cm3(arr=None, wd=None, vol=None, a_m=None,
         # Get moles
         if not isinstance(mols, np.ndarray):
             mols = a_m*1E3/constants('RMM_air')
-        #  Convert to molecules
-        arr = (arr * mols)*constants('AVG')
-        #  convert to per unit area ( molecs / cm^3  )
-        arr = arr / vol
+        #  Convert to molecules per unit volume ( molecs / cm^3  )
+        arr = unit_conversion_kernel(arr, mols*constants('AVG')/vol, out=out)
     # use an approximation assuming SATP
     else:
         # RMM
@@ -3393,13 +3879,13 @@ def convert_v_v_2_molec_cm3(arr=None, wd=None, vol=None, a_m=None,
         #  (1/(g/mol)) = (mol/g) ; (mol/g) * (g/cm3) = mol/cm3
         MOLS = (1/RMM_air) * AIRDEN
         # v/v * mols * AVG's # (to get molecules)
-        arr = arr * MOLS * constants('AVG')
+        arr = unit_conversion_kernel(arr, MOLS * constants('AVG'), out=out)
     return arr
 
 
 def convert_molec_cm3_2_v_v(arr=None, wd=None, vol=None, a_m=None,
                             mols=None, res='4x5', trop_limit=True, press=None, T=None,
-                            explicitly_calc=False, debug=False):
+                            explicitly_calc=False, out=None, debug=False):
     """
     Covnerts number density (molec/cm3) into mixing ratio (v/v).
 
@@ -3411,6 +3897,7 @@ def convert_molec_cm3_2_v_v(arr=None, wd=None, vol=None, a_m=None,
     trop_limit (bool): limit output to "chemical troposphere" (level 38 )
     res (str): resolution of the model input (e.g. 4x5, 2x2.5 )
     press (array): pressure in hPa
+    out (array): array to write output to (pass arr to convert in place)
 
     Returns
     -------
@@ -3420,6 +3907,7 @@ def convert_molec_cm3_2_v_v(arr=None, wd=None, vol=None, a_m=None,
     -------
     required variables of volume (vol) and airmass (a_m) can be provided as
     arguements or are extracted online (from provided wd )
+     - arr can also be a stack of species arrays (species, lon, lat, lev, time)
     """
     logging.info('convert_molec_cm3_2_v_v called for res={}'.format(res))
     # Get Air density
@@ -3446,16 +3934,95 @@ def convert_molec_cm3_2_v_v(arr=None, wd=None, vol=None, a_m=None,
     #  (1/(g/mol)) = (mol/g) ; (mol/g) * (g/cm3) = mol/cm3
     MOLS = (1/RMM_air) * AIRDEN
     # v/v * mols * AVG's # (to get molecules)
-    # get moles/cm3 ( from molecules/cm3 )
-    arr = arr/constants('AVG')
-    # get mol/mol and remove cm3 by dividing by mol/cm3
-    arr = arr / MOLS
+    # get moles/cm3 ( from molecules/cm3 ), then get mol/mol and remove cm3
+    # by dividing by mol/cm3
+    arr = unit_conversion_kernel(arr, 1. / (constants('AVG') * MOLS), out=out)
     return arr
 
 
+def get_trop_mask(t_ps=None, t_lvl=None, wd=None, ndim=4, trop_limit=False,
+                  masks4stratosphere=False, use_time_in_trop=True,
+                  multiply_method=True, nlevs=None, res='4x5', debug=False):
+    """
+    Get a compact weight (or boolean) array to select the troposphere
+
+    Parameters
+    ----------
+    t_ps (array): time in the troposphere diganostic ( float values 0 to 1 )
+    t_lvl (array): the model grid box level of the troposphere
+    wd (str): Specify the wd to get the results from a run.
+    ndim (int): number of dimensions of the arrays to be masked. If 3, the
+        time dimension (if present) is removed from the mask (i.e. averaged)
+    trop_limit (bool): limit output to "chemical troposphere" (level 38 )
+    masks4stratosphere (bool): select the stratosphere rather than troposphere
+    use_time_in_trop (bool): time a given box is in the troposphere
+        ( if use_time_in_trop=False, the level of the troposphere is used )
+    multiply_method (bool): return fractional weights rather than a boolean
+    nlevs (int): number of model levels (for use_time_in_trop=False)
+    res (str): resolution of the model input (e.g. 4x5, 2x2.5 )
+
+    Returns
+    -------
+    (np.array) of float weights (multiply_method) or a boolean array that is
+    True where values are kept (i.e. not masked)
+
+    Notes
+    -----
+     - The boolean array for the tropopause level is of shape
+        (lon, lat, lev, time) and is 8 times smaller than a float array.
+     - Apply with np.multiply (weights) or np.where and the "where" argument
+        of numpy reductions (boolean), see molec_weighted_avg.
+    """
+    # --- Get time tropopause diagnostic (if not given as argument)
+    if not isinstance(t_ps, np.ndarray) and use_time_in_trop:
+        t_ps = get_GC_output(wd, vars=['TIME_TPS__TIMETROP'],
+                             trop_limit=trop_limit)
+        if masks4stratosphere:
+            # Extend to all full atmosphere ( 47 levels )
+            a = list(get_dims4res(res))
+            a[-1] = 47-38
+            a = np.zeros(tuple(a+[t_ps.shape[-1]]))
+            t_ps = np.ma.concatenate((t_ps, a),  axis=-2)
+    # Get tropopause level (if not given as argument)
+    if not isinstance(t_lvl, np.ndarray) and (not use_time_in_trop):
+        t_lvl = get_GC_output(wd, vars=['TR_PAUSE__TP_LEVEL'],
+                              trop_limit=False)
+    # ---  Fractional time in trop. as weights
+    if multiply_method and use_time_in_trop:
+        # Invert values if masking troposphere
+        if masks4stratosphere:
+            t_ps = 1 - t_ps
+        # If 3D array with is given without a time dimension, average t_ps
+        if (ndim == 3) and (t_ps.ndim == ndim+1):
+            t_ps = t_ps.mean(axis=-1)
+        return np.ma.getdata(t_ps)
+    # --- Keep areas that are exclusively tropospheric (or stratospheric)
+    elif use_time_in_trop:
+        if masks4stratosphere:
+            keep = np.ma.getdata(t_ps) == 0
+        else:
+            keep = np.ma.getdata(t_ps) == 1
+    # ---  Compare model level numbers to tropopause level diagnostic values
+    else:
+        if isinstance(nlevs, type(None)):
+            nlevs = get_dims4res(res)[-1]
+        levels = np.arange(1, nlevs+1).reshape((1, 1, -1, 1))
+        t_lvl = np.ma.getdata(t_lvl)[:, :, None, :]
+        if masks4stratosphere:
+            keep = levels >= t_lvl
+        else:
+            keep = levels <= t_lvl
+    # Keep values that are kept at any point in time for 3D arrays
+    # (if the mask has a time dimension)
+    if (ndim == 3) and (keep.ndim == ndim+1):
+        keep = keep.any(axis=-1)
+    return keep
+
+
 def mask4troposphere(ars=[], wd=None, t_ps=None, trop_limit=False,
                      t_lvl=None, masks4stratosphere=False, use_time_in_trop=True,
-                     multiply_method=True, res='4x5', debug=False):
+                     multiply_method=True, fill_value=None, res='4x5',
+                     debug=False):
     """ Mask for the troposphere using either the time in troposphere
     diagnostic ( use_time_in_trop=True ) or troposphere level
     ( use_time_in_trop=False )
@@ -3471,8 +4038,8 @@ def mask4troposphere(ars=[], wd=None, t_ps=None, trop_limit=False,
      - definition of troposphere to use?
         - use_time_in_trop (bool): time a given box is in the troposphere
         ( if use_time_in_trop=False, the level of the troposphere is used )
-     - conbine_ars (bool): return arrays as a single array?
-     - month_eq (bool): convert units to monthly equiivlents.
+     - fill_value (float): value to set masked areas to, returning plain
+        (not masked) arrays (e.g. np.NaN)
      - res: resolution of the model input (e.g. 4x5, 2x2.5 )
 
     Returns
@@ -3490,79 +4057,39 @@ def mask4troposphere(ars=[], wd=None, t_ps=None, trop_limit=False,
         differential chemical equations are solved. Only these boxes (1st 38)
         are consdidered if trop_limit=True ( e.g. array shape is (72,46,38,12)
         instead of (72,46,47,12)
+     - The mask is made once (see get_trop_mask) and broadcast to the arrays
     """
     logging.info('mask4troposphere called for arr of shape: {},'.format(
         ars[0].shape))
     logging.debug('mask4troposphere - with multiply method?={}' +
                   ',use_time_in_trop={}, type of t_lvl&t_ps:{}&{}'.format(
                       multiply_method, use_time_in_trop, type(t_lvl), type(t_ps)))
-    # --- Get time tropopause diagnostic (if not given as argument)
-    if not isinstance(t_ps, np.ndarray) and use_time_in_trop:
-        t_ps = get_GC_output(wd, vars=['TIME_TPS__TIMETROP'],
-                             trop_limit=trop_limit)
-        if masks4stratosphere:
-            # Extend to all full atmosphere ( 47 levels )
-            a = list(get_dims4res(res))
-            a[-1] = 47-38
-            a = np.zeros(tuple(a+[t_ps.shape[-1]]))
-            t_ps = np.ma.concatenate((t_ps, a),  axis=-2)
-    # Get tropopause level (if not given as argument)
-    if not isinstance(t_lvl, np.ndarray) and (not use_time_in_trop):
-        t_lvl = get_GC_output(wd, vars=['TR_PAUSE__TP_LEVEL'],
-                              trop_limit=False)
+    mask = get_trop_mask(t_ps=t_ps, t_lvl=t_lvl, wd=wd, ndim=len(ars[0].shape),
+                         trop_limit=trop_limit,
+                         masks4stratosphere=masks4stratosphere,
+                         use_time_in_trop=use_time_in_trop,
+                         multiply_method=multiply_method,
+                         nlevs=ars[0].shape[2], res=res, debug=debug)
     # ---  Multiply by fractional time in trop. array
     if multiply_method and use_time_in_trop:
-        # Invert values if masking troposphere
-        if masks4stratosphere:
-            t_ps = 1 - t_ps
-        # If 3D array with is given without a time dimension, average t_ps
-        if len(ars[0].shape) == 3:
-            t_ps = t_ps.mean(axis=-1)
-        # Multiply fractional array by provided array
-        ars = [i*t_ps for i in ars]
-    # ---  Mask by fractional time in trop. array
-    elif (not multiply_method) and use_time_in_trop:
-        # Mask area that are not exclusively stratospheric
-        if masks4stratosphere:
-            # mask troposphere
-            t_ps = np.ma.masked_where(t_ps != 0, t_ps)
-        # Mask area that are not exclusively tropospheric
-        else:
-            t_ps = np.ma.masked_where(t_ps != 1, t_ps)
-    # ---  Mask using tropopause level diagnostic values
-    else:
-        # Setup dummy array with model numbers as values
-        t_ps = np.zeros(ars[0].shape)
-        logging.debug([i.shape for i in (t_ps, t_lvl, ars[0])])
-        for i, n in enumerate(range(1, ars[0].shape[-2]+1)):
-            t_ps[:, :, i, :] = n
-        if masks4stratosphere:
-            # mask where the levels are greater that the tropopause level
-            t_ps = np.ma.masked_where(t_ps < t_lvl[:, :, None, :], t_ps)
-        else:
-            # mask where the levels are greater that the tropopause level
-            t_ps = np.ma.masked_where(t_ps > t_lvl[:, :, None, :], t_ps)
+        return [i*mask for i in ars]
     # --- Set array mask to have strat mask (trop if masks4stratosphere=True)
-    if (not multiply_method):
-        for n, arr in enumerate(ars):
+    for n, arr in enumerate(ars):
+        try:
+            if isinstance(fill_value, type(None)):
+                ars[n] = np.ma.array(arr, mask=np.broadcast_to(~mask,
+                                                               arr.shape))
+            else:
+                ars[n] = np.where(mask, np.ma.getdata(arr), fill_value)
+        except ValueError:
+            # Log error
             log_str = 'Using multiply_method={}, use_time_in_trop={}'
-            logging.debug(log_str.format(multiply_method, use_time_in_trop))
-            try:
-                ars[n] = np.ma.array(arr, mask=t_ps.mask)
-            except:
-                if len(arr.shape) == 3:
-                    logging.debug('using tps averaged over time')
-                    # Apply mask
-                    ars[n] = np.ma.array(arr, mask=t_ps.mean(axis=-1).mask)
-                else:
-                    # Log error
-                    log_str = 'Using multiply_method={}, use_time_in_trop={}'
-                    log_str = log_str.format(multiply_method, use_time_in_trop)
-                    logging.debug(log_str)
-                    log_str = 'mask not applied for shapes',
-                    log_str += str([i.shape for i in (arr, t_ps)])
-                    logging.debug(log_str)
-                    sys.exit()
+            log_str = log_str.format(multiply_method, use_time_in_trop)
+            logging.debug(log_str)
+            log_str = 'mask not applied for shapes',
+            log_str += str([i.shape for i in (arr, mask)])
+            logging.debug(log_str)
+            sys.exit()
     return ars
 
 
@@ -3597,7 +4124,7 @@ def convert_molec_cm3_s_2_g_X_s(ars=None, specs=None, ref_spec=None,
                                 multiply_method=True, use_time_in_trop=True,
                                 conbine_ars=True,
                                 month_eq=False, limit_Prod_loss_dim_to=38,
-                                verbose=False,  debug=False):
+                                out=None, verbose=False,  debug=False):
     """
     Convert molec/cm3/s to g/grid box. This is used for converting prod/loss
     output units
@@ -3616,6 +4143,8 @@ def convert_molec_cm3_s_2_g_X_s(ars=None, specs=None, ref_spec=None,
     month_eq (bool): convert units to monthly equiivlents.
     limit_Prod_loss_dim_to (int): level to cut off arrays at
      (38 in <v10, 59 in >=v11-1)
+    out (array): array to write the converted (species, lon, lat, lev, time)
+     stack to, if ars is given as a stacked array
 
     Returns
     -------
@@ -3628,6 +4157,8 @@ def convert_molec_cm3_s_2_g_X_s(ars=None, specs=None, ref_spec=None,
      - All functions that use "get_pl_in_Gg" should be updated to use this
      - It is most efficency to provide shared variables as arguements if this
         function is call more that once by a single driver
+     - ars can also be given as a stacked array (species, lon, lat, lev, time)
+        which is then converted in a single pass
     """
     logging.info('convert_molec_cm3_s_2_g_X_s called')
     # --- Extract core model variables not provide
@@ -3642,19 +4173,24 @@ def convert_molec_cm3_s_2_g_X_s(ars=None, specs=None, ref_spec=None,
                             debug=debug)
         logging.info('WARNING: extracting volume online - inefficent')
     logging.debug([(i.sum(), i.shape) for i in ars])
-    # --- loop spec ars
-    for n, arr in enumerate(ars):
-        # convert from molec/cm3/s to  molec/s
-        # limit arrays to the region of the atmosphere in which prod/loss is
-        # calculated (38 in <v10, 59 in >=v11-1)
-        arr = arr[..., :limit_Prod_loss_dim_to, :] * \
-            vol[..., :limit_Prod_loss_dim_to, :]
-        # conver to to molec/s = > Gg/s
-        arr = arr / constants('AVG') * species_mass(ref_spec)
-        # to / yr
-        if month_eq:
-            day_adjust = secs_in_month(months, years)
-            ars[n] = arr * day_adjust
+    # --- Get the conversion factor shared by all species
+    # convert from molec/cm3/s to  molec/s
+    # limit arrays to the region of the atmosphere in which prod/loss is
+    # calculated (38 in <v10, 59 in >=v11-1)
+    factor = vol[..., :limit_Prod_loss_dim_to, :]
+    # conver to to molec/s = > Gg/s
+    factor = factor / constants('AVG') * species_mass(ref_spec)
+    # to / yr
+    if month_eq:
+        factor = factor * secs_in_month(months, years)
+    # --- convert all species in one pass if stacked, else loop spec ars
+    if isinstance(ars, np.ndarray):
+        ars = unit_conversion_kernel(
+            ars[..., :limit_Prod_loss_dim_to, :], factor, out=out)
+        ars = list(ars)
+    else:
+        ars = [unit_conversion_kernel(i[..., :limit_Prod_loss_dim_to, :],
+                                      factor) for i in ars]
     logging.debug([(i.sum(), i.shape) for i in ars])
     # only consider troposphere ( update this to use mask4troposphere )
     if rm_strat:
@@ -3890,8 +4426,232 @@ def get_default_variable_dict(wd=None,
     return Var_rc
 
 
+def get_shared_data_lon_lat(Var_rc, Data_rc):
+    """ Get lon and lat for shared data dictionary """
+    lon, lat, NIU = get_latlonalt4res(res=Data_rc['res'], wd=Var_rc['wd'],
+                                      full_vertical_grid=Var_rc['full_vertical_grid'],
+                                      filename=Var_rc['filename'])
+    return lon, lat
+
+
+def get_shared_data_n_air(Var_rc, Data_rc):
+    """ Get N in air [molec air/m3] for shared data dictionary """
+    # variable name has just changed in v11
+    n_air = get_number_density_variable(wd=Var_rc['wd'],
+                                        trop_limit=Var_rc['trop_limit'])
+    # Kludge! - restrict length of array to main wd.
+    return n_air[..., :Data_rc['vol'].shape[-1]]
+
+
+def get_shared_data_molecs(Var_rc, Data_rc):
+    """ Calculate molecules per grid box - [molec air] """
+    # (Note: volumne ('vol') is converted from [m^3] to [cm^3] concurrently)
+    molecs = Data_rc['n_air'] * Data_rc['vol']/1E6
+    # limit shape of array to prod/loss size (59 or 38)
+    # Only if troposphere only run (with trop_limit=True) or
+    # limit_vertical_dim=True
+    if Var_rc['limit_vertical_dim'] or Var_rc['trop_limit']:
+        molecs = molecs[..., :Var_rc['limit_Prod_loss_dim_to'], :]
+    return molecs
+
+
+def get_shared_data_alt(Var_rc, Data_rc):
+    """ Get altitude (km) for shared data dictionary """
+    alt = gchemgrid('c_km_geos5')
+    if Var_rc['trop_limit']:
+        alt = alt[:Var_rc['limit_Prod_loss_dim_to']]
+    elif (Data_rc['output_vertical_grid'] == 'Full_72') and \
+            (Var_rc['limit_vertical_dim']):
+        alt = alt[:Var_rc['limit_Prod_loss_dim_to']]
+    return alt
+
+
+def get_shared_data_tracers(Var_rc, Data_rc):
+    """ Get tracer names (aka those included in IJ_AVG_S__ diagnostic) """
+    with NetCDF_read_lock:
+        d = get_NetCDF_handle(Var_rc['wd']+Var_rc['filename'])
+        tracers = [i for i in d.variables if ('IJ_AVG_S__' in i)]
+    return [i.split('IJ_AVG_S__')[-1] for i in tracers]
+
+
+# Registry of variables for get_shared_data_as_dict. For each variable name:
+# (variables it depends on, function of (Var_rc, Data_rc) to get it, whether
+# it can be read concurrently with other variables)
+shared_data_registry = {
+    'res': ([], lambda V, D: get_gc_res(wd=V['wd'], filename=V['filename']),
+            False),
+    'ver': ([], lambda V, D: iGEOSChem_ver(V['wd']), False),
+    'GC_version': ([], lambda V, D: iGEOSChem_ver(
+        V['wd'], also_return_GC_version=True)[1], False),
+    'output_vertical_grid': ([], lambda V, D: check_output_vertical_grid(
+        wd=V['wd'], filename=V['filename']), False),
+    # A reference 4x5 dir that has all generic output (e.g. N/AIR.)
+    'generic_4x5_wd': ([], lambda V, D:
+                       '/work/home/ts551/data/all_model_simulations/' +
+                       'iodine_runs/iGEOSChem_3.0_v10/run/', False),
+    'months': ([], lambda V, D: get_gc_months(wd=V['wd'],
+                                              filename=V['filename']), False),
+    'years': ([], lambda V, D: get_gc_years(wd=V['wd'],
+                                            filename=V['filename']), False),
+    'datetimes': ([], lambda V, D: get_gc_datetime(wd=V['wd'],
+                                                   filename=V['filename']),
+                  False),
+    'output_freq': (['datetimes'], lambda V, D: get_frequency_of_model_output(
+        wd=V['wd'], filename=V['filename'], datetimes=D['datetimes']), False),
+    # Surface area (m^2)
+    's_area': (['res'], lambda V, D: get_surface_area(D['res']), True),
+    # Volume (cm^3)
+    'vol': (['res', 's_area'], lambda V, D: get_volume_np(
+        wd=V['wd'], trop_limit=V['trop_limit'], s_area=D['s_area'][..., None],
+        res=D['res']), True),
+    # Time in troposphere diagnostic (fraction)
+    't_ps': ([], lambda V, D: get_GC_output(V['wd'],
+                                            vars=['TIME_TPS__TIMETROP'],
+                                            trop_limit=V['trop_limit']), True),
+    # N in air [molec air/m3]
+    'n_air': (['vol'], get_shared_data_n_air, True),
+    # Pressure ( in hPa )
+    'hPa': ([], lambda V, D: get_GC_output(wd=V['wd'],
+                                           vars=['PEDGE_S__PSURF']), True),
+    # Molecules per grid box - [molec air]
+    'molecs': (['n_air', 'vol'], get_shared_data_molecs, False),
+    # Air mass ("a_m")
+    'a_m': ([], lambda V, D: get_air_mass_np(wd=V['wd'],
+                                             trop_limit=V['trop_limit']),
+            True),
+    'alt': (['output_vertical_grid'], get_shared_data_alt, False),
+    'lon': (['res'], lambda V, D: get_shared_data_lon_lat(V, D)[0], False),
+    'lat': (['res'], lambda V, D: get_shared_data_lon_lat(V, D)[1], False),
+    'tracers': ([], get_shared_data_tracers, False),
+    # Dictionary for converting between planeflight and input.geos names
+    'tracers2planeflight': ([], lambda V, D:
+                            get_dict_of_tracers2planeflight_IDs(wd=V['wd']),
+                            False),
+}
+
+
+class LazyDataDict(dict):
+    """
+    Dictionary of (shared) model data, with values extracted on first access
+
+    Notes
+    -----
+     - Values are extracted (with any variables they depend on) using the
+     functions in shared_data_registry.
+     - Variables that can be read concurrently (e.g. t_ps, n_air, a_m) are
+     extracted in parallel threads when requested together (see prefetch).
+     - If "shared" is given, the dictionary is a copy-on-write view of it.
+     Values are extracted into (and taken from) the shared dictionary, but
+     values set or deleted only change the view. The arrays themselves are
+     shared, so should not be modified in place.
+     - Only the variables already extracted are included in "in", len() and
+     keys() etc, but get() extracts variables in shared_data_registry.
+    """
+
+    def __init__(self, Var_rc, data={}, n_workers=4, shared=None):
+        dict.__init__(self, data)
+        self.Var_rc = Var_rc
+        self.n_workers = n_workers
+        self.shared = shared
+        self.lock = threading.RLock()
+
+    def __missing__(self, key):
+        if key not in shared_data_registry:
+            raise KeyError('{} not in shared_data_registry'.format(key))
+        self.prefetch([key])
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def prefetch(self, keys):
+        """
+        Extract variables (and their dependencies) not already extracted
+        """
+        import concurrent.futures
+        # Extract into the shared dictionary, and just add the values to view
+        if not isinstance(self.shared, type(None)):
+            self.shared.n_workers = self.n_workers
+            self.shared.prefetch([i for i in keys if i not in self])
+            with self.lock:
+                for key in keys:
+                    if key not in self:
+                        dict.__setitem__(self, key,
+                                         dict.__getitem__(self.shared, key))
+            return
+        with self.lock:
+            # Get all the variables needed, inc. dependencies
+            needed = set()
+            to_check = list(keys)
+            while len(to_check) > 0:
+                key = to_check.pop()
+                if (key in self) or (key in needed):
+                    continue
+                if key not in shared_data_registry:
+                    raise KeyError('{} not in shared_data_registry'.format(key))
+                needed.add(key)
+                to_check += shared_data_registry[key][0]
+            # Extract in turns, once the variables depended on are present
+            while len(needed) > 0:
+                ready = [i for i in sorted(needed) if
+                         all([j in self for j in shared_data_registry[i][0]])]
+                concurrent_ = [i for i in ready if shared_data_registry[i][2]]
+                if (len(concurrent_) > 1) and (self.n_workers > 1):
+                    logging.info('Extracting {} concurrently'.format(
+                        concurrent_))
+                    n_workers = min(self.n_workers, len(concurrent_))
+                    with concurrent.futures.ThreadPoolExecutor(n_workers) as ex:
+                        futures = dict([(i, ex.submit(
+                            shared_data_registry[i][1], self.Var_rc, self))
+                            for i in concurrent_])
+                        for key, future in futures.items():
+                            dict.__setitem__(self, key, future.result())
+                    ready = [i for i in ready if i not in concurrent_]
+                for key in ready:
+                    logging.debug('Extracting {}'.format(key))
+                    dict.__setitem__(self, key, shared_data_registry[key][1](
+                        self.Var_rc, self))
+                needed -= set(ready + concurrent_)
+
+
+# Shared data dictionary for each output file, with the analysis settings and
+# file modification time it is for (see get_shared_data_as_dict)
+shared_data_cache = {}
+
+
+def clear_shared_data_cache(wd=None, filename=None):
+    """
+    Remove the shared data dictionaries kept by get_shared_data_as_dict
+
+    Parameters
+    ----------
+    wd (str): only remove the dictionary for this working directory
+    filename (str): name of the output file in wd (default: all in wd)
+
+    Returns
+    -------
+    (None)
+    """
+    if isinstance(wd, type(None)):
+        shared_data_cache.clear()
+        return
+    for fname in list(shared_data_cache):
+        if isinstance(filename, type(None)):
+            remove = os.path.normpath(os.path.dirname(fname)) == \
+                os.path.normpath(wd)
+        else:
+            remove = os.path.normpath(fname) == \
+                os.path.normpath(os.path.join(wd, filename))
+        if remove:
+            del shared_data_cache[fname]
+
+
 def get_shared_data_as_dict(Var_rc=None, var_list=[],
-                            full_vertical_grid=False, Data_rc={}):
+                            full_vertical_grid=False, Data_rc=None,
+                            lazy=True, n_workers=4):
     """
     Returns (requested) common vairables as a dictionary object. Give requested
     variables as a list of strings ("var_list").
@@ -3902,127 +4662,60 @@ def get_shared_data_as_dict(Var_rc=None, var_list=[],
     Data_rc (dict): dictionary containing model data (default intiallised empty)
     var_list (list): list of names (strings) of variables to extract
     full_vertical_grid (bool): usings all levels of grid (e.g. 72 or 47)
+    lazy (bool): only extract variables when they are first accessed
+    n_workers (int): number of threads to read (independent) variables with
 
     Returns
     ----
     (dict)
+
+    Notes
+    -----
+     - Variables (and what they depend on) are set in shared_data_registry
+     - The data extracted is shared by later calls with the same working
+     directory and Var_rc settings (until the output file is modified), so
+     variables are only extracted once. Each call returns its own
+     (copy-on-write) view of this data (see LazyDataDict). Only the data for
+     the latest settings and output file are kept for each working directory,
+     and can be removed with clear_shared_data_cache.
+     - With lazy=True, the dictionary only contains the variables accessed
+     so far (e.g. for "in" and keys()).
+     - With lazy=False, all the variables in var_list (and the basic variables
+     'res', 'ver', 'GC_version' and 'output_vertical_grid') are extracted
+     before returning.
     """
     # Use default variable dictionary if non given
     if isinstance(Var_rc, type(None)):
         Var_rc = get_default_variable_dict(
             full_vertical_grid=full_vertical_grid)
-    # --- Extract basic variables by default
-    # Resolution?
-    Data_rc['res'] = get_gc_res(wd=Var_rc['wd'], filename=Var_rc['filename'])
-    # Version?
-    iGC_ver, GC_version = iGEOSChem_ver(Var_rc['wd'],
-                                        also_return_GC_version=True)
-    Data_rc['ver'] = iGC_ver
-    Data_rc['GC_version'] = GC_version
-    # Model output vertical grid - write this!
-#    if 'output_vertical_grid' in var_list:
-    Data_rc['output_vertical_grid'] = check_output_vertical_grid(
-        wd=Var_rc['wd'], filename=Var_rc['filename'])
-    # ---  Now add specifically requested variables?
-    # Add a reference 4x5 dir that has all generic output (e.g. N/AIR.)
-    if 'generic_4x5_wd' in var_list:
-        generic_4x5_wd = '/work/home/ts551/data/all_model_simulations/iodine_runs/'
-        generic_4x5_wd += 'iGEOSChem_3.0_v10/run/'
-        Data_rc['generic_4x5_wd'] = generic_4x5_wd
-    # Months?
-    if 'months' in var_list:
-        Data_rc['months'] = get_gc_months(wd=Var_rc['wd'],
-                                          filename=Var_rc['filename'])
-    # Years?
-    if 'years' in var_list:
-        Data_rc['years'] = get_gc_years(wd=Var_rc['wd'],
-                                        filename=Var_rc['filename'])
-    # Datetime?
-    if 'datetimes' in var_list:
-        Data_rc['datetimes'] = get_gc_datetime(wd=Var_rc['wd'],
-                                               filename=Var_rc['filename'])
-    # Model output frequency?
-    if 'output_freq' in var_list:
-        Data_rc['output_freq'] = get_frequency_of_model_output(
-            wd=Var_rc['wd'], filename=Var_rc['filename'],
-            datetimes=Data_rc['datetimes'], )
-    # Surface area (m^2)
-    dependacies_for_this_var = ['vol']
-    if ('s_area' in var_list) or (dependacies_for_this_var in var_list):
-        Data_rc['s_area'] = get_surface_area(Data_rc['res'])
-    # Volume (cm^3)
-    if 'vol' in var_list:
-        assert_str = "please add 's_area' to var_rc (dependent)"
-        assert ('s_area' in var_list), assert_str
-        Data_rc['vol'] = get_volume_np(wd=Var_rc['wd'],
-                                       trop_limit=Var_rc['trop_limit'],
-                                       s_area=Data_rc['s_area'][..., None],
-                                       res=Data_rc['res'])
-    # Get time in troposphere diagnostic (fraction)
-    if 't_ps' in var_list:
-        Data_rc['t_ps'] = get_GC_output(Var_rc['wd'],
-                                        vars=['TIME_TPS__TIMETROP'],
-                                        trop_limit=Var_rc['trop_limit'])
-    # Get N in air [molec air/m3]
-    if 'n_air' in var_list:
-        # variable name has just changed in v11
-        Data_rc['n_air'] = get_number_density_variable(wd=Var_rc['wd'],
-                                                       trop_limit=Var_rc['trop_limit'])
-        # Kludge! - restrict length of array to main wd.
-        Data_rc['n_air'] = Data_rc['n_air'][..., :Data_rc['vol'].shape[-1]]
-    # Pressure ? ( in hPa )
-    if 'hPa' in var_list:
-        Data_rc['hPa'] = get_GC_output(wd=Var_rc['wd'],
-                                       vars=['PEDGE_S__PSURF'])
-    # Calculate molecules per grid box - [molec air]
-    if 'molecs' in var_list:
-        # (Note: volumne ('vol') is converted from [m^3] to [cm^3] concurrently)
-        Data_rc['molecs'] = Data_rc['n_air'] * Data_rc['vol']/1E6
-        # limit shape of array to prod/loss size (59 or 38)
-        # Only if troposphere only run (with trop_limit=True) or
-        # limit_vertical_dim=True
-        if Var_rc['limit_vertical_dim'] or Var_rc['trop_limit']:
-            Data_rc['molecs'] = Data_rc['molecs'][...,
-                                                  :Var_rc['limit_Prod_loss_dim_to'], :]
-    # Air mass? ("a_m")
-    if 'a_m' in var_list:
-        Data_rc['a_m'] = get_air_mass_np(wd=Var_rc['wd'],
-                                         trop_limit=Var_rc['trop_limit'])
-    # Altitude?
-    if 'alt' in var_list:
-        # Get altitude
-        Data_rc['alt'] = gchemgrid('c_km_geos5')
-        if Var_rc['trop_limit']:
-            Data_rc['alt'] = Data_rc['alt'][:Var_rc['limit_Prod_loss_dim_to']]
-        elif (Data_rc['output_vertical_grid'] == 'Full_72') and \
-                (Var_rc['limit_vertical_dim']):
-            Data_rc['alt'] = Data_rc['alt'][:Var_rc['limit_Prod_loss_dim_to']]
-    # Latitude (lat) and longitude (lon)?
-    if ('lon' in var_list) or ('lat' in var_list):
-        # Why is this variable extracted from an offline dictionary?
-        # UPDATE to use NetCDF coordinate variable.
-        lon, lat, NIU = get_latlonalt4res(res=Data_rc['res'], wd=Var_rc['wd'],
-                                          full_vertical_grid=Var_rc['full_vertical_grid'],
-                                          filename=Var_rc['filename'])
-        Data_rc['lon'] = lon
-        Data_rc['lat'] = lat
-    # Tracer names? (aka those included in IJ_AVG_S__ diagnostic )
-    if 'tracers' in var_list:
-        with Dataset(Var_rc['wd']+Var_rc['filename'], 'r') as d:
-            tracers = [i for i in d.variables if ('IJ_AVG_S__' in i)]
-            tracers = [i.split('IJ_AVG_S__')[-1] for i in tracers]
-            Data_rc['tracers'] = tracers
-    # Add a dictionary for converting between planeflight and input.geos names
-    if 'tracers2planeflight' in var_list:
-        Data_rc['tracers2planeflight'] = get_dict_of_tracers2planeflight_IDs(
-            wd=Var_rc['wd'])
-    # Check all requested variables were extract? or call stop...
-    vars_not_extracted = [i for i in var_list if i not in list(Data_rc.keys())]
-    if len(vars_not_extracted) > 0:
-        err_msg = 'NOT ALL VARS extracted! ({})'.format(vars_not_extracted)
-        print(err_msg)
-        logging.info(err_msg)
-        sys.exit()
+    # Check all requested variables can be extracted
+    vars_not_known = [i for i in var_list if i not in shared_data_registry]
+    if len(vars_not_known) > 0:
+        err_msg = 'Variables not in shared_data_registry: {}'.format(
+            vars_not_known)
+        logging.error(err_msg)
+        raise ValueError(err_msg)
+    # Reuse the dictionary for this working directory (and settings)
+    if isinstance(Data_rc, type(None)):
+        fname = Var_rc['wd']+Var_rc['filename']
+        mtime = None
+        if os.path.exists(fname):
+            mtime = os.path.getmtime(fname)
+        key = repr((sorted(Var_rc.items()), mtime))
+        # Replace the data for other settings or older files
+        if (fname not in shared_data_cache) or \
+                (shared_data_cache[fname][0] != key):
+            shared_data_cache[fname] = (key, LazyDataDict(Var_rc,
+                                                          n_workers=n_workers))
+        Data_rc = LazyDataDict(Var_rc, n_workers=n_workers,
+                               shared=shared_data_cache[fname][1])
+    else:
+        Data_rc = LazyDataDict(Var_rc, Data_rc, n_workers=n_workers)
+    Data_rc.n_workers = n_workers
+    # Extract all the requested variables now?
+    if not lazy:
+        basic_vars = ['res', 'ver', 'GC_version', 'output_vertical_grid']
+        Data_rc.prefetch(basic_vars + list(var_list))
     return Data_rc
 
 
@@ -4157,6 +4850,7 @@ def process_bpch_files_in_dir2NetCDF(bpch_file_type="*tra*avg*",
                                      split_by_month=False, mk_single_file=True,
                                      mk_monthly_files=False,
                                      mk_weekly_files=False,
+                                     n_workers=1, max_mem_per_worker=None,
                                      verbose=True):
     """
     Wrapper function to process ctm bpch files in folder to NetCDF file(s)
@@ -4172,6 +4866,8 @@ def process_bpch_files_in_dir2NetCDF(bpch_file_type="*tra*avg*",
     split_by_month (bool): split new NetCDF file by month? (post making file)
     mk_monthly_files (bool): make a NetCDF per month of files
     mk_weekly_files (bool): make a NetCDF per week of files
+    n_workers (int): number of processes to convert monthly/weekly files with
+    max_mem_per_worker (float): memory limit (GB) per process (None=no limit)
 
     Returns
     -------
@@ -4179,9 +4875,12 @@ def process_bpch_files_in_dir2NetCDF(bpch_file_type="*tra*avg*",
 
     Notes
     -------
+     - With n_workers > 1, the monthly/weekly files are converted in parallel
+     and then merged into a single file a variable at a time.
     """
     logging.info('process_bpch_files_in_dir2NetCDF called for:', locals())
-    from .bpch2netCDF import convert_to_netCDF
+    from .bpch2netCDF import convert_to_netCDF, convert_to_netCDF_in_parallel
+    from .bpch2netCDF import merge_NetCDF_files_along_time
     import os
     import sys
     import time
@@ -4224,6 +4923,8 @@ def process_bpch_files_in_dir2NetCDF(bpch_file_type="*tra*avg*",
         df.index = time2datetime(intial_ts)
         df['month'] = df.index.month
         df['woy'] = df.index.weekofyear
+        # List of conversions (arguments for convert_to_netCDF) to make
+        jobs = []
         # Make files by month?
         if mk_monthly_files:
             for year in list(sorted(set(df.index.year))):
@@ -4238,12 +4939,10 @@ def process_bpch_files_in_dir2NetCDF(bpch_file_type="*tra*avg*",
                     filename4month += '_{}_{:0>2}.nc'.format(year, month)
                     if verbose:
                         print((filename4month, df_month_tmp.shape))
-                    # Convert to NetCDF all files to a single NetCDF
-                    convert_to_netCDF(folder=folder, filename=filename4month,
-                                      bpch_file_list=bpch_file_list,
-                                      bpch_file_type=bpch_file_type)
-                    # Run garbage collection
-                    gc.collect()
+                    # Save conversion of these files to a single NetCDF
+                    jobs += [dict(folder=folder, filename=filename4month,
+                                  bpch_file_list=bpch_file_list,
+                                  bpch_file_type=bpch_file_type)]
         # Make files by week of year?
         elif mk_weekly_files:
             for year in list(sorted(set(df.index.year))):
@@ -4258,25 +4957,27 @@ def process_bpch_files_in_dir2NetCDF(bpch_file_type="*tra*avg*",
                     filename4week += '_{}_WOY_{:0>2}.nc'.format(year, week)
                     if verbose:
                         print((filename4week, df_week_tmp.shape))
-                    # Convert to NetCDF all files to a single NetCDF
-                    convert_to_netCDF(folder=folder, filename=filename4week,
-                                      bpch_file_list=bpch_file_list,
-                                      bpch_file_type=bpch_file_type)
-                    # run garbage collection
-                    gc.collect()
+                    # Save conversion of these files to a single NetCDF
+                    jobs += [dict(folder=folder, filename=filename4week,
+                                  bpch_file_list=bpch_file_list,
+                                  bpch_file_type=bpch_file_type)]
+        # Convert the files for each month/week
+        if n_workers > 1:
+            ncfiles = convert_to_netCDF_in_parallel(
+                jobs=jobs, n_workers=n_workers,
+                max_mem_per_worker=max_mem_per_worker)
+        else:
+            ncfiles = []
+            for job in jobs:
+                convert_to_netCDF(**job)
+                ncfiles += [os.path.join(job['folder'], job['filename'])]
+                # Run garbage collection
+                gc.collect()
         # Re-combine the split files into one file
         if mk_single_file:
-            ncfiles = list(sorted(glob.glob(folder+'ts_ctm_*.nc')))
-            # Open files with xarray
-#            ds_l = [xr.open_dataset(i) for i in ncfiles]
-            # Make sure the time dimension is unlimitetd
-#            ds = xr.concat(ds_l, dim='time')
-            ds = xr.open_mfdataset(ncfiles, concat_dim='time')
-            # Now save the combined file
-            ds.to_netcdf(folder+filename,
-                         unlimited_dims={'time_counter': True})
-            # Remove from memory
-            del ds
+            # Append the files in time order a variable at a time
+            merge_NetCDF_files_along_time(files=ncfiles,
+                                          output_file=folder+filename)
             # TODO: Now delete monthly files?
     # Convert files on bulk
     elif mk_single_file:
@@ -4462,24 +5163,9 @@ def get_model_run_stats(wd=None, file_type='*geos.log*', debug=False):
     # Get log files
     logging.debug('get_model_run_stats called for wd={}'.format(wd))
     # --- Find all geos log files in directory...
-    files = glob.glob(wd+'/'+file_type)
-    if len(files) < 1:
-        err_str = 'WARNING! - no files found (assuming type={})'
-        logging.info(err_str.format(file_type))
-        print(err_str.format(file_type))
-        files = glob.glob(wd+'/logs/'+file_type)
-        if len(files) < 1:
-            err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-            logging.info(err_str.format(file_type))
-            # try
-            file_type = 'log.*'
-            files = glob.glob(wd+'/logs/'+file_type)
-            print('Loooking for {} files instead'.format(file_type))
-            if len(files) < 1:
-                err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-                logging.info(err_str.format(file_type))
+    files = get_geos_log_files(wd=wd, file_type=file_type)
     # --- If there are any, then
-    if len(files) > 1:
+    if len(files) > 0:
         # Define some variable names
         Rstart = 'Real Start'
         Rend = 'Real End'
@@ -4488,42 +5174,20 @@ def get_model_run_stats(wd=None, file_type='*geos.log*', debug=False):
         Mtime = 'Model time (days)'
         Rtime = 'Real time (hours)'
         vars4df = [Rstart, Rend, Mend, Mstart, ]
-        # Loop and extract OH means, take an average if n>0
+        keys = vars4df + [Mtime, Rtime]
+        df = pd.DataFrame(index=keys)
+        # Loop and extract run times
         filenames = [i.split('/')[-1] for i in files]
+        records = get_geos_log_records(files=files)
         for n_file, file in enumerate(files):
-            d = {}
-            with open(file) as f:
-                if debug:
-                    print((file, f))
-                for line in f:
-                    if '=> SIMULATION ' in line:
-                        date = line.split('TIME:')[1][:-5].strip()
-                        date = time.strptime(date, '%Y/%m/%d %H:%M')
-                        if 'START' in line:
-                            d[Rstart] = time2datetime([date])[0]
-                        if 'END' in line:
-                            d[Rend] = time2datetime([date])[0]
-                    elif 'Start time of run' in line:
-                        sdate = line[30:].strip()
-                        sdate = time.strptime(sdate, '%Y%m%d %H%M%S')
-                        d[Mstart] = time2datetime([sdate])[0]
-                    elif 'End time of run' in line:
-                        edate = line[30:].strip()
-                        edate = time.strptime(edate, '%Y%m%d %H%M%S')
-                        d[Mend] = time2datetime([edate])[0]
-                if all([i in d.keys() for i in vars4df]):
-                    # Add differences
-                    d[Mtime] = (d[Mend]-d[Mstart]
-                                ).total_seconds() / 60 / 60 / 24
-                    d[Rtime] = (d[Rend]-d[Rstart]).total_seconds() / 60 / 60
-                    # keys
-                    keys = vars4df + [Mtime, Rtime]
-                    try:
-                        df[filenames[n_file]] = [d[i] for i in keys]
-                    except:
-                        df = pd.DataFrame(index=keys)
-                else:
-                    print('Exc. incomplete file: {}'.format(filenames[n_file]))
+            d = dict(records[file]['timing'])
+            if all([i in d.keys() for i in vars4df]):
+                # Add differences
+                d[Mtime] = (d[Mend]-d[Mstart]).total_seconds() / 60 / 60 / 24
+                d[Rtime] = (d[Rend]-d[Rstart]).total_seconds() / 60 / 60
+                df[filenames[n_file]] = [d[i] for i in keys]
+            else:
+                print('Exc. incomplete file: {}'.format(filenames[n_file]))
         # - Now calculate some stats
         df = df.T
         # Get average times
@@ -4544,40 +5208,49 @@ def get_model_run_stats(wd=None, file_type='*geos.log*', debug=False):
         sys.exit()
 
 
-def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='', REF1=None,
-                                          REF2=None, REF_wd=None, res='4x5',
-                                          trop_limit=True,
-                                          save2csv=True, prefix='GC_', run_names=None,
-                                          extra_burden_specs=['NIT', 'NITs'],
-                                          extra_surface_specs=['NIT', 'NITs'],
-                                          GC_version='v11-02d',
-                                          debug=False):
+# Fields shared by all runs in get_general_stats4run_dict_as_df_bpch
+# (set in each worker process by set_general_stats_shared_data)
+general_stats_shared_data = {}
+
+
+def set_general_stats_shared_data(shared):
+    """ Set fields shared by all runs (in a worker process) """
+    general_stats_shared_data.clear()
+    general_stats_shared_data.update(shared)
+
+
+def get_general_stats4run_bpch4pool(args):
+    """ Wrapper of get_general_stats4run_bpch for use with multiprocessing """
+    run_name, wd, kwargs = args
+    run_stats = get_general_stats4run_bpch(
+        wd=wd, shared=general_stats_shared_data, **kwargs)
+    return run_name, run_stats
+
+
+def get_general_stats4run_bpch(wd=None, shared=None, res='4x5',
+                               extra_burden_specs=['NIT', 'NITs'],
+                               extra_surface_specs=['NIT', 'NITs'],
+                               GC_version='v11-02d', debug=False):
     """
-    Get various stats on a set of runs in a dictionary ({name: location})
+    Get various stats (burdens, surface conc., Ox budget, OH, CH4 lifetime)
+    for a single run
 
     Parameters
     ----------
-    run_dict (dict): dicionary of run names and locations
-    run_names (list): provide the names of run_dict keys to order df index
-    REF_wd (str): name of run in dictionary to use to extract shared variables
-    REF1 (str): name of (1st) run in dictionary to to % change calculations from
-    REF2 (str): name of (2nd) run in dictionary to to % change calculations from
-    prefix (str):  string to include as a prefix in saved csv's filename
-    extra_str (str):  string to include as a suffx in saved csv's filename
-    save2csv (bool): save dataframe as a csv file
-    trop_limit (bool): limit analysis to the troposphere?
+    wd (str): Specify the wd to get the results from a run.
+    shared (dict): fields shared by runs (t_p, K, a_m, s_area and vol)
     extra_burden_specs (list): list of extra species to give trop. burden stats on
     extra_surface_specs (list): list of extra species to give surface conc. stats on
     res (str): resolution of the modul output (e.g. 4x5, 2x2.5, 0.125x0.125)
+    GC_version (str): GEOS-Chem version (for Ox prod./loss tags)
+    debug (bool): legacy debug option, replaced by python logging
 
     Returns
     -------
-    (pd.DataFrame)
+    (pd.Series)
     """
-    # Extract names and locations of data
-    if isinstance(run_names, type(None)):
-        run_names = sorted(run_dict.keys())
-    wds = [run_dict[i] for i in run_names]
+    t_p, K, a_m = shared['t_p'], shared['K'], shared['a_m']
+    s_area, vol = shared['s_area'], shared['vol']
     # Mass unit scaling
     mass_scale = 1E3
     mass_unit = 'Tg'
@@ -4586,136 +5259,177 @@ def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='', REF1=None
     ppbv_scale = 1E9
     pptv_unit = 'pptv'
     pptv_scale = 1E12
-    # Get shared variables from a single model run
-    if isinstance(REF_wd, type(None)):
-        REF_wd = wds[0]
-    # Get time in the troposphere diagnostic (for splitting off data above tropopause)
-    t_p = get_GC_output(wd=REF_wd, vars=[u'TIME_TPS__TIMETROP'],
-                        trop_limit=True)
-    # Temperature
-    K = get_GC_output(wd=REF_wd, vars=[u'DAO_3D_S__TMPU'], trop_limit=True)
-    # Airmass within grid boxes
-    a_m = get_air_mass_np(wd=REF_wd, trop_limit=True)
-    # Surface area
-    s_area = get_surface_area(res)[..., 0]  # m2 land map
-    # volume
-    vol = get_volume_np(wd=REF_wd, res=res)
-    #
-    # --- Now add analysis values into a pd.DataFrame
-    # -- Tropospheric burdens?
-    # Get tropospheric burden for run
-    varname = 'O3 burden ({})'.format(mass_unit)
-    ars = [get_O3_burden_bpch(i, t_p=t_p, res=res).sum() for i in wds]
-    df = pd.DataFrame(ars, columns=[varname], index=run_names)
-
-    # Get other core species
+    run_stats = collections.OrderedDict()
+    # -- Tropospheric burdens (for all species in one pass)
     core_burden_specs = [
         'NO', 'NO2', 'N2O5'
     ]
-    # Loop and add core species.
+    burdens = get_trop_burdens4specs(
+        ['O3']+core_burden_specs+extra_burden_specs, wd=wd, t_p=t_p,
+        a_m=a_m, summate=True, res=res)
+    varname = 'O3 burden ({})'.format(mass_unit)
+    run_stats[varname] = burdens['O3']
+    # Get other core species
     for spec in core_burden_specs+extra_burden_specs:
         varname = '{} burden ({})'.format(spec, mass_unit)
         ref_spec = get_ref_spec(spec)
-        # get arrrays
-        ars = [get_trop_burden(spec=spec, t_p=t_p, wd=i, all_data=False, res=res).sum()
-               for i in wds]
+        burden = burdens[spec]
         # convert to N equivalent
-        ars = [i/species_mass(spec)*species_mass(ref_spec) for i in ars]
-        df[varname] = ars
-
+        run_stats[varname] = burden/species_mass(spec)*species_mass(ref_spec)
     # - Now add familes...
-    # Get NOx burden
-    NO2_varname = 'NO2 burden ({})'.format(mass_unit)
-    NO_varname = 'NO burden ({})'.format(mass_unit)
-    NOx_varname = 'NOx burden ({})'.format(mass_unit)
-    try:
-        df[NOx_varname] = df[NO2_varname] + df[NO_varname]
-    except KeyError:
-        if debug:
-            print('NOx family not added for trop. df columns:', list(df.columns))
-
-    # Sum the aerosol nitrates (NIT+NITs)
-    NIT_varname = 'NIT burden ({})'.format(mass_unit)
-    NITs_varname = 'NITs burden ({})'.format(mass_unit)
-    varname = 'NIT+NITs burden ({})'.format(mass_unit)
-    try:
-        df[varname] = df[NITs_varname] + df[NIT_varname]
-    except KeyError:
-        if debug:
-            print('NIT+NITs family not added for surface. df columns:',
-                  list(df.columns))
-
+    families = (
+        ('NOx', 'NO2', 'NO'),
+        ('NIT+NITs', 'NITs', 'NIT'),
+    )
+    for fam, spec1, spec2 in families:
+        try:
+            run_stats['{} burden ({})'.format(fam, mass_unit)] = \
+                run_stats['{} burden ({})'.format(spec1, mass_unit)] + \
+                run_stats['{} burden ({})'.format(spec2, mass_unit)]
+        except KeyError:
+            if debug:
+                print('{} family not added for trop.'.format(fam))
     # Scale units
-    for col_ in df.columns:
-        if 'Tg' in col_:
-            df.loc[:, col_] = df.loc[:, col_].values/mass_scale
-
-    # Add ozone (+fast cycling specs.) production (POx) and loss (LOx) for simulation
+    for key in run_stats:
+        if 'Tg' in key:
+            run_stats[key] = run_stats[key]/mass_scale
+    # Add ozone (+fast cycling specs.) production (POx) and loss (LOx)
     try:
-        PL_l = [get_POxLOx(wd=wd, t_p=t_p, vol=vol, GC_version=GC_version, debug=debug)
-                for wd in wds]
-        # Unpack data
-        PL_l = [[i.sum() for i in l] for l in PL_l]
-        POxLOx = np.array(PL_l)
-        # Add to dataframe
-        LOx_varname = 'Ox loss (Tg)'
-        POx_varname = 'Ox prod. (Tg)'
-        Net_Ox_varname = 'Net Ox (Tg)'
-        df[POx_varname] = POxLOx[:, 0]
-        df[LOx_varname] = POxLOx[:, 1]
-        df[Net_Ox_varname] = df[POx_varname] - df[LOx_varname]
+        POx, LOx = [i.sum() for i in get_POxLOx(wd=wd, t_p=t_p, vol=vol,
+                                                GC_version=GC_version,
+                                                debug=debug)]
+        run_stats['Ox prod. (Tg)'] = POx
+        run_stats['Ox loss (Tg)'] = LOx
+        run_stats['Net Ox (Tg)'] = POx - LOx
     except:
         pass
-
     # - Surface concentrations?
     core_surface_specs = [
         'O3', 'NO', 'NO2', 'N2O5'
     ]
     for spec in core_surface_specs+extra_surface_specs:
-        #
         units, scale = tra_unit(spec, scale=True)
-        # Surface ozone
         varname = '{} surface ({})'.format(spec, units)
-        ars = [get_avg_surface_conc_of_X(spec=spec, wd=i, s_area=s_area, res=res)
-               for i in wds]
-        df[varname] = ars
-
+        run_stats[varname] = get_avg_surface_conc_of_X(spec=spec, wd=wd,
+                                                       s_area=s_area,
+                                                       res=res)
     # Surface NOx (note: NO units are pptv, NO2 is ppbv)
-    NO_sur_varname = 'NO surface ({})'.format(pptv_unit)
-    NO2_sur_varname = 'NO2 surface ({})'.format(ppbv_unit)
-    NOx_sur_varname = 'NOx surface ({})'.format(ppbv_unit)
     try:
-        df[NOx_sur_varname] = df[NO2_sur_varname] + (df[NO_sur_varname]*1E3)
+        run_stats['NOx surface ({})'.format(ppbv_unit)] = \
+            run_stats['NO2 surface ({})'.format(ppbv_unit)] + \
+            (run_stats['NO surface ({})'.format(pptv_unit)]*1E3)
     except KeyError:
         if debug:
-            print('NOx family not added for surface. df columns:', list(df.columns))
-
+            print('NOx family not added for surface.')
     # - OH concentrations?
-    # First process the files to have different names for the different years
     try:
-        OH_global_varname = 'Global mean OH'
-        ars = [get_OH_mean(wd=i) for i in wds]
-        df[OH_global_varname] = ars
+        run_stats['Global mean OH'] = get_OH_mean(wd=wd)
     except:
         print('Unable to add OH values - please check the file directory! ')
-
     # - CH4 concentrations?
     try:
-        CH4_lifetime_varname = 'CH4 lifetime (yr)'
-        ars = [get_CH4_lifetime(wd=i, use_OH_from_geos_log=False, K=K,
-                                t_ps=t_p, average_value=True, use_time_in_trop=True,
-                                a_m=a_m)
-               for i in wds]
-        df[CH4_lifetime_varname] = ars
+        run_stats['CH4 lifetime (yr)'] = get_CH4_lifetime(
+            wd=wd, use_OH_from_geos_log=False, K=K, t_ps=t_p,
+            average_value=True, use_time_in_trop=True, a_m=a_m)
     except:
         print('Unable to add CH4 lifetimes - please check the file directory! ')
-
     # - Scale units
-    for col_ in df.columns:
-        if 'ppb' in col_:
-            df.loc[:, col_] = df.loc[:, col_].values*ppbv_scale
-        if 'ppt' in col_:
-            df.loc[:, col_] = df.loc[:, col_].values*pptv_scale
+    for key in run_stats:
+        if 'ppb' in key:
+            run_stats[key] = run_stats[key]*ppbv_scale
+        if 'ppt' in key:
+            run_stats[key] = run_stats[key]*pptv_scale
+    return pd.Series(run_stats)
+
+
+def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='', REF1=None,
+                                          REF2=None, REF_wd=None, res='4x5',
+                                          trop_limit=True,
+                                          save2csv=True, prefix='GC_', run_names=None,
+                                          extra_burden_specs=['NIT', 'NITs'],
+                                          extra_surface_specs=['NIT', 'NITs'],
+                                          GC_version='v11-02d', n_workers=1,
+                                          debug=False):
+    """
+    Get various stats on a set of runs in a dictionary ({name: location})
+
+    Parameters
+    ----------
+    run_dict (dict): dicionary of run names and locations
+    run_names (list): provide the names of run_dict keys to order df index
+    REF_wd (str): name of run in dictionary to use to extract shared variables
+    REF1 (str): name of (1st) run in dictionary to to % change calculations from
+    REF2 (str): name of (2nd) run in dictionary to to % change calculations from
+    prefix (str):  string to include as a prefix in saved csv's filename
+    extra_str (str):  string to include as a suffx in saved csv's filename
+    save2csv (bool): save dataframe as a csv file
+    trop_limit (bool): limit analysis to the troposphere?
+    extra_burden_specs (list): list of extra species to give trop. burden stats on
+    extra_surface_specs (list): list of extra species to give surface conc. stats on
+    res (str): resolution of the modul output (e.g. 4x5, 2x2.5, 0.125x0.125)
+    n_workers (int): number of processes to calculate stats for runs with
+
+    Returns
+    -------
+    (pd.DataFrame)
+
+    Notes
+    -----
+     - Fields shared by the runs (time in troposphere, temperature, air mass,
+     surface area and volume) are extracted once from REF_wd. The stats for
+     each run (see get_general_stats4run_bpch) are then calculated in
+     parallel, with rows added to the DataFrame as each run finishes.
+    """
+    import multiprocessing
+    # Extract names and locations of data
+    if isinstance(run_names, type(None)):
+        run_names = sorted(run_dict.keys())
+    wds = [run_dict[i] for i in run_names]
+    # Get shared variables from a single model run
+    if isinstance(REF_wd, type(None)):
+        REF_wd = wds[0]
+    shared = {
+        # Time in the troposphere (for splitting off data above tropopause)
+        't_p': get_GC_output(wd=REF_wd, vars=[u'TIME_TPS__TIMETROP'],
+                             trop_limit=True),
+        # Temperature
+        'K': get_GC_output(wd=REF_wd, vars=[u'DAO_3D_S__TMPU'],
+                           trop_limit=True),
+        # Airmass within grid boxes
+        'a_m': get_air_mass_np(wd=REF_wd, trop_limit=True),
+        # Surface area
+        's_area': get_surface_area(res)[..., 0],  # m2 land map
+        # volume
+        'vol': get_volume_np(wd=REF_wd, res=res),
+    }
+    # --- Now add analysis values for each run into a pd.DataFrame
+    kwargs = {
+        'res': res, 'extra_burden_specs': extra_burden_specs,
+        'extra_surface_specs': extra_surface_specs, 'GC_version': GC_version,
+        'debug': debug,
+    }
+    jobs = [(name, run_dict[name], kwargs) for name in run_names]
+    df = pd.DataFrame(index=run_names, dtype=float)
+    pool = None
+    try:
+        if n_workers > 1:
+            pool = multiprocessing.Pool(
+                min(n_workers, len(jobs)),
+                initializer=set_general_stats_shared_data, initargs=(shared,))
+            results = pool.imap_unordered(get_general_stats4run_bpch4pool,
+                                          jobs)
+        else:
+            set_general_stats_shared_data(shared)
+            results = map(get_general_stats4run_bpch4pool, jobs)
+        for n, (run_name, run_stats) in enumerate(results):
+            logging.info('Got stats for {} ({}/{})'.format(run_name, n+1,
+                                                           len(jobs)))
+            for col_, value in run_stats.items():
+                df.loc[run_name, col_] = value
+    finally:
+        if not isinstance(pool, type(None)):
+            pool.close()
+            pool.join()
 
     # - Processing and save?
     # Calculate % change from base case for each variable
@@ -4729,9 +5443,9 @@ def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='', REF1=None
             df[pcent_var] = (df[col_]-df[col_][REF2]) / df[col_][REF2] * 100
 
     # Re-order columns
-    df = df.reindex_axis(sorted(df.columns), axis=1)
+    df = df.reindex(sorted(df.columns), axis=1)
     # Reorder index
-    df = df.T.reindex_axis(sorted(df.T.columns), axis=1).T
+    df = df.reindex(sorted(df.index), axis=0)
     # Now round the numbers
     df = df.round(3)
     # Save csv to disk
@@ -4766,8 +5480,23 @@ def get_trop_burden(spec='O3', wd=None, a_m=None, t_p=None,
     Returns
     -------
     (np.array) species burden in Gg
+
+    Notes
+    -----
+     - With all_data=False, the time average is calculated in time chunks
+        (see get_trop_burdens4specs)
     """
     logging.info('get_trop_burden called for {}'.format(spec))
+    if not all_data:
+        ars = {}
+        if not isinstance(arr, type(None)):
+            ars[spec] = arr
+        return get_trop_burdens4specs([spec], wd=wd, a_m=a_m, t_p=t_p,
+                                      ars=ars, Iodine=Iodine,
+                                      total_atmos=total_atmos,
+                                      trop_limit=trop_limit,
+                                      TimeInTropVar=TimeInTropVar,
+                                      debug=debug)[spec]
     # Get variables online if not provided
     if not isinstance(a_m, np.ndarray):
         a_m = get_air_mass_np(wd=wd, trop_limit=trop_limit, debug=debug)
@@ -4817,6 +5546,147 @@ def get_O3_burden_bpch(wd=None, spec='O3', a_m=None, t_p=None, O3_arr=None,
                            debug=debug)
 
 
+def get_trop_burdens4specs(specs=['O3'], wd=None, a_m=None, t_p=None,
+                           ars=None, s_area=None, units='Gg', Iodine=False,
+                           total_atmos=False, summate=False, trop_limit=True,
+                           chunk_size=None, max_block_mem=2.5E8,
+                           TimeInTropVar='TIME_TPS__TIMETROP',
+                           AirMassVar='BXHGHT_S__AD', prefix='IJ_AVG_S__',
+                           res='4x5', debug=False):
+    """
+    Get (time averaged) tropospheric burdens for many species in one pass
+
+    Parameters
+    ----------
+    specs (list): species/tracer/variable names
+    wd (str): Specify the wd to get the results from a run.
+    a_m (np.array): 4D array of air mass (kg), read from wd if not given
+    t_p (np.array): fractional time a grid box has spent in tropospehre
+    ars (dict): 4D arrays of v/v for species (read from wd if not given)
+    s_area (np.array): surface area (m2) of grid boxes (needed for DU)
+    units (str): units of burden to return ('Gg', 'Tg' or 'DU')
+    Iodine (bool): return mass in terms of iodine (I)
+    total_atmos (bool): return whole atmosphere or just troposphere?
+    summate (bool): return the total burden (or area weighted mean for DU)
+    trop_limit (bool): limit 4D arrays to troposphere
+    chunk_size (int): number of time steps to process at once (if None, as
+        many as fit in max_block_mem. Set to 1 to use the least memory)
+    max_block_mem (float): maximum size (bytes) of the arrays for each block
+        of times (only used if chunk_size=None)
+    prefix (str): category prefix of species variables in NetCDF
+    res (str): the resolution if wd not given (e.g. '4x5' )
+
+    Returns
+    -------
+    (dict) of burdens by species. These are (lon, lat, lev) arrays for 'Gg'
+    and 'Tg', (lon, lat) column arrays for 'DU', or floats if summate=True
+
+    Notes
+    -----
+     - Variables are read from the NetCDF in time chunks (see get_GC_output)
+        and the air mass, species and time in troposphere are multiplied and
+        summed chunk by chunk, so no full (4D) temporaries are made for each
+        species.
+     - Equivalent to calling get_trop_burden (all_data=False) or get_DU_mean
+        for each species in turn.
+    """
+    logging.info('get_trop_burdens4specs called for {}'.format(specs))
+    if units not in ('Gg', 'Tg', 'DU'):
+        raise ValueError("units must be 'Gg', 'Tg' or 'DU' not {}".format(
+            units))
+    if isinstance(ars, type(None)):
+        ars = {}
+    # Variables to read from wd (for each time chunk)
+    to_read = [prefix+i for i in specs if i not in ars]
+    if not isinstance(a_m, np.ndarray):
+        to_read += [AirMassVar]
+    if (not total_atmos) and (not isinstance(t_p, np.ndarray)):
+        to_read += [TimeInTropVar]
+    # Get the number of time steps from the NetCDF or the arrays provided
+    if len(to_read) > 0:
+        dates = get_gc_datetime(wd=wd)
+        ntimes = len(dates)
+    else:
+        ntimes = a_m.shape[-1]
+    # Scaling of air mass to moles ( or molecules for DU)
+    if units == 'DU':
+        air_scale = 1E3 / constants('RMM_air') * constants('AVG')
+    else:
+        air_scale = 1E3 / constants('RMM_air')
+    # --- Loop time chunks, accumulating sums over time for all species
+    # (if chunk_size is not set, the first time step is used to size blocks)
+    sums = {}
+    weight, tmp = None, None
+    t0, block = 0, chunk_size
+    if isinstance(chunk_size, type(None)):
+        block = 1
+    while t0 < ntimes:
+        t1 = min(t0+block, ntimes)
+        data = {}
+        if len(to_read) > 0:
+            end = None
+            if t1 < ntimes:
+                end = dates[t1].to_pydatetime()
+            read = get_GC_output(wd, vars=to_read, r_list=True,
+                                 trop_limit=trop_limit, dtype=np.float64,
+                                 start=dates[t0].to_pydatetime(), end=end)
+            data = dict(zip(to_read, read))
+        # Air moles (or molecules) in the troposphere (shared by species)
+        a_m_ = data.get(AirMassVar, a_m[..., t0:t1]
+                        if isinstance(a_m, np.ndarray) else None)
+        weight = np.multiply(a_m_, air_scale, out=weight if (
+            isinstance(weight, np.ndarray) and
+            weight.shape == a_m_.shape) else None)
+        if not total_atmos:
+            t_p_ = data.get(TimeInTropVar, t_p[..., t0:t1]
+                            if isinstance(t_p, np.ndarray) else None)
+            np.multiply(weight, t_p_, out=weight)
+        if (not isinstance(tmp, np.ndarray)) or (tmp.shape != weight.shape):
+            tmp = np.empty(weight.shape, dtype=np.float64)
+        for spec in specs:
+            if spec in ars:
+                arr = ars[spec][..., t0:t1]
+            else:
+                arr = data[prefix+spec]
+            np.multiply(arr, weight, out=tmp)
+            # Sum over time (and levels for columns)
+            if units == 'DU':
+                chunk_sum = tmp.sum(axis=(2, 3))
+            else:
+                chunk_sum = tmp.sum(axis=3)
+            if spec in sums:
+                sums[spec] += chunk_sum
+            else:
+                sums[spec] = chunk_sum
+        # Size blocks by the arrays read, and the weight and tmp arrays
+        if isinstance(chunk_size, type(None)):
+            time_size = weight[..., 0].size * 8 * (len(to_read) + 2)
+            block = max(int(max_block_mem // time_size), 1)
+        t0 = t1
+    # --- Convert the time averaged sums to burdens
+    if units == 'DU':
+        if not isinstance(s_area, np.ndarray):
+            s_area = get_surface_area(res)[..., 0]  # m2 land map
+        factors = dict((i, 1. / s_area / constants('mol2DU')) for i in specs)
+    else:
+        scale = {'Gg': 1E9, 'Tg': 1E12}[units]
+        if Iodine:
+            RMMs = get_spec_conversion_vector(specs, prop='stoich') * \
+                float(species_mass('I'))
+        else:
+            RMMs = get_spec_conversion_vector(specs)
+        factors = dict((i, RMMs[n] / scale) for n, i in enumerate(specs))
+    burdens = collections.OrderedDict()
+    for spec in specs:
+        arr = np.multiply(sums[spec], factors[spec] / ntimes, out=sums[spec])
+        if summate and (units == 'DU'):
+            arr = np.sum(arr * s_area)/np.sum(s_area)  # weight by area
+        elif summate:
+            arr = arr.sum()
+        burdens[spec] = arr
+    return burdens
+
+
 #
 # -------- below function is redundant.
 #
@@ -15,6 +15,7 @@ import glob
 import pandas as pd
 import xarray as xr
 import re
+import collections
 from netCDF4 import Dataset
 # try:
 #    import iris
@@ -42,8 +43,178 @@ from .variables import *
 #from .Scripts.bpch2netCDF import convert_to_netCDF
 
 
+# Name of the catalog (sidecar index) of NetCDF files kept in each folder
+# (see get_GEOSChem_files_catalog)
+GEOSChem_catalog_filename = '.AC_tools_catalog.csv'
+
+
+def get_GEOSChem_file_catalog_entry(filename):
+    """
+    Get the time range, variables and coordinate hash of a NetCDF file
+
+    Parameters
+    ----------
+    filename (str): name of the NetCDF file (including directory)
+
+    Returns
+    -------
+    (dict)
+    """
+    import hashlib
+    from netCDF4 import num2date
+    stat = os.stat(filename)
+    entry = {
+        'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+        'start': pd.NaT, 'end': pd.NaT, 'ntimes': 0,
+    }
+    with Dataset(filename, 'r') as d:
+        # Variables that are not coordinates (i.e. dimensions)
+        entry['variables'] = ' '.join(sorted(i for i in d.variables
+                                             if i not in d.dimensions))
+        # Time range of file
+        if ('time' in d.variables) and (len(d.variables['time']) > 0):
+            times = d.variables['time']
+            calendar = getattr(times, 'calendar', 'standard')
+            dates = num2date(times[:], times.units, calendar=calendar,
+                             only_use_cftime_datetimes=False,
+                             only_use_python_datetimes=True)
+            entry['start'], entry['end'] = dates[0], dates[-1]
+            entry['ntimes'] = len(dates)
+        # Hash of coordinate values (other than time)
+        sha1 = hashlib.sha1()
+        for dim in sorted(d.dimensions):
+            sha1.update(dim.encode())
+            if (dim != 'time') and (dim in d.variables):
+                sha1.update(np.ascontiguousarray(d.variables[dim][:]))
+        entry['coord_hash'] = sha1.hexdigest()
+    return entry
+
+
+def get_GEOSChem_files_catalog(files=None, wd=None,
+                               file_str='GEOSChem.SpeciesConc.*.nc4',
+                               save_catalog=True):
+    """
+    Get a catalog of the time range, variables and coordinates of NetCDF files
+
+    Parameters
+    ----------
+    files (list): NetCDF files to catalog (instead of those matching file_str)
+    wd (str): Specify the wd to get the results from a run.
+    file_str (str): a str for file format with wildcards (?, *)
+    save_catalog (bool): save the catalog as a sidecar index in wd
+
+    Returns
+    -------
+    (pd.DataFrame) indexed by filename
+
+    Notes
+    -----
+     - The catalog is kept in wd (see GEOSChem_catalog_filename) and files are
+        only opened again if their size or modification time changes.
+    """
+    if isinstance(files, type(None)):
+        files = sorted(glob.glob('{}/{}'.format(wd, file_str)))
+    if isinstance(wd, type(None)):
+        wd = os.path.dirname(files[0])
+    catalog_file = os.path.join(wd, GEOSChem_catalog_filename)
+    # Read the existing catalog
+    columns = ['start', 'end', 'ntimes', 'variables', 'coord_hash', 'size',
+               'mtime_ns']
+    try:
+        catalog = pd.read_csv(catalog_file, index_col='filename',
+                              parse_dates=['start', 'end'],
+                              keep_default_na=False, na_values={
+                                  'start': [''], 'end': ['']})
+    except (IOError, ValueError, pd.errors.EmptyDataError):
+        catalog = pd.DataFrame(columns=columns)
+        catalog.index.name = 'filename'
+    # Add entries for new (or changed) files
+    entries = collections.OrderedDict()
+    for file in files:
+        name = os.path.basename(file)
+        stat = os.stat(file)
+        if (name in catalog.index) and \
+                (catalog.loc[name, 'size'] == stat.st_size) and \
+                (catalog.loc[name, 'mtime_ns'] == stat.st_mtime_ns):
+            continue
+        logging.debug('Adding {} to catalog'.format(file))
+        entries[name] = get_GEOSChem_file_catalog_entry(file)
+    if len(entries) > 0:
+        new = pd.DataFrame.from_dict(entries, orient='index')[columns]
+        new.index.name = 'filename'
+        catalog = pd.concat([catalog.drop(list(entries), errors='ignore'),
+                             new])
+        catalog['start'] = pd.to_datetime(catalog['start'])
+        catalog['end'] = pd.to_datetime(catalog['end'])
+        # Save (atomically) for use next time
+        if save_catalog:
+            tmp_file = '{}.{}.tmp'.format(catalog_file, os.getpid())
+            try:
+                catalog.to_csv(tmp_file, date_format='%Y-%m-%d %H:%M:%S')
+                os.replace(tmp_file, catalog_file)
+            except (IOError, OSError):
+                logging.warning('Could not save catalog in {}'.format(wd))
+    # Return the catalog for the requested files
+    catalog = catalog.loc[[os.path.basename(i) for i in files]]
+    catalog.index = pd.Index(files, name='filename')
+    return catalog
+
+
+def get_GEOSChem_ds_preprocess(variables=None, levels=None, lat_range=None,
+                               lon_range=None):
+    """
+    Get a function to select variables, levels and a lat/lon box of a dataset
+
+    Parameters
+    ----------
+    variables (list): variables to keep (coordinates are always kept)
+    levels (tuple): (first, last+1) model level indices to keep, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to keep
+
+    Returns
+    -------
+    (function)
+
+    Notes
+    -----
+     - Used as the "preprocess" function of xr.open_mfdataset (see
+     get_GEOSChem_files_as_ds), so data not selected is not added to the
+     (dask) graph of the dataset.
+     - The level edges (ilev) for the levels selected are also kept
+     - If the min of lon_range is greater than its max, the box is taken to
+     cross the dateline
+    """
+    def preprocess(ds):
+        if not isinstance(variables, type(None)):
+            ds = ds[[i for i in variables if i in ds.data_vars]]
+        if not isinstance(levels, type(None)):
+            if 'lev' in ds.dims:
+                ds = ds.isel(lev=slice(levels[0], levels[1]))
+            if 'ilev' in ds.dims:
+                last = levels[1]
+                if not isinstance(last, type(None)):
+                    last += 1
+                ds = ds.isel(ilev=slice(levels[0], last))
+        if not isinstance(lat_range, type(None)):
+            lat = ds['lat'].values
+            select = (lat >= lat_range[0]) & (lat <= lat_range[1])
+            ds = ds.isel(lat=np.arange(len(lat))[select])
+        if not isinstance(lon_range, type(None)):
+            lon = ds['lon'].values
+            if lon_range[0] <= lon_range[1]:
+                select = (lon >= lon_range[0]) & (lon <= lon_range[1])
+            else:
+                select = (lon >= lon_range[0]) | (lon <= lon_range[1])
+            ds = ds.isel(lon=np.arange(len(lon))[select])
+        return ds
+    return preprocess
+
+
 def get_GEOSChem_files_as_ds(file_str='GEOSChem.SpeciesConc.*.nc4', wd=None,
-                             collection=None, debug=False):
+                             collection=None, start=None, end=None,
+                             variables=None, levels=None, lat_range=None,
+                             lon_range=None, use_catalog=True, use_zarr=True,
+                             debug=False):
     """
     Extract GEOS-Chem NetCDF files that match file string format to a xr.dataset
 
@@ -51,12 +222,27 @@ def get_GEOSChem_files_as_ds(file_str='GEOSChem.SpeciesConc.*.nc4', wd=None,
     ----------
     wd (str): Specify the wd to get the results from a run.
     StateMet (dataset): Dataset object containing time in troposphere
+    start, end (datetime.datetime): only open times from start to (before) end
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    use_catalog (bool): use a catalog of files to only open those needed
+    use_zarr (bool): open the Zarr store of the collection in wd, if present
 
     Returns
     -------
     (dataset)
 
     Notes
+     - With start, end or variables, only the files with times and variables
+     requested are opened. These are found from a catalog of the files, which
+     is saved in wd (see get_GEOSChem_files_catalog)
+     - Variables, levels and lat/lon boxes are selected as each file is opened
+     (see get_GEOSChem_ds_preprocess)
+     - If the files have been converted to a Zarr store in wd (see
+     convert_GEOSChem_files2zarr), this is opened instead of the files. If
+     the files have times after those in the store, a warning is logged and
+     the files are opened instead.
     """
     import glob
     # Check input
@@ -67,17 +253,313 @@ def get_GEOSChem_files_as_ds(file_str='GEOSChem.SpeciesConc.*.nc4', wd=None,
 
     else:
         glob_pattern = '{}/{}'.format(wd, file_str)
-    files = glob.glob(glob_pattern)
+    files = [i for i in glob.glob(glob_pattern) if os.path.isfile(i)]
+    # Open the Zarr store of the collection instead of its files, if present
+    # (and it has all the times in the files)
+    store = get_GEOSChem_zarr_store_name(file_str=file_str, wd=wd,
+                                         collection=collection)
+    if use_zarr and os.path.isdir(store):
+        ds = xr.open_zarr(store, consolidated=True)
+        store_end = pd.Timestamp(ds['time'].values[-1])
+        files_end = store_end
+        if len(files) >= 1:
+            catalog = get_GEOSChem_files_catalog(files=files, wd=wd)
+            files_end = catalog['end'].max()
+        if files_end > store_end:
+            err_str = 'Zarr store ({}, to {}) is older than files (to {}), '
+            err_str += 'so opening files. Update via convert_GEOSChem_files2zarr'
+            logging.warning(err_str.format(store, store_end, files_end))
+        else:
+            logging.debug('Opening Zarr store: {}'.format(store))
+            preprocess = get_GEOSChem_ds_preprocess(
+                variables=variables, levels=levels, lat_range=lat_range,
+                lon_range=lon_range)
+            return select_times_in_ds(preprocess(ds), start=start, end=end)
     assert len(files) >= 1, 'No files found matching-{}'.format(wd+file_str)
     # Sort the files based on their name (which contains a regular datastring)
     files = list(sorted(files))
-    # open all of these files as single Dataset
     # NOTE: Updated to use faster opening settings for files sharing the same coords
     # https://github.com/pydata/xarray/issues/1823
+    kwargs = {'data_vars': "minimal", 'coords': "minimal",
+              'compat': "override"}
+    # Only open files with the times and variables requested
+    selection = [start, end, variables]
+    if use_catalog and any([not isinstance(i, type(None)) for i in selection]):
+        catalog = get_GEOSChem_files_catalog(files=files, wd=wd)
+        select = np.ones(len(catalog), dtype=bool)
+        if not isinstance(start, type(None)):
+            select &= ~(catalog['end'] < pd.Timestamp(start)).values
+        if not isinstance(end, type(None)):
+            select &= ~(catalog['start'] >= pd.Timestamp(end)).values
+        file_vars = catalog['variables'].str.split()
+        if not isinstance(variables, type(None)):
+            select &= file_vars.map(
+                lambda x: any([i in x for i in variables])).values
+        files = list(catalog.index[select])
+        err_str = 'No files found for times ({} to {}) and variables ({})'
+        assert len(files) >= 1, err_str.format(start, end, variables)
+        # Do not read the other variables
+        if not isinstance(variables, type(None)):
+            drop = set([i for x in file_vars[select] for i in x])
+            kwargs['drop_variables'] = sorted(drop - set(variables))
+        # Only override coordinates if they are the same in all files
+        if len(set(catalog.loc[files, 'coord_hash'])) > 1:
+            logging.warning('Coordinates differ between files')
+            del kwargs['compat'], kwargs['coords']
+    # Select variables, levels and region as files are opened
+    selection = [variables, levels, lat_range, lon_range]
+    if any([not isinstance(i, type(None)) for i in selection]):
+        kwargs['preprocess'] = get_GEOSChem_ds_preprocess(
+            variables=variables, levels=levels, lat_range=lat_range,
+            lon_range=lon_range)
+    # open all of these files as single Dataset
     ds = xr.open_mfdataset(files,
 #                           concat_dim='time',
-                           data_vars="minimal", coords="minimal", compat="override")
-    return ds
+                           **kwargs)
+    # Only return times in the window requested
+    return select_times_in_ds(ds, start=start, end=end)
+
+
+def select_times_in_ds(ds, start=None, end=None):
+    """
+    Select the times of a dataset from start to (before) end
+
+    Parameters
+    ----------
+    ds (dataset): dataset with a time dimension
+    start, end (datetime.datetime): select times from start to (before) end
+
+    Returns
+    -------
+    (dataset)
+    """
+    if all([isinstance(i, type(None)) for i in (start, end)]):
+        return ds
+    times = ds['time'].values
+    select = np.ones(len(times), dtype=bool)
+    if not isinstance(start, type(None)):
+        select &= times >= np.datetime64(start)
+    if not isinstance(end, type(None)):
+        select &= times < np.datetime64(end)
+    return ds.isel(time=np.arange(len(times))[select])
+
+
+# Chunk profiles (dimension: chunk size) for Zarr stores of GEOS-Chem output.
+# Dimensions not listed are not chunked.
+GEOSChem_zarr_chunk_profiles = {
+    # Whole fields (e.g. for maps), one time per chunk
+    'map': {'time': 1},
+    # Long time series of small boxes (e.g. for sites/points)
+    'timeseries': {'time': 744, 'lev': 1, 'lat': 8, 'lon': 8},
+    # Surface fields for a day of hourly output
+    'surface': {'time': 24, 'lev': 1},
+}
+
+
+def get_GEOSChem_zarr_store_name(file_str='GEOSChem.SpeciesConc.*.nc4',
+                                 wd=None, collection=None):
+    """
+    Get the name of the Zarr store for a collection of GEOS-Chem NetCDF files
+
+    Parameters
+    ----------
+    wd (str): Specify the wd to get the results from a run.
+    file_str (str): a str for file format with wildcards (?, *)
+    collection (str): name of GEOS-Chem collection (e.g. StateMet)
+
+    Returns
+    -------
+    (str)
+
+    Notes
+    -----
+     - The name is the fixed part of file_str (e.g. "GEOSChem.SpeciesConc" for
+     "GEOSChem.SpeciesConc.*.nc4", or "ctm" for "ctm.nc") with a ".zarr" suffix
+    """
+    if isinstance(collection, str):
+        name = 'GEOSChem.{}'.format(collection)
+    else:
+        name = re.split(r'[*?\[]', file_str)[0]
+        name = re.sub(r'\.nc4?$', '', name).rstrip('._')
+    return os.path.join(wd, '{}.zarr'.format(name))
+
+
+def get_zarr_compressor(compress=True, clevel=3):
+    """
+    Get the compressor to use for variables in a Zarr store
+
+    Parameters
+    ----------
+    compress (bool or compressor): compress variables? or compressor to use
+    clevel (int): compression level (for default compressor, Blosc zstd)
+
+    Returns
+    -------
+    (tuple) encoding key and compressor for the zarr version installed
+    """
+    import zarr
+    zarr_v3 = int(zarr.__version__.split('.')[0]) >= 3
+    key = 'compressors' if zarr_v3 else 'compressor'
+    if isinstance(compress, bool) or isinstance(compress, type(None)):
+        if not compress:
+            return key, None
+        if zarr_v3:
+            from zarr.codecs import BloscCodec
+            compress = BloscCodec(cname='zstd', clevel=clevel,
+                                  shuffle='bitshuffle')
+        else:
+            from numcodecs import Blosc
+            compress = Blosc(cname='zstd', clevel=clevel,
+                             shuffle=Blosc.BITSHUFFLE)
+    if zarr_v3 and not isinstance(compress, (tuple, list)):
+        compress = (compress,)
+    return key, compress
+
+
+def get_zarr_chunks4var(da, chunks='map'):
+    """
+    Get the chunk sizes to use for a variable in a Zarr store
+
+    Parameters
+    ----------
+    da (DataArray): variable to be stored
+    chunks (str or dict): name of chunk profile (see
+        GEOSChem_zarr_chunk_profiles) or dictionary of chunk sizes by dimension
+
+    Returns
+    -------
+    (dict) chunk size by dimension of da
+    """
+    if isinstance(chunks, str):
+        chunks = GEOSChem_zarr_chunk_profiles[chunks]
+    sizes = {}
+    for dim in da.dims:
+        size = chunks.get(dim, -1)
+        if (size < 0) or (size > da.sizes[dim]):
+            size = da.sizes[dim]
+        sizes[dim] = max(size, 1)
+    return sizes
+
+
+def convert_GEOSChem_files2zarr(file_str='GEOSChem.SpeciesConc.*.nc4',
+                                wd=None, collection=None, store=None,
+                                chunks='map', var_chunks=None, compress=True,
+                                append=True, variables=None, debug=False):
+    """
+    Convert a collection of GEOS-Chem NetCDF files to a (consolidated) Zarr store
+
+    Parameters
+    ----------
+    wd (str): Specify the wd to get the results from a run.
+    file_str (str): a str for file format with wildcards (?, *)
+    collection (str): name of GEOS-Chem collection (e.g. StateMet)
+    store (str): Zarr store to save to (default: in wd, named for file_str)
+    chunks (str or dict): chunk profile for variables (see get_zarr_chunks4var)
+    var_chunks (dict): chunk profiles for specific variables (e.g. timeseries)
+    compress (bool or compressor): compress variables? or compressor to use
+    append (bool): only add times after the last time already in the store
+    variables (list): only convert these variables (and coordinates)
+    debug (bool): print debug information
+
+    Returns
+    -------
+    (str) name of Zarr store
+
+    Notes
+    -----
+     - Requires zarr (an optional dependency of AC_tools)
+     - Works for GEOS-Chem collections (e.g. SpeciesConc, StateMet), HEMCO
+     diagnostics and legacy ctm.nc files (file_str='ctm.nc')
+     - Data is written a chunk at a time, so collections larger than memory
+     can be converted
+     - On append, chunks and compression of the existing store are kept and
+     variables without a time dimension are not written again
+     - Readers (e.g. get_GEOSChem_files_as_ds) open the store if it is in wd
+    """
+    if isinstance(store, type(None)):
+        store = get_GEOSChem_zarr_store_name(file_str=file_str, wd=wd,
+                                             collection=collection)
+    if isinstance(var_chunks, type(None)):
+        var_chunks = {}
+    # Find the last time already in the store
+    last_time = None
+    append = append and os.path.isdir(store)
+    if append:
+        existing = xr.open_zarr(store, consolidated=True)
+        if ('time' in existing.dims) and (len(existing['time']) > 0):
+            last_time = existing['time'].values[-1]
+        else:
+            append = False
+    # Open the NetCDF files (only those with times after those in the store)
+    ds = get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                  collection=collection, variables=variables,
+                                  start=last_time, use_zarr=False)
+    if not isinstance(last_time, type(None)):
+        ds = ds.isel(time=np.where(ds['time'].values > last_time)[0])
+        if len(ds['time']) == 0:
+            logging.info('No new times to add to {}'.format(store))
+            return store
+        # Only add variables with a time dimension
+        ds = ds[[i for i in ds.data_vars if 'time' in ds[i].dims]]
+    # Remove NetCDF encoding (e.g. chunksizes, zlib) not used by Zarr
+    keep = ('units', 'calendar', 'dtype', '_FillValue', 'scale_factor',
+            'add_offset')
+    for var in ds.variables:
+        ds[var].encoding = dict([(k, v) for k, v in ds[var].encoding.items()
+                                 if k in keep])
+    # Chunk variables as in the store (or as requested for a new store)
+    encoding = {}
+    key, compressor = get_zarr_compressor(compress)
+    for var in ds.data_vars:
+        if append:
+            sizes = dict(zip(existing[var].dims,
+                             existing[var].encoding['chunks']))
+        else:
+            sizes = get_zarr_chunks4var(ds[var], var_chunks.get(var, chunks))
+            encoding[var] = {'chunks': tuple(sizes[i] for i in ds[var].dims),
+                             key: compressor}
+        ds[var] = ds[var].chunk(sizes)
+        if debug:
+            print(var, sizes)
+    # Save to the Zarr store
+    if append:
+        logging.info('Appending {} times to {}'.format(len(ds['time']), store))
+        ds.to_zarr(store, append_dim='time', consolidated=True)
+    else:
+        logging.info('Saving {} to {}'.format(wd, store))
+        ds.to_zarr(store, mode='w', encoding=encoding, consolidated=True)
+    return store
+
+
+def convert_GEOSChem_run2zarr(wd=None, file_strs=None, **kwargs):
+    """
+    Convert the GEOS-Chem NetCDF output of a run to Zarr stores
+
+    Parameters
+    ----------
+    wd (str): Specify the wd to get the results from a run.
+    file_strs (list): file strings of collections to convert (default: all
+        GEOS-Chem collections, HEMCO diagnostics and ctm.nc in wd)
+    **kwargs: passed to convert_GEOSChem_files2zarr (e.g. chunks, compress)
+
+    Returns
+    -------
+    (dict) name of Zarr store by file string
+    """
+    if isinstance(file_strs, type(None)):
+        files = glob.glob('{}/GEOSChem.*.*.nc4'.format(wd))
+        names = sorted(set([os.path.basename(i).split('.')[1]
+                            for i in files]))
+        file_strs = ['GEOSChem.{}.*.nc4'.format(i) for i in names]
+        if len(glob.glob('{}/HEMCO_diagnostics.*.nc'.format(wd))) > 0:
+            file_strs += ['HEMCO_diagnostics.*.nc']
+        if os.path.isfile('{}/ctm.nc'.format(wd)):
+            file_strs += ['ctm.nc']
+    stores = collections.OrderedDict()
+    for file_str in file_strs:
+        stores[file_str] = convert_GEOSChem_files2zarr(file_str=file_str,
+                                                        wd=wd, **kwargs)
+    return stores
 
 
 def get_Gg_trop_burden(ds=None, spec=None, spec_var=None, StateMet=None, wd=None,
@@ -85,8 +567,9 @@ def get_Gg_trop_burden(ds=None, spec=None, spec_var=None, StateMet=None, wd=None
                        avg_over_time=False,
                        sum_patially=True, rm_trop=True, use_time_in_trop=True,
                        trop_mask=None, spec_conc_prefix='SpeciesConc_',
-                       time_in_trop_var='N/A', vars2use=None,
-                       sum_spatially=True
+                       time_in_trop_var='FracOfTimeInTrop', vars2use=None,
+                       sum_spatially=True, time_chunk=None,
+                       max_block_mem=2.5E8
                        ):
     """
     Get Tropospheric burden for given/or all species in dataset
@@ -101,97 +584,107 @@ def get_Gg_trop_burden(ds=None, spec=None, spec_var=None, StateMet=None, wd=None
     spec_var (str):  Name of the species inc. Diagnostic prefix (optional)
     spec_conc_prefix (str): the diagnostic prefix for concentration
     vars2use (list): list of variables to calculate burden for
+    time_in_trop_var (str): variable in StateMet for time in troposphere
+    avg_over_time (bool): average the burdens over time
+    time_chunk (int): number of times to sum at once (default: the chunks of
+        ds along time, or all times if ds is not chunked)
+    max_block_mem (float): maximum size (bytes) of each block of times summed
 
     Returns
     -------
-    (xr.dataset or pandas.DataFrame)
+    (xr.dataset or pandas.Series)
 
     Notes
     -----
-     - A pandas dataframe is returned if values are requested to be summed spatially
+     - A pandas series is returned if values are requested to be summed spatially
      (e.g. sum_patially=True), otherwise a dataset xr.dataset is returned.
+     - Only the air mass (air_mass_var) and time in troposphere variables of
+     StateMet are used, so just these can be opened, e.g.
+     get_StateMet_ds(wd=wd, variables=['Met_AD', 'FracOfTimeInTrop'])
+     - All species are stacked along a "species" dimension and converted with
+     a single vector of RMMs and a single field of air mass (and time in
+     troposphere). Spatial sums are taken in one pass over each block of times.
     """
+    from .GEOSChem_bpch import get_spec_conversion_vector
     # Only setup to take xarray datasets etc currently...
     assert type(StateMet) != None, 'Func. just setup to take StateMet currently'
     assert type(
         ds) == xr.Dataset, 'Func. just setup to take a xr.dataset currently'
-    # Setup a dataset to process and return
-    dsL = ds.copy()
-    # Extract local variables
-    AirMass = StateMet[air_mass_var]
-#    TropLevel = StateMet[trop_level_var]
     # Define spec_var as the diga. prefix + "spec" if "spec" provided
     if not isinstance(spec, type(None)):
         if isinstance(spec_var, type(None)):
             spec_var = spec_conc_prefix+spec
-    # Create mask for stratosphere if not provided
-    if isinstance(trop_mask, type(None)) and not use_time_in_trop:
-        trop_mask = create4Dmask4trop_level(StateMet=StateMet)
+    # Just consider the species of interest (if provided)
+    if not isinstance(spec_var, type(None)):
+        vars2use = [spec_var]
     # only allow "SpeciesConc" species
     if isinstance(vars2use, type(None)):
-        vars2use = [i for i in dsL.data_vars if 'SpeciesConc' in i]
-    dsL = dsL[vars2use]
+        vars2use = [i for i in ds.data_vars if 'SpeciesConc' in i]
+    # Check units
     MXUnits = 'mol mol-1 dry'
-    # Covert all species into burdens (Gg)
-    if isinstance(spec_var, type(None)) and isinstance(spec, type(None)):
-        # Loop by spec
-        for spec_var in vars2use:
-            # Remove diagnostic prefix from chemical species
-            spec = spec_var.replace(spec_conc_prefix, '')
-            # Check units
-            SpecUnits = dsL[spec_var].units
-            MixingRatioUnits = MXUnits == SpecUnits
-            assert_str = "Units must be in '{}' terms! (They are: '{}')"
-            assert MixingRatioUnits, assert_str.format(MXUnits, SpecUnits)
-            # v/v * (mass total of air (kg)/ 1E3 (converted kg to g)) = moles of tracer
-            dsL[spec_var] = dsL[spec_var] * \
-                (AirMass*1E3 / constants('RMM_air'))
-            # Convert moles to mass (* RMM) , then to Gg
-            dsL[spec_var] = dsL[spec_var] * float(species_mass(spec)) / 1E9
-        # Return values averaged over time if requested
-        if avg_over_time:
-            dsL = dsL.mean(dim='time')
-        # Remove the tropospheric values?
-        if rm_trop:
-            # Loop by spec
-            if use_time_in_trop:
-                dsL = rm_fractional_troposphere(dsL, vars2use=vars2use,
-                                                StateMet=StateMet)
-            else:
-                for spec_var in vars2use:
-                    dsL[spec_var] = dsL[spec_var].where(trop_mask)
-    else:
-        # Just consifer the species of interest
-        dsL = dsL[[spec_var]]
-        # Remove diagnostic prefix from chemical species
-        spec = spec_var.replace(spec_conc_prefix, '')
-        # Check units
-        SpecUnits = dsL[spec_var].units
-        MixingRatioUnits = MXUnits == SpecUnits
-        assert_str = "Units must be in '{}' terms! (They are: '{}')"
-        assert MixingRatioUnits, assert_str.format(MXUnits, SpecUnits)
-        # v/v * (mass total of air (kg)/ 1E3 (converted kg to g)) = moles of tracer
-        dsL[spec_var] = dsL[spec_var] * (AirMass*1E3 / constants('RMM_air'))
-        # Convert moles to mass (* RMM) , then to Gg
-        dsL[spec_var] = dsL[spec_var] * float(species_mass(spec)) / 1E9
+    assert_str = "Units must be in '{}' terms! (They are: '{}')"
+    for var in vars2use:
+        SpecUnits = ds[var].units
+        assert MXUnits == SpecUnits, assert_str.format(MXUnits, SpecUnits)
+    # v/v * (mass total of air (kg)/ 1E3 (converted kg to g)) = moles of tracer
+    # (then to Gg once multiplied by RMM)
+    weights = StateMet[air_mass_var] * (1E3 / constants('RMM_air') / 1E9)
+    # Remove the stratospheric values?
+    if rm_trop:
+        if use_time_in_trop:
+            weights = weights * StateMet[time_in_trop_var]
+        else:
+            # Create mask for stratosphere if not provided
+            if isinstance(trop_mask, type(None)):
+                trop_mask = create4Dmask4trop_level(StateMet=StateMet)
+            weights = weights.where(trop_mask)
+    # Stack species along a single dimension, with a matching vector of RMMs
+    stacked = ds[vars2use].to_array(dim='species')
+    specs = [i.replace(spec_conc_prefix, '') for i in vars2use]
+    RMM = get_spec_conversion_vector(specs, prop='RMM')
+    dims = stacked.dims[1:]
+    # Only use the times (and locations) in both (e.g. StateMet may be for a
+    # longer run), as blocks of times are then selected by position
+    stacked, weights = xr.align(stacked, weights, join='inner')
+    weights = xr.broadcast(weights, stacked.isel(species=0))[0]
+    weights = weights.transpose(*dims)
+    # Return burdens for each grid box?
+    if not sum_spatially:
+        RMM = xr.DataArray(RMM, dims=['species'],
+                           coords={'species': stacked['species']})
+        dsL = stacked * weights * RMM
         # Return values averaged over time if requested
         if avg_over_time:
             dsL = dsL.mean(dim='time')
-        # remove the tropospheric values?
-        if rm_trop:
-            # Loop by spec
-            if use_time_in_trop:
-                dsL = rm_fractional_troposphere(dsL, vars2use=vars2use,
-                                                StateMet=StateMet)
-            else:
-                for spec_var in vars2use:
-                    dsL[spec_var] = dsL[spec_var].where(trop_mask)
-    # Sum the values spatially?
-    if sum_spatially:
-        dsL = dsL.sum()
-        return dsL.to_array().to_pandas()
+        return dsL.to_dataset(dim='species')
+    # Sum each block of times for all species in a single pass
+    if 'time' in dims:
+        ntimes = stacked.sizes['time']
+        if isinstance(time_chunk, type(None)):
+            time_chunk = ntimes
+            if not isinstance(stacked.chunks, type(None)):
+                time_chunk = stacked.chunks[stacked.get_axis_num('time')][0]
+        # Limit the memory used by each block (of all species)
+        time_size = stacked.isel(time=0).size * stacked.dtype.itemsize
+        time_chunk = max(min(time_chunk, int(max_block_mem // time_size)), 1)
+        slices = [{'time': slice(i, i+time_chunk)}
+                  for i in range(0, ntimes, time_chunk)]
     else:
-        return dsL
+        ntimes = 1
+        slices = [{}]
+    axes = list(range(1, len(dims)+1)), list(range(len(dims)))
+    sums = np.zeros(len(vars2use))
+    for selection in slices:
+        values = stacked.isel(selection).values
+        weights_block = np.nan_to_num(weights.isel(selection).values)
+        # (sum in the precision of values, rather than copying them)
+        weights_block = weights_block.astype(values.dtype, copy=False)
+        sums += np.tensordot(values, weights_block, axes=axes)
+    burdens = sums * RMM
+    # Return values averaged over time if requested
+    if avg_over_time:
+        burdens /= ntimes
+    return pd.Series(burdens, index=pd.Index(vars2use, name='variable'))
 
 
 def plot_up_surface_changes_between2runs(ds_dict=None, levs=[1], specs=[],
@@ -304,36 +797,174 @@ def rm_fractional_troposphere(ds, vars2use=None, StateMet=None, TropFracDA=None,
     return ds
 
 
+def get_GEOSChem_levels4pressure_range(ds, pressure_range,
+                                       surface_pressure=1013.25):
+    """
+    Get the model level indices within a range of pressures
+
+    Parameters
+    ----------
+    ds (dataset): GEOS-Chem dataset (with lev, and optionally hyam and hybm)
+    pressure_range (tuple): (min, max) pressures (hPa) of levels to select
+    surface_pressure (float): surface pressure (hPa) to calculate pressures for
+
+    Returns
+    -------
+    (tuple) (first, last+1) level indices, e.g. for get_GEOSChem_ds_preprocess
+
+    Notes
+    -----
+     - Pressures are calculated from the hybrid coefficients (hyam, hybm) if
+     present, otherwise from the (sigma) values of lev
+    """
+    if ('hyam' in ds.variables) and ('hybm' in ds.variables):
+        pressure = ds['hyam'].values + ds['hybm'].values*surface_pressure
+    else:
+        pressure = ds['lev'].values * surface_pressure
+    select = np.where((pressure >= min(pressure_range)) &
+                      (pressure <= max(pressure_range)))[0]
+    err_str = 'No levels found for pressures of {} hPa'
+    assert len(select) > 0, err_str.format(pressure_range)
+    return int(select.min()), int(select.max())+1
+
+
+def extract_GEOSChem_file_subset(filename, levels=None, pressure_range=None,
+                                 lat_range=None, lon_range=None,
+                                 variables=None, suffix='_Just_surface',
+                                 file_extension='.nc4', complevel=4,
+                                 drop_single_level=False,
+                                 delete_existing_NetCDF=False):
+    """
+    Save the selected levels/region of a GEOS-Chem NetCDF file as a new file
+
+    Parameters
+    ----------
+    filename (str): name of the NetCDF file (including directory)
+    levels (tuple): (first, last+1) model level indices to keep, e.g. (0, 1)
+    pressure_range (tuple): (min, max) pressures (hPa) of levels to keep
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to keep
+    variables (list): only keep these variables (and coordinates)
+    suffix (str): suffix to add to the filename for the new file
+    file_extension (str): extension of the NetCDF file
+    complevel (int): compression level (zlib) for the new file
+    drop_single_level (bool): remove the lev dimension if one level is kept
+    delete_existing_NetCDF (bool): delete the file once the new one is saved
+
+    Returns
+    -------
+    (str) name of the new file
+
+    Notes
+    -----
+     - Only the data selected is read from the file
+     - The new file is written to a temporary file and then renamed, so the
+     existing file is only deleted once the new file is complete
+    """
+    new_filename = filename.replace(file_extension, suffix+file_extension)
+    tmp_filename = '{}.{}.tmp'.format(new_filename, os.getpid())
+    with xr.open_dataset(filename) as ds:
+        if not isinstance(pressure_range, type(None)):
+            levels = get_GEOSChem_levels4pressure_range(ds, pressure_range)
+        preprocess = get_GEOSChem_ds_preprocess(
+            variables=variables, levels=levels, lat_range=lat_range,
+            lon_range=lon_range)
+        ds = preprocess(ds)
+        if drop_single_level and ('lev' in ds.dims) and (ds.sizes['lev'] == 1):
+            ds = ds.isel(lev=0)
+        # Compress data variables (with the chunks of the selection)
+        encoding = {}
+        for var in ds.data_vars:
+            encoding[var] = {'zlib': True, 'complevel': complevel,
+                             'shuffle': True}
+            if '_FillValue' in ds[var].encoding:
+                encoding[var]['_FillValue'] = ds[var].encoding['_FillValue']
+        for var in ds.variables:
+            ds[var].encoding = dict([(k, v) for k, v in ds[var].encoding.items()
+                                     if k in ('units', 'calendar', 'dtype')])
+        try:
+            ds.to_netcdf(tmp_filename, format='NETCDF4', engine='netcdf4',
+                         encoding=encoding)
+            os.replace(tmp_filename, new_filename)
+        finally:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+    logging.debug('Saved {} as {}'.format(filename, new_filename))
+    # Delete the existing file?
+    if delete_existing_NetCDF:
+        os.remove(filename)
+    return new_filename
+
+
+def extract_GEOSChem_files_subset(wd=None, file_str='GEOSChem.inst1hr.*',
+                                  n_workers=4, suffix='_Just_surface',
+                                  **kwargs):
+    """
+    Save the selected levels/region of GEOS-Chem NetCDF files as new files
+
+    Parameters
+    ----------
+    wd (str): Specify the wd to get the results from a run.
+    file_str (str): a str for file format with wildcards (?, *)
+    n_workers (int): number of processes to extract files with
+    suffix (str): suffix to add to the filenames for the new files
+    **kwargs: passed to extract_GEOSChem_file_subset (e.g. levels,
+        pressure_range, lat_range, lon_range, delete_existing_NetCDF)
+
+    Returns
+    -------
+    (list) names of the new files
+    """
+    import functools
+    # Check input
+    assert type(wd) == str, 'Working directory (wd) provided must be a string!'
+    # Get files (not including those already extracted)
+    files = glob.glob(os.path.join(wd, file_str))
+    files = sorted([i for i in files if os.path.isfile(i) and
+                    (suffix not in os.path.basename(i))])
+    assert len(files) >= 1, 'No files found matching-{}'.format(wd+file_str)
+    extract = functools.partial(extract_GEOSChem_file_subset, suffix=suffix,
+                                **kwargs)
+    if (n_workers > 1) and (len(files) > 1):
+        import multiprocessing
+        pool = multiprocessing.Pool(min(n_workers, len(files)))
+        try:
+            new_files = pool.map(extract, files)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        new_files = [extract(i) for i in files]
+    return new_files
+
+
 def read_inst_files_save_only_surface(wd=None, file_str='GEOSChem.inst1hr.*',
                                       file_extension='.nc4', save_new_NetCDF=True,
-                                      delete_existing_NetCDF=True):
+                                      delete_existing_NetCDF=True, n_workers=4):
     """
     Extract just surface values and save as NetCDF (& DELETE old NetCDF)
+
+    Notes
+    -----
+     - see extract_GEOSChem_files_subset to extract other levels or regions
     """
-    import glob
     # Check input
     assert type(wd) == str, 'Working directory (wd) provided must be a string!'
-    # Get files
-    files = glob.glob(wd+file_str)
-    assert len(files) >= 1, 'No files found matching-{}'.format(wd+file_str)
-    for FullFileRoot in sorted(files):
-        print(FullFileRoot)
-        ds = xr.open_dataset(FullFileRoot)
-        ds = ds.sel(lev=ds['lev'][0].values)
-        # Create new file name
-        Suffix = '_Just_surface'+file_extension
-        file_strNew = FullFileRoot.replace(file_extension, Suffix)
-        print(file_strNew)
-        # Save and close file
-        if save_new_NetCDF:
-            ds.to_netcdf(file_strNew, engine='scipy')
-        ds.close()
-        # Delele old file?
+    if not save_new_NetCDF:
+        files = glob.glob(os.path.join(wd, file_str))
+        assert len(files) >= 1, 'No files found matching-{}'.format(wd+file_str)
         if delete_existing_NetCDF:
-            os.remove(FullFileRoot)
-
-
-def GetSpeciesConcDataset(file_str='GEOSChem.SpeciesConc.*.nc4', wd=None):
+            for file in files:
+                os.remove(file)
+        return
+    return extract_GEOSChem_files_subset(
+        wd=wd, file_str=file_str, n_workers=n_workers, levels=(0, 1),
+        drop_single_level=True, file_extension=file_extension,
+        delete_existing_NetCDF=delete_existing_NetCDF)
+
+
+def GetSpeciesConcDataset(file_str='GEOSChem.SpeciesConc.*.nc4', wd=None, variables=None,
+                          levels=None, lat_range=None, lon_range=None,
+                          start=None, end=None):
     """
     Wrapper to retrive GEOSChem SpeciesConc NetCDFs as a xr.dataset
 
@@ -341,15 +972,24 @@ def GetSpeciesConcDataset(file_str='GEOSChem.SpeciesConc.*.nc4', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
-def get_Inst1hr_ds(file_str='GEOSChem.inst1hr.*', wd=None):
+def get_Inst1hr_ds(file_str='GEOSChem.inst1hr.*', wd=None, variables=None,
+                   levels=None, lat_range=None, lon_range=None,
+                   start=None, end=None):
     """
     Wrapper to get NetCDF 1hr instantaneous (Inst1hr) output as a Dataset
 
@@ -357,15 +997,24 @@ def get_Inst1hr_ds(file_str='GEOSChem.inst1hr.*', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
-def get_StateMet_ds(file_str='GEOSChem.StateMet.*', wd=None):
+def get_StateMet_ds(file_str='GEOSChem.StateMet.*', wd=None, variables=None,
+                    levels=None, lat_range=None, lon_range=None,
+                    start=None, end=None):
     """
     Wrapper to get NetCDF StateMet output as a Dataset
 
@@ -373,15 +1022,24 @@ def get_StateMet_ds(file_str='GEOSChem.StateMet.*', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
-def get_DryDep_ds(file_str='GEOSChem.DryDep.*', wd=None):
+def get_DryDep_ds(file_str='GEOSChem.DryDep.*', wd=None, variables=None,
+                  levels=None, lat_range=None, lon_range=None,
+                  start=None, end=None):
     """
     Wrapper to get NetCDF dry deposition output as a dataset
 
@@ -389,15 +1047,24 @@ def get_DryDep_ds(file_str='GEOSChem.DryDep.*', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
-def get_ProdLoss_ds(file_str='GEOSChem.ProdLoss.*', wd=None):
+def get_ProdLoss_ds(file_str='GEOSChem.ProdLoss.*', wd=None, variables=None,
+                    levels=None, lat_range=None, lon_range=None,
+                    start=None, end=None):
     """
     Wrapper to get NetCDF ProdLoss output as a Dataset
 
@@ -405,15 +1072,24 @@ def get_ProdLoss_ds(file_str='GEOSChem.ProdLoss.*', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
-def GetJValuesDataset(file_str='GEOSChem.JValues.*', wd=None):
+def GetJValuesDataset(file_str='GEOSChem.JValues.*', wd=None, variables=None,
+                      levels=None, lat_range=None, lon_range=None,
+                      start=None, end=None):
     """
     Wrapper to get NetCDF photolysis rates (Jvalues) output as a Dataset
 
@@ -421,15 +1097,24 @@ def GetJValuesDataset(file_str='GEOSChem.JValues.*', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
-def get_HEMCO_diags_as_ds(file_str='HEMCO_diagnostics.*', wd=None):
+def get_HEMCO_diags_as_ds(file_str='HEMCO_diagnostics.*', wd=None, variables=None,
+                          levels=None, lat_range=None, lon_range=None,
+                          start=None, end=None):
     """
     Wrapper to get HEMCO diagnostics NetCDF output as a Dataset
 
@@ -437,12 +1122,19 @@ def get_HEMCO_diags_as_ds(file_str='HEMCO_diagnostics.*', wd=None):
     ----------
     wd (str): Specify the wd to get the results from a run.
     file_str (str): a str for file format with wildcards (?, *)
+    variables (list): only open these variables (and coordinates)
+    levels (tuple): (first, last+1) model level indices to open, e.g. (0, 1)
+    lat_range, lon_range (tuple): (min, max) of a lat/lon box to open
+    start, end (datetime.datetime): only open times from start to (before) end
 
     Returns
     -------
     (dataset)
     """
-    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd)
+    return get_GEOSChem_files_as_ds(file_str=file_str, wd=wd,
+                                    variables=variables, levels=levels,
+                                    lat_range=lat_range, lon_range=lon_range,
+                                    start=start, end=end)
 
 
 def convert_pyGChem_iris_ds2COARDS_ds(ds=None, transpose_dims=True):
@@ -708,15 +1400,26 @@ def get_general_stats4run_dict_as_df(run_dict=None, extra_str='', REF1=None,
     df = pd.DataFrame()
     # - Get core data required
     # Get StateMet object for 1st of the runs and use this for all runs
-    StateMet = get_StateMet_ds(wd=REF_wd)
-    # Get all of the speciesConcs for runs as list of datasets
-    dsD = [GetSpeciesConcDataset(wd=run_dict[run]) for run in run_names]
-    dsD = dict(zip(run_names, dsD))
+    # (only opening the variables needed for burdens)
+    if use_time_in_trop:
+        StateMet_vars = ['Met_AD', 'FracOfTimeInTrop']
+    else:
+        StateMet_vars = ['Met_AD', 'Met_TropP', 'Met_PMID']
+    StateMet = get_StateMet_ds(wd=REF_wd, variables=StateMet_vars)
     # - Get burdens for core species
     core_burden_specs = ['O3', 'CO', 'NO', 'NO2']
+    core_surface_specs = [
+        'O3', 'NO', 'NO2', 'N2O5'
+    ]
     specs2use = core_burden_specs+extra_burden_specs
     prefix = 'SpeciesConc_'
     vars2use = [prefix+i for i in specs2use]
+    # Get all of the speciesConcs for runs as list of datasets
+    variables = set(vars2use + ['AREA'])
+    variables.update(prefix+i for i in core_surface_specs+extra_surface_specs)
+    dsD = [GetSpeciesConcDataset(wd=run_dict[run], variables=sorted(variables))
+           for run in run_names]
+    dsD = dict(zip(run_names, dsD))
     for run in run_names:
         # Average burden over time
         ds = dsD[run]#.mean(dim='time', keep_attrs=True)
@@ -770,9 +1473,6 @@ def get_general_stats4run_dict_as_df(run_dict=None, extra_str='', REF1=None,
     # - Add Ozone production and loss...
 
     # - Surface concentrations
-    core_surface_specs = [
-        'O3', 'NO', 'NO2', 'N2O5'
-    ]
     prefix = 'SpeciesConc_'
     specs2use = core_surface_specs+extra_surface_specs
     # Loop by run and get stats
@@ -1,4 +1,5 @@
 from ..bpch2netCDF import *
+from ..AC_time import *
 import logging
 import pytest
 logging.basicConfig(filename='test.log', level=logging.DEBUG)
@@ -13,4 +14,31 @@ def test_get_folder():
     return
 
 
+def test_aggregate_by_time_groups():
+    dates = pd.date_range('2005-01-01', periods=24, freq='MS')
+    arr = np.random.random((4, 3, 2, 24))
+    out, labels = aggregate_by_time_groups(arr, dates=dates, freq='season',
+                                           add_annual=True)
+    assert labels == ['Annual', 'DJF', 'MAM', 'JJA', 'SON']
+    assert np.allclose(out[..., 0], arr.mean(axis=-1))
+    DJF = [i for i, d in enumerate(dates) if d.month in (12, 1, 2)]
+    assert np.allclose(out[..., 1], arr[..., DJF].mean(axis=-1))
+    # Sums by year along another axis
+    out, labels = aggregate_by_time_groups(np.moveaxis(arr, -1, 0),
+                                           dates=dates, freq='year',
+                                           how='sum', axis=0)
+    assert labels == [2005, 2006]
+    assert np.allclose(out[1], arr[..., 12:].sum(axis=-1))
+    # Weighted means, with masked values excluded
+    weights = secs_in_month(months=list(dates.month), years=list(dates.year))
+    arr = np.ma.masked_where(arr > 0.9, arr)
+    out, labels = aggregate_by_time_groups(arr, dates=dates, freq='month',
+                                           weights=weights)
+    assert labels[0] == 'Jan'
+    Jan = arr[..., ::12]
+    ref = (Jan*weights[::12]).sum(axis=-1)/(~Jan.mask*weights[::12]).sum(-1)
+    assert np.ma.allclose(out[..., 0], ref)
+    assert np.array_equal(out.mask[..., 0], Jan.mask.all(axis=-1))
+
+
 logging.info('GEOSChem test complete')
@@ -87,3 +87,453 @@ def test_get_HEMCO_output_for_file():
     assert round(arr.sum(), 2) == round(
         2.50E-9, 2), "The HEMOC output seem incorrect"
     return
+
+
+def mk_test_ctm_nc(folder, vars=['IJ_AVG_S__O3'], shape=(72, 46, 38, 2),
+                   taus=None, filename='ctm.nc', via_bpch=False):
+    """
+    Make a ctm.nc file with random values for the given variables
+
+    Parameters
+    ----------
+    folder (str): folder to save the NetCDF file to
+    vars (list): names of the variables to add
+    shape (tuple): shape of the variables as (lon, lat, (lev,) time)
+    taus (list): times (hours since 1985-01-01), default is monthly
+    filename (str): name of the NetCDF file
+    via_bpch (bool): convert a ctm.bpch file of O3 (IJ-AVG-$) values instead
+
+    Returns
+    -------
+    (dict) of arrays of the values of each variable in (time, lon, lat, (lev))
+    order
+    """
+    from netCDF4 import Dataset
+    if isinstance(taus, type(None)):
+        taus = np.arange(shape[-1]) * 744.
+    arrs = dict([(i, np.random.random(shape[-1:]+shape[:-1])) for i in vars])
+    if via_bpch:
+        from .test_bpch2netCDF import mk_test_bpch_file
+        from ..bpch2netCDF import bpch_to_netCDF
+        mk_test_bpch_file(os.path.join(folder, 'test.ctm.bpch'),
+                          arrs['IJ_AVG_S__O3'], taus=taus)
+        with open(os.path.join(folder, 'diaginfo.dat'), 'w') as file_:
+            file_.write('     0 IJ-AVG-$    Tracer conc.\n')
+        with open(os.path.join(folder, 'tracerinfo.dat'), 'w') as file_:
+            file_.write('O3       Ozone       48.00E-3   1       1' +
+                        '  1.000E+09 ppbv\n')
+        bpch_to_netCDF(folder=folder, filename=filename)
+        return arrs
+    dims = ['longitude', 'latitude', 'model_level_number'][:len(shape)-1]
+    with Dataset(os.path.join(folder, filename), 'w') as d:
+        for dim, size in zip(dims+['time'], shape):
+            d.createDimension(dim, size)
+        d.createVariable('longitude', 'f4', ('longitude',))[:] = \
+            np.arange(shape[0]) * 360. / shape[0] - 180.
+        d.createVariable('latitude', 'f4', ('latitude',))[:] = \
+            np.linspace(-89., 89., shape[1])
+        time = d.createVariable('time', 'f8', ('time',))
+        time.units = 'hours since 1985-01-01 00:00:00'
+        time[:] = taus
+        for var in vars:
+            nc_var = d.createVariable(var, 'f4', ['time']+dims)
+            nc_var.ctm_units = 'unitless'
+            nc_var[:] = arrs[var]
+    return arrs
+
+
+@pytest.fixture()
+def ctm_nc(tmp_path):
+    """ Make a ctm.nc file in a temporary folder (see mk_test_ctm_nc) """
+    def mk_ctm_nc(vars=['IJ_AVG_S__O3'], folder='', **kwargs):
+        wd = os.path.join(str(tmp_path), folder, '')
+        if not os.path.exists(wd):
+            os.makedirs(wd)
+        return wd, mk_test_ctm_nc(wd, vars=vars, **kwargs)
+    return mk_ctm_nc
+
+
+def test_get_GC_output_lazy(ctm_nc):
+    wd, NIU = ctm_nc(shape=(72, 46, 47, 2), via_bpch=True)
+    arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], trop_limit=True)
+    lazy_arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], trop_limit=True,
+                             lazy=True)
+    assert not isinstance(lazy_arr, np.ndarray)
+    assert lazy_arr.shape == arr.shape == (72, 46, 38, 2)
+    assert np.allclose(np.array(lazy_arr), arr)
+
+
+def test_get_GC_output_hyperslab(ctm_nc):
+    import datetime
+    from netCDF4 import Dataset
+    wd, NIU = ctm_nc(shape=(72, 46, 47, 3), via_bpch=True)
+    arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'])
+    with Dataset(os.path.join(wd, 'ctm.nc')) as d:
+        lon, lat = d['longitude'][:], d['latitude'][:]
+    # Surface values over Europe from February (i.e. the 2nd and 3rd times)
+    kwargs = {'start': datetime.datetime(1985, 2, 1), 'surface_only': True,
+              'lat_range': (35, 70), 'lon_range': (-15, 40)}
+    lons = (lon >= -15) & (lon <= 40)
+    lats = (lat >= 35) & (lat <= 70)
+    expected = arr[lons, ...][:, lats, ...][:, :, :1, 1:]
+    sub_arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], **kwargs)
+    assert sub_arr.shape == (lons.sum(), lats.sum(), 1, 2)
+    assert np.allclose(sub_arr, expected)
+    lazy_arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], lazy=True, **kwargs)
+    assert np.allclose(np.array(lazy_arr), expected)
+    index_arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], use_bpch_index=True,
+                              **kwargs)
+    assert np.allclose(index_arr, expected)
+    # A lat/lon box that crosses the date line and a level range
+    sub_arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], lon_range=(170, -170),
+                            levels=(10, 20), trop_limit=True)
+    lons = (lon >= 170) | (lon <= -170)
+    assert np.allclose(sub_arr, arr[lons, :, 10:20, :])
+
+
+def test_get_GC_output_cached(tmp_path, ctm_nc):
+    wd, NIU = ctm_nc(folder='wd')
+    set_array_cache(str(tmp_path / 'cache'))
+    try:
+        arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], trop_limit=True)
+        cached_arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], trop_limit=True)
+        assert isinstance(cached_arr, np.memmap)
+        assert np.allclose(arr, cached_arr)
+    finally:
+        set_array_cache(None)
+
+
+def test_get_gc_datetime(ctm_nc):
+    import datetime
+    wd, NIU = ctm_nc(shape=(72, 46, 38, 3), taus=[0., 744., 1416.5])
+    dates = get_gc_datetime(wd=wd)
+    assert isinstance(dates, pd.DatetimeIndex)
+    expected = [datetime.datetime(1985, 1, 1), datetime.datetime(1985, 2, 1),
+                datetime.datetime(1985, 3, 1, 0, 30)]
+    assert list(dates) == expected
+    assert get_gc_datetime(wd=wd) is dates
+    assert get_gc_datetime(wd=wd, rtn_list=True) == expected
+    assert get_gc_months(wd=wd) == [1, 2, 3]
+
+
+def test_get_shared_data_as_dict(ctm_nc):
+    wd, NIU = ctm_nc(['TIME_TPS__TIMETROP', 'BXHGHT_S__AD'])
+    Var_rc = get_default_variable_dict(wd=wd)
+    Var_rc['filename'] = 'ctm.nc'
+    Data_rc = get_shared_data_as_dict(Var_rc=Var_rc, var_list=['t_ps', 'a_m'])
+    # Variables are only extracted when first accessed
+    assert len(Data_rc) == 0
+    Data_rc.prefetch(['t_ps', 'a_m'])
+    assert np.allclose(Data_rc['t_ps'],
+                       get_GC_output(wd, vars=['TIME_TPS__TIMETROP']))
+    assert Data_rc['a_m'].shape == (72, 46, 38, 2)
+    # Dependencies are extracted as needed
+    assert Data_rc['output_freq'] == 'Monthly'
+    assert 'datetimes' in Data_rc.shared
+    assert Data_rc.get('not_a_var', 1) == 1
+    # The same data is reused for the same working directory, with changes
+    # only made to each view
+    Data_rc2 = get_shared_data_as_dict(Var_rc=Var_rc)
+    assert Data_rc2.shared is Data_rc.shared
+    assert 'a_m' not in Data_rc2
+    assert Data_rc2.get('a_m') is Data_rc['a_m']
+    assert Data_rc2['t_ps'] is Data_rc['t_ps']
+    Data_rc2['t_ps'] = None
+    assert isinstance(Data_rc['t_ps'], np.ndarray)
+    # Only the data for the latest settings are kept for each file
+    Var_rc2 = Var_rc.copy()
+    Var_rc2['trop_limit'] = not Var_rc['trop_limit']
+    get_shared_data_as_dict(Var_rc=Var_rc2)
+    assert len([i for i in shared_data_cache if i.startswith(wd)]) == 1
+    assert get_shared_data_as_dict(Var_rc=Var_rc).shared is not Data_rc.shared
+    clear_shared_data_cache(wd=wd)
+    assert len([i for i in shared_data_cache if i.startswith(wd)]) == 0
+    with pytest.raises(ValueError):
+        get_shared_data_as_dict(Var_rc=Var_rc, var_list=['not_a_var'])
+
+
+def test_get_GC_output_axes(ctm_nc):
+    # A (nested) grid that is not in any list of known grid shapes
+    wd, arrs = ctm_nc(shape=(13, 7, 5, 3))
+    arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'])
+    assert arr.shape == (13, 7, 5, 3)
+    assert np.allclose(arr, np.moveaxis(arrs['IJ_AVG_S__O3'], 0, -1))
+    # Arrays are views of the data read, unless a contiguous array is requested
+    assert not arr.flags['C_CONTIGUOUS']
+    arr = get_GC_output(wd, vars=['IJ_AVG_S__O3'], contiguous=True)
+    assert arr.flags['C_CONTIGUOUS']
+
+
+def test_get_LOCs_df_from_NetCDF(ctm_nc):
+    specs = ['O3', 'CO']
+    wd, NIU = ctm_nc(['IJ_AVG_S__'+i for i in specs], shape=(72, 46, 4),
+                     taus=np.arange(4.), filename='ts_ctm.nc')
+    sites = ['CVO', 'London', 'WEY']
+    df = get_LOCs_df_from_NetCDF(sites=sites, specs=specs, wd=wd)
+    assert df.shape == (4, len(sites)*len(specs))
+    for site in sites:
+        for spec in specs:
+            df_site = get_LOC_df_from_NetCDF(site=site, spec=spec, wd=wd,
+                                             verbose=False)
+            assert np.allclose(df[(site, spec)].values, df_site[spec].values)
+    df_long = get_LOCs_df_from_NetCDF(sites=sites, specs=specs, wd=wd,
+                                      long_form=True)
+    assert list(df_long.columns) == ['datetime', 'site', 'spec', 'value']
+    df_long = df_long.set_index(['datetime', 'site', 'spec'])['value']
+    assert np.allclose(df_long.unstack(['site', 'spec'])[df.columns].values,
+                       df.values)
+
+
+def test_get_general_stats4run_dict_as_df_bpch(ctm_nc, monkeypatch):
+    from .. import GEOSChem_bpch
+    specs = ['O3', 'NO', 'NO2', 'N2O5', 'NIT', 'NITs']
+    run_dict = {}
+    for n in range(3):
+        run_dict['run{}'.format(n)], NIU = ctm_nc(
+            ['TIME_TPS__TIMETROP', 'DAO_3D_S__TMPU', 'BXHGHT_S__AD',
+             'BXHGHT_S__BXHEIGHT'] + ['IJ_AVG_S__'+i for i in specs],
+            folder='run{}'.format(n))
+    monkeypatch.setattr(GEOSChem_bpch, 'get_surface_area',
+                        lambda res: np.ones((72, 46, 1)))
+    df = get_general_stats4run_dict_as_df_bpch(run_dict=run_dict,
+                                               save2csv=False, REF1='run0')
+    df_pool = get_general_stats4run_dict_as_df_bpch(run_dict=run_dict,
+                                                    save2csv=False,
+                                                    REF1='run0', n_workers=2)
+    assert list(df.index) == ['run0', 'run1', 'run2']
+    assert 'O3 burden (Tg)' in df.columns
+    assert np.allclose(df['O3 burden (Tg) (% vs. run0)']['run0'], 0)
+    assert list(df.columns) == list(df_pool.columns)
+    assert np.allclose(df.values, df_pool.values, equal_nan=True)
+    # The stats for each run are those of the run (with the shared fields)
+    shared = {
+        't_p': get_GC_output(wd=run_dict['run0'],
+                             vars=['TIME_TPS__TIMETROP'], trop_limit=True),
+        'K': get_GC_output(wd=run_dict['run0'], vars=['DAO_3D_S__TMPU'],
+                           trop_limit=True),
+        'a_m': get_air_mass_np(wd=run_dict['run0'], trop_limit=True),
+        's_area': np.ones((72, 46)),
+        'vol': get_volume_np(wd=run_dict['run0'], res='4x5'),
+    }
+    stats = dict([(i, get_general_stats4run_bpch(wd=run_dict[i],
+                                                 shared=shared))
+                  for i in ('run0', 'run2')])
+    pcent = (stats['run2']-stats['run0']) / stats['run0'] * 100
+    cols = ['{} (% vs. run0)'.format(i) for i in pcent.index]
+    assert np.allclose(df.loc['run2', cols].values, pcent.round(3).values)
+
+
+def test_fam_data_extractor4fams(ctm_nc):
+    specs = ['NO', 'NO2', 'O3', 'HNO3', 'NIT', 'NITs']
+    wd, NIU = ctm_nc(['IJ_AVG_S__'+i for i in specs], shape=(10, 8, 38, 2))
+    fams = ['NOx', 'O3', 'TNO3', 'NIT_ALL']
+    data, units = fam_data_extractor(wd=wd, fams=fams, rtn_units=True)
+    for fam in fams:
+        arr, units4fam = fam_data_extractor(wd=wd, fam=fam, rtn_units=True)
+        assert units[fam] == units4fam
+        assert np.allclose(data[fam], arr)
+    # Families are the scaled (stoichiometry weighted) sums of tracers
+    tracers = dict(zip(specs, get_GC_output(
+        wd=wd, r_list=True, vars=['IJ_AVG_S__'+i for i in specs])))
+    ref = (tracers['NO']+tracers['NO2']).mean(axis=-1)*1E12
+    assert np.allclose(data['NOx'], ref)
+    ref = sum([tracers[i]*spec_stoich(i, ref_spec='N')
+               for i in ('HNO3', 'NIT', 'NITs')])
+    assert np.allclose(data['TNO3'], ref.mean(axis=-1))
+    assert np.allclose(data['NIT_ALL'], ref.mean(axis=-1)*1E12)
+    # Single families keep the type of the tracers
+    arr = fam_data_extractor(wd=wd, fam='NOx')
+    assert arr.dtype == np.float32
+    # Species returned as a list are weighted by stoichiometry, but unscaled
+    ars, specs4fam = fam_data_extractor(wd=wd, fam='NIT_ALL', rtn_list=True,
+                                        rtn_specs=True)
+    assert specs4fam == ['HNO3', 'NIT', 'NITs']
+    for n, spec in enumerate(specs4fam):
+        ref = tracers[spec]*spec_stoich(spec, ref_spec='N')
+        assert np.allclose(ars[n], ref.mean(axis=-1))
+    # ... or returned as extracted (if there are no stoichiometry weights)
+    ars = fam_data_extractor(wd=wd, fam='NOx', rtn_list=True)
+    ref = get_GC_output(wd=wd, vars=['IJ_AVG_S__NO2', 'IJ_AVG_S__NO'])
+    assert len(ars) == 2
+    for n in range(2):
+        assert np.allclose(ars[n], ref[n].mean(axis=-1))
+
+
+def test_unit_conversion_kernel():
+    specs = ['O3', 'NO2', 'HNO3']
+    rng = np.random.RandomState(1)
+    shape = (10, 8, 38, 2)
+    stack = rng.random_sample((len(specs),) + shape) * 1E-9
+    a_m = rng.random_sample(shape) * 1E12
+    vol = rng.random_sample(shape) * 1E15
+    mols = a_m*1E3/constants('RMM_air')
+    # Stacked conversions should match the per species equations
+    arr = convert_v_v2ngm3(stack, spec=specs, a_m=a_m, vol=vol)
+    for n, spec in enumerate(specs):
+        ref = stack[n]*mols*species_mass(spec)*1E9/vol
+        assert np.allclose(arr[n], ref)
+        assert np.allclose(convert_v_v2ngm3(stack[n], spec=spec, a_m=a_m,
+                                            vol=vol), ref)
+    arr = species_v_v_to_Gg(stack, specs, a_m=a_m, Iodine=False, All=True)
+    for n, spec in enumerate(specs):
+        assert np.allclose(arr[n], stack[n]*mols*species_mass(spec)/1E9)
+    # In place conversion (and back again)
+    ref = stack*mols*constants('AVG')/vol
+    copy = stack.copy()
+    arr = convert_v_v_2_molec_cm3(copy, vol=vol, a_m=a_m, out=copy)
+    assert arr is copy
+    assert np.allclose(arr, ref)
+    arr = convert_molec_cm3_2_v_v(stack*1E10, out=stack)
+    assert arr is stack
+    # Scalars (and lists) can also be converted
+    val = convert_spec_v_v_2_ugm3(spec='O3', data=40E-9)
+    assert np.isclose(val, 40E-9*0.001225/constants('RMM_air') *
+                      species_mass('O3')*1E12)
+    copy = stack.copy()
+    arr = convert_spec_v_v_2_ugm3(spec=specs, data=copy)
+    assert arr is copy
+    # Stacked prod/loss arrays match a list of arrays
+    ars = [i for i in copy]
+    kwargs = dict(ref_spec='O3', vol=vol, rm_strat=False,
+                  limit_Prod_loss_dim_to=20)
+    arr = convert_molec_cm3_s_2_g_X_s(ars=ars, **kwargs)
+    assert arr.shape == shape[:2] + (20, 2, len(specs))
+    assert np.allclose(arr, convert_molec_cm3_s_2_g_X_s(ars=copy, **kwargs))
+    assert np.allclose(arr[..., 0], copy[0, :, :, :20]*vol[:, :, :20] /
+                       constants('AVG')*species_mass('O3'))
+
+
+def test_get_trop_burdens4specs(ctm_nc):
+    specs = ['O3', 'NO2', 'CO']
+    shape = (10, 8, 38, 3)
+    wd, arrs = ctm_nc(['IJ_AVG_S__'+i for i in specs] +
+                      ['TIME_TPS__TIMETROP', 'BXHGHT_S__AD'], shape=shape)
+    arrs = dict((k, np.transpose(v, (1, 2, 3, 0)).astype(np.float32))
+                for k, v in arrs.items())
+    a_m = arrs['BXHGHT_S__AD'].astype(np.float64)
+    t_p = arrs['TIME_TPS__TIMETROP']
+    moles = a_m*1E3/constants('RMM_air')
+    burdens = get_trop_burdens4specs(specs, wd=wd, chunk_size=2)
+    # Blocks of times can also be sized by memory (here 1 then 2 times)
+    burdens4mem = get_trop_burdens4specs(specs, wd=wd, max_block_mem=3.5E5)
+    for spec in specs:
+        ref = arrs['IJ_AVG_S__'+spec]*moles*species_mass(spec)/1E9*t_p
+        assert np.allclose(burdens[spec], ref.mean(axis=3))
+        assert np.allclose(burdens4mem[spec], ref.mean(axis=3))
+        assert np.allclose(get_trop_burden(spec=spec, wd=wd, all_data=False),
+                           ref.mean(axis=3))
+    # The same values if arrays are given, and column values in DU
+    s_area = np.random.random(shape[:2])
+    ars = dict((i, arrs['IJ_AVG_S__'+i]) for i in specs)
+    DUs = get_trop_burdens4specs(specs, a_m=a_m, t_p=t_p, ars=ars,
+                                 s_area=s_area, units='DU')
+    for spec in specs:
+        ref = (ars[spec]*moles*constants('AVG')*t_p).sum(axis=2)
+        ref = ref.mean(axis=2)/s_area/constants('mol2DU')
+        assert np.allclose(DUs[spec], ref)
+    assert np.allclose(get_DU_mean(spec='CO', wd=wd, s_area=s_area),
+                       np.sum(DUs['CO']*s_area)/np.sum(s_area))
+
+
+def test_mask4troposphere():
+    rng = np.random.RandomState(2)
+    shape = (10, 8, 38, 3)
+    arr = rng.random_sample(shape)
+    molecs = rng.random_sample(shape)
+    t_p = rng.choice([0., 0.5, 1.], size=shape)
+    # Masking by time in troposphere, as masked or plain arrays
+    ref = np.ma.array(arr, mask=t_p != 1)
+    masked = mask4troposphere([arr], t_ps=t_p, multiply_method=False)[0]
+    assert np.array_equal(masked.mask, ref.mask)
+    filled = mask4troposphere([arr], t_ps=t_p, multiply_method=False,
+                              fill_value=np.nan)[0]
+    assert not isinstance(filled, np.ma.MaskedArray)
+    assert np.array_equal(np.isnan(filled), ref.mask)
+    # Masking by tropopause level
+    t_lvl = rng.randint(1, 39, size=shape[:2]+shape[-1:])
+    masked = mask4troposphere([arr], t_lvl=t_lvl, use_time_in_trop=False,
+                              multiply_method=False)[0]
+    levels = np.arange(1, 39)[None, None, :, None]
+    assert np.array_equal(masked.mask, levels > t_lvl[:, :, None, :])
+    # Compact masks, with the time dimension removed for 3D arrays
+    keep = get_trop_mask(t_ps=t_p, ndim=3, multiply_method=False)
+    assert np.array_equal(keep, (t_p == 1).any(axis=-1))
+    keep = get_trop_mask(t_ps=t_p[..., 0], ndim=3, multiply_method=False)
+    assert np.array_equal(keep, t_p[..., 0] == 1)
+    weights = get_trop_mask(t_ps=t_p[..., 0], ndim=3)
+    assert np.array_equal(weights, t_p[..., 0])
+    # Molecule weighted averages of masked arrays
+    val = molec_weighted_avg(ref, molecs=molecs, t_p=t_p, weight_lon=True)
+    ref_molecs = np.ma.array(molecs, mask=ref.mask)
+    assert not isinstance(val, np.ma.MaskedArray)
+    assert np.allclose(val, (ref*ref_molecs).sum(axis=0) /
+                       ref_molecs.sum(axis=0))
+    # The stratosphere is taken to be removed already if t_p is given
+    # (e.g. 3D arrays multiplied by time in troposphere, as in KPP.py)
+    arr3D, molecs3D, t_p3D = arr[..., 0]*t_p[..., 0], molecs[..., 0], \
+        t_p[..., 0]
+    val = molec_weighted_avg(arr3D, molecs=molecs3D, t_p=t_p3D,
+                             weight_lon=True, weight_lat=True)
+    assert val.shape == (38,)
+    assert np.allclose(val, (arr3D*molecs3D).sum(axis=(0, 1)) /
+                       molecs3D.sum(axis=(0, 1)))
+
+
+def test_split_4D_array_into_seasons():
+    arr = np.random.random((10, 8, 38, 12))
+    ars, seasons = split_4D_array_into_seasons(arr)
+    assert seasons == ['Annual', 'DJF', 'MAM', 'JJA', 'SON']
+    for n, inds in enumerate([list(range(12)), [11, 0, 1], [2, 3, 4],
+                              [5, 6, 7], [8, 9, 10]]):
+        assert np.allclose(ars[n], arr[..., inds].mean(axis=-1))
+
+
+def mk_test_geos_log(filename, OH=10., month=1):
+    """ Make a geos.log file with the records read by scan_geos_log """
+    lines = [
+        '     => SIMULATION START TIME: 2018/09/11 16:39  <=',
+        '{:<29}:{}'.format(' Start time of run', ' 2005{:0>2}01 000000'.format(
+            month)),
+        ' Some other output',
+        ' Mean OH =    {:.4f} [1e5 molec/cm3]'.format(OH),
+        'CH4 (90N - 30N) :  1800.0 [ppbv]',
+        'CH4 (30N - 00 ) :  1790.0 [ppbv]',
+        ' Strat-Trop Exchange',
+        ' -------------------',
+        '',
+        ' 2005/{:0>2}/01 - 2005/{:0>2}/01'.format(month, month+1),
+        '',
+        ' Tracer    [moles]    = [Tg a-1]',
+        ' NOx:    1.0    {}'.format(OH),
+        ' O3:     3.0    4.0',
+        '',
+        ' ===============================',
+        '{:<29}:{}'.format(' End time of run', ' 2005{:0>2}01 000000'.format(
+            month+1)),
+        '     => SIMULATION   END TIME: 2018/09/11 18:39  <=',
+    ]
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines)+'\n')
+
+
+def test_get_geos_log_records(tmp_path):
+    wd = str(tmp_path)
+    for month in (1, 2, 3):
+        mk_test_geos_log(wd+'/geos.log.{}'.format(month), OH=month,
+                         month=month)
+    records = get_geos_log_records(wd=wd, n_workers=2)
+    assert len(records) == 3
+    assert get_OH_mean(wd) == 2.
+    assert np.isclose(get_CH4_mean(wd), 1795E-9)
+    record = records[wd+'/geos.log.1']
+    assert record['timing']['Model Start'] == datetime_(2005, 1, 1)
+    assert record['timing']['Real End'] == datetime_(2018, 9, 11, 18, 39)
+    df = get_STRAT_TROP_exchange_from_geos_log(wd+'/geos.log.3')
+    assert list(df.index) == ['NOx', 'O3']
+    assert list(df.values) == [3., 4.]
+    # Records are reused until the file is changed
+    assert get_geos_log_records(wd=wd) == records
+    record = get_geos_log_records(wd=wd)[wd+'/geos.log.1']
+    assert record is records[wd+'/geos.log.1']
+    mk_test_geos_log(wd+'/geos.log.1', OH=10.5, month=1)
+    assert get_geos_log_records(wd=wd)[wd+'/geos.log.1']['OH'] == [10.5]
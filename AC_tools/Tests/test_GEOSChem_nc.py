@@ -0,0 +1,174 @@
+from ..GEOSChem_nc import *
+import logging
+import pytest
+logging.basicConfig(filename='test.log', level=logging.DEBUG)
+
+
+def mk_test_GEOSChem_nc_files(folder, collection='SpeciesConc', ndays=5,
+                              specs=['O3', 'NO'], shape=(4, 3, 2)):
+    """ Make daily GEOS-Chem NetCDF (nc4) files of hourly output """
+    dss = []
+    for day in range(ndays):
+        date = datetime.datetime(2019, 1, 1) + datetime.timedelta(days=day)
+        times = pd.date_range(date, periods=24, freq='h')
+        coords = {
+            'time': times, 'lev': np.arange(shape[0])+1.,
+            'lat': np.linspace(-45, 45, shape[1]),
+            'lon': np.linspace(-90, 90, shape[2]),
+        }
+        data_vars = {}
+        for spec in specs:
+            data = np.random.random((24,)+shape).astype(np.float32)
+            data_vars['SpeciesConc_'+spec] = (['time', 'lev', 'lat', 'lon'],
+                                              data, {'units': 'mol mol-1 dry'})
+        ds = xr.Dataset(data_vars, coords=coords)
+        ds['time'].encoding['units'] = 'hours since 2019-01-01 00:00:00'
+        filename = '{}/GEOSChem.{}.{}_0000z.nc4'.format(
+            folder, collection, date.strftime('%Y%m%d'))
+        ds.to_netcdf(filename)
+        dss += [ds]
+    return xr.concat(dss, dim='time')
+
+
+def test_get_GEOSChem_files_as_ds(tmp_path, monkeypatch):
+    wd = str(tmp_path)
+    ref = mk_test_GEOSChem_nc_files(wd)
+    opened = []
+    open_mfdataset = xr.open_mfdataset
+
+    def open_mfdataset4test(files, **kwargs):
+        opened.extend(files)
+        return open_mfdataset(files, **kwargs)
+    monkeypatch.setattr(xr, 'open_mfdataset', open_mfdataset4test)
+    start = datetime.datetime(2019, 1, 2, 12)
+    end = datetime.datetime(2019, 1, 4)
+    ds = get_GEOSChem_files_as_ds(wd=wd, start=start, end=end,
+                                  variables=['SpeciesConc_O3'])
+    assert list(ds.data_vars) == ['SpeciesConc_O3']
+    assert len(ds['time']) == 36
+    assert pd.Timestamp(ds['time'].values[0]) == start
+    assert np.allclose(ds['SpeciesConc_O3'].values,
+                       ref['SpeciesConc_O3'].sel(time=ds['time']).values)
+    # Only the files needed are opened
+    assert [os.path.basename(i)[-18:-10] for i in opened] == [
+        '20190102', '20190103']
+    catalog = get_GEOSChem_files_catalog(wd=wd)
+    assert os.path.isfile(os.path.join(wd, GEOSChem_catalog_filename))
+    assert list(catalog['ntimes']) == [24]*5
+    assert len(set(catalog['coord_hash'])) == 1
+    assert catalog['end'].iloc[0] == pd.Timestamp(2019, 1, 1, 23)
+    # The catalog is updated if files change
+    mk_test_GEOSChem_nc_files(wd, ndays=1, specs=['CO'])
+    catalog = get_GEOSChem_files_catalog(wd=wd)
+    assert catalog['variables'].iloc[0] == 'SpeciesConc_CO'
+    assert catalog['variables'].iloc[1] == 'SpeciesConc_NO SpeciesConc_O3'
+    ds = get_GEOSChem_files_as_ds(wd=wd, variables=['SpeciesConc_CO'])
+    assert len(ds['time']) == 24
+
+
+def test_GetSpeciesConcDataset_selection(tmp_path):
+    wd = str(tmp_path)
+    ref = mk_test_GEOSChem_nc_files(wd, ndays=2, shape=(4, 3, 3))
+    ds = GetSpeciesConcDataset(wd=wd, variables=['SpeciesConc_NO'],
+                               levels=(0, 1), lat_range=(-10, 50),
+                               lon_range=(50, -50))
+    assert list(ds.data_vars) == ['SpeciesConc_NO']
+    assert ds['SpeciesConc_NO'].shape == (48, 1, 2, 2)
+    assert list(ds['lon'].values) == [-90, 90]
+    ref = ref['SpeciesConc_NO'].isel(lev=[0], lat=[1, 2], lon=[0, 2])
+    assert np.allclose(ds['SpeciesConc_NO'].values, ref.values)
+
+
+def test_convert_GEOSChem_files2zarr(tmp_path):
+    pytest.importorskip('zarr')
+    wd = str(tmp_path)
+    ref = mk_test_GEOSChem_nc_files(wd, ndays=2)
+    store = convert_GEOSChem_files2zarr(
+        wd=wd, var_chunks={'SpeciesConc_NO': 'timeseries'})
+    assert store == os.path.join(wd, 'GEOSChem.SpeciesConc.zarr')
+    ds = xr.open_zarr(store, consolidated=True)
+    assert ds['SpeciesConc_O3'].encoding['chunks'] == (1, 4, 3, 2)
+    assert ds['SpeciesConc_NO'].encoding['chunks'] == (48, 1, 3, 2)
+    # Only new times are appended
+    new = mk_test_GEOSChem_nc_files(wd, ndays=3)
+    convert_GEOSChem_files2zarr(wd=wd)
+    convert_GEOSChem_files2zarr(wd=wd)
+    # Readers open the store instead of the files
+    ds = GetSpeciesConcDataset(wd=wd, variables=['SpeciesConc_NO'],
+                               levels=(0, 1),
+                               start=datetime.datetime(2019, 1, 2))
+    assert ds['SpeciesConc_NO'].encoding['chunks'] == (48, 1, 3, 2)
+    assert ds['SpeciesConc_NO'].shape == (48, 1, 3, 2)
+    ref = xr.concat([ref.isel(time=slice(24, 48)),
+                     new.isel(time=slice(48, None))], dim='time')
+    ref = ref['SpeciesConc_NO'].isel(lev=[0])
+    assert np.allclose(ds['SpeciesConc_NO'].values, ref.values)
+    # Files are opened if they have times after those in the store
+    mk_test_GEOSChem_nc_files(wd, ndays=4)
+    ds = GetSpeciesConcDataset(wd=wd)
+    assert len(ds['time']) == 96
+    assert 'chunks' not in ds['SpeciesConc_NO'].encoding
+
+
+def test_get_Gg_trop_burden(tmp_path):
+    wd = str(tmp_path)
+    mk_test_GEOSChem_nc_files(wd, ndays=2)
+    ds = GetSpeciesConcDataset(wd=wd)
+    # StateMet for a longer run (i.e. with times before those in ds)
+    coords = dict(ds.coords)
+    coords['time'] = pd.date_range(datetime.datetime(2018, 12, 31),
+                                   periods=72, freq='h')
+    shape = (72,) + ds['SpeciesConc_O3'].shape[1:]
+    StateMet = xr.Dataset({
+        'Met_AD': (ds['SpeciesConc_O3'].dims, np.random.random(shape)*1E9),
+        'FracOfTimeInTrop': (ds['SpeciesConc_O3'].dims,
+                             np.random.random(shape)),
+    }, coords=coords)
+    vars2use = ['SpeciesConc_O3', 'SpeciesConc_NO']
+    # Burdens calculated species by species
+    ref = []
+    for var in vars2use:
+        moles = ds[var] * StateMet['Met_AD']*1E3 / constants('RMM_air')
+        mass = moles * species_mass(var.split('_')[-1]) / 1E9
+        ref += [float((mass * StateMet['FracOfTimeInTrop']).sum())]
+    for time_chunk, max_block_mem in ((None, 2.5E8), (7, 2.5E8), (24, 500)):
+        S = get_Gg_trop_burden(ds, vars2use=vars2use, StateMet=StateMet,
+                               time_chunk=time_chunk,
+                               max_block_mem=max_block_mem)
+        assert list(S.index) == vars2use
+        assert np.allclose(S.values, ref)
+    S = get_Gg_trop_burden(ds, spec='NO', StateMet=StateMet,
+                           avg_over_time=True)
+    assert np.allclose(S.values, ref[1] / 48)
+    dsL = get_Gg_trop_burden(ds, vars2use=vars2use, StateMet=StateMet,
+                             sum_spatially=False)
+    assert list(dsL.data_vars) == vars2use
+    assert np.allclose(float(dsL['SpeciesConc_O3'].sum()), ref[0])
+
+
+def test_extract_GEOSChem_files_subset(tmp_path):
+    wd = str(tmp_path)
+    ref = mk_test_GEOSChem_nc_files(wd, collection='inst1hr', ndays=3)
+    files = extract_GEOSChem_files_subset(wd=wd, levels=(1, 3),
+                                          lat_range=(0, 90), suffix='_subset',
+                                          n_workers=2)
+    assert len(files) == 3
+    assert all([i.endswith('_subset.nc4') for i in files])
+    with xr.open_dataset(files[1]) as ds:
+        assert ds['SpeciesConc_O3'].encoding['zlib']
+        assert np.allclose(ds['SpeciesConc_O3'].values,
+                           ref['SpeciesConc_O3'].isel(
+                               time=slice(24, 48), lev=[1, 2],
+                               lat=[1, 2]).values)
+    assert get_GEOSChem_levels4pressure_range(
+        ref, pressure_range=(2000, 3100)) == (1, 3)
+    # Just surface values, deleting the existing files
+    for file in files:
+        os.remove(file)
+    files = read_inst_files_save_only_surface(wd=wd, n_workers=1)
+    assert sorted(glob.glob(wd+'/*.nc4')) == files
+    with xr.open_dataset(files[0]) as ds:
+        assert ds['SpeciesConc_NO'].dims == ('time', 'lat', 'lon')
+        assert np.allclose(ds['SpeciesConc_NO'].values,
+                           ref['SpeciesConc_NO'].isel(
+                               time=slice(0, 24), lev=0).values)
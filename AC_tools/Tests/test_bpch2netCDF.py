@@ -2,6 +2,7 @@ from ..bpch2netCDF import *
 import logging
 import pytest
 import os
+import numpy as np
 #import urllib.parse, urllib.error
 # temporality restore urllib2 as urllib not installed
 try:
@@ -85,3 +86,192 @@ def test_get_folder():
     assert os.path.exists(folder), "Cannot find the test folder"
     logging.info("test complete")
     return
+
+
+def write_fortran_record(file_, data):
+    """ Write bytes to a file as a big-endian Fortran unformatted record """
+    marker = np.array([len(data)], dtype='>i4').tobytes()
+    file_.write(marker + data + marker)
+
+
+def mk_test_bpch_file(filename, arrs, taus, category='IJ-AVG-$', tracer=1,
+                      unit='ppbv'):
+    """ Make a small 4x5 bpch file with a datablock per (lon, lat, lev) arr """
+    if not isinstance(tracer, list):
+        tracer = [tracer] * len(arrs)
+    with open(filename, 'wb') as file_:
+        write_fortran_record(file_, b'CTM bin 02'.ljust(40))
+        write_fortran_record(file_, b'Test bpch file'.ljust(80))
+        for arr, tau, tracer4arr in zip(arrs, taus, tracer):
+            header1 = np.zeros(1, dtype=bpch_datablock_header1_dtype)
+            header1['modelname'] = b'GEOS5_47L'
+            header1['lonres'], header1['latres'] = 5., 4.
+            header1['halfpolar'], header1['center180'] = 1, 1
+            header2 = np.zeros(1, dtype=bpch_datablock_header2_dtype)
+            header2['category'] = category.encode().ljust(40)
+            header2['tracer'] = tracer4arr
+            header2['unit'] = unit.encode().ljust(40)
+            header2['tau0'], header2['tau1'] = tau, tau+1
+            header2['dim'] = list(arr.shape) + [1, 1, 1]
+            header2['skip'] = arr.size*4 + 8
+            write_fortran_record(file_, header1.tobytes())
+            write_fortran_record(file_, header2.tobytes())
+            data = arr.astype('>f4').flatten(order='F').tobytes()
+            write_fortran_record(file_, data)
+
+
+def test_bpch_to_netCDF_via_numpy(tmp_path):
+    arrs = [np.random.random((72, 46, 3)) for i in range(2)]
+    bpch_file = str(tmp_path / 'test.bpch')
+    mk_test_bpch_file(bpch_file, arrs, taus=[262968., 263712.])
+    with open(str(tmp_path / 'diaginfo.dat'), 'w') as file_:
+        file_.write('#  offset    name\n     0 IJ-AVG-$    Tracer conc.\n')
+    with open(str(tmp_path / 'tracerinfo.dat'), 'w') as file_:
+        file_.write('# name\nO3       Ozone       48.00E-3   1       1' +
+                    '  1.000E+09 ppbv\n')
+    # Check the headers are read without the data
+    headers = get_bpch_datablock_headers(bpch_file)
+    assert len(headers) == 2
+    assert headers[0]['shape'] == (72, 46, 3)
+    # Convert and check the values are the same
+    output_file = str(tmp_path / 'ctm.nc')
+    bpch_to_netCDF(folder=str(tmp_path), remake=True,
+                   bpch_file_list=['test.bpch'])
+    with netCDF4.Dataset(output_file, 'r') as rootgrp:
+        var = rootgrp['IJ_AVG_S__O3']
+        assert var.ctm_units == 'ppbv'
+        assert var.shape == (2, 72, 46, 3)
+        for n, arr in enumerate(arrs):
+            assert np.allclose(var[n], arr)
+        assert np.allclose(rootgrp['latitude'][[0, -1]], [-89., 89.])
+        assert np.allclose(rootgrp['longitude'][[0, -1]], [-180., 175.])
+
+
+def test_get_bpch_index(tmp_path):
+    arrs = [np.full((72, 46, 3), n, dtype=np.float32) for n in range(3)]
+    bpch_file = str(tmp_path / 'test.ctm.bpch')
+    mk_test_bpch_file(bpch_file, arrs, taus=[0., 744., 1416.])
+    df = get_bpch_index(folder=str(tmp_path))
+    assert df.shape[0] == 3
+    assert os.path.exists(str(tmp_path / 'bpch_index.csv'))
+    # Read just the 2nd month via the saved index
+    import datetime
+    arr = read_bpch_var_from_index(folder=str(tmp_path), var=df['var'][0],
+                                   start=datetime.datetime(1985, 2, 1),
+                                   end=datetime.datetime(1985, 3, 1))
+    assert arr.shape == (1, 72, 46, 3)
+    assert (arr == 1).all()
+
+
+def test_convert_to_netCDF_in_parallel(tmp_path):
+    folder = str(tmp_path)
+    jobs = []
+    for n, tau in enumerate([0., 744.]):
+        bpch_file = 'ts{}.bpch'.format(n)
+        mk_test_bpch_file(os.path.join(folder, bpch_file),
+                          [np.full((72, 46, 3), n)], taus=[tau])
+        jobs += [dict(folder=folder, filename='ts_ctm_{}.nc'.format(n),
+                      bpch_file_list=[bpch_file])]
+    ncfiles = convert_to_netCDF_in_parallel(jobs=jobs, n_workers=2,
+                                            max_mem_per_worker=8)
+    # Merge the files into a single NetCDF along time
+    output_file = os.path.join(folder, 'ts_ctm.nc')
+    merge_NetCDF_files_along_time(files=ncfiles, output_file=output_file)
+    with netCDF4.Dataset(output_file, 'r') as rootgrp:
+        assert np.allclose(rootgrp['time'][:], [0., 744.])
+        var = rootgrp['IJ_AVG_S__TRACER_1']
+        assert var.shape == (2, 72, 46, 3)
+        assert np.allclose(var[1], 1)
+
+
+def test_bpch_to_netCDF_append(tmp_path):
+    folder = str(tmp_path)
+    mk_test_bpch_file(os.path.join(folder, 'ts1.bpch'),
+                      [np.full((72, 46, 3), 1)], taus=[0.])
+    bpch_to_netCDF(folder=folder, filetype='ts*.bpch', filename='ts_ctm.nc')
+    # Add a new file and then append it to the existing NetCDF
+    mk_test_bpch_file(os.path.join(folder, 'ts2.bpch'),
+                      [np.full((72, 46, 3), 2)], taus=[24.])
+    for n in range(2):
+        bpch_to_netCDF(folder=folder, filetype='ts*.bpch',
+                       filename='ts_ctm.nc', append=True)
+    with netCDF4.Dataset(os.path.join(folder, 'ts_ctm.nc'), 'r') as rootgrp:
+        assert np.allclose(rootgrp['time'][:], [0., 24.])
+        var = rootgrp['IJ_AVG_S__TRACER_1']
+        assert np.allclose(var[:].mean(axis=(1, 2, 3)), [1, 2])
+        assert rootgrp.bpch_files == 'ts1.bpch;ts2.bpch'
+
+
+def test_bpch_to_netCDF_write_profile(tmp_path):
+    folder = str(tmp_path)
+    arr = np.random.random((72, 46, 3))
+    mk_test_bpch_file(os.path.join(folder, 'test.bpch'), [arr], taus=[0.])
+    bpch_to_netCDF(folder=folder, filetype='*.bpch', write_profile='archive')
+    with netCDF4.Dataset(os.path.join(folder, 'ctm.nc'), 'r') as rootgrp:
+        var = rootgrp['IJ_AVG_S__TRACER_1']
+        assert var.filters()['zlib']
+        assert var.chunking() == [1, 72, 46, 3]
+        assert np.allclose(var[0], arr)
+
+
+def test_bpch_to_netCDF_append_to_growing_file(tmp_path):
+    folder = str(tmp_path)
+    bpch_file = os.path.join(folder, 'ts.ctm.bpch')
+    arrs = [np.full((72, 46, 3), n) for n in range(3)]
+    mk_test_bpch_file(bpch_file, arrs[:1], taus=[0.])
+    bpch_to_netCDF(folder=folder, filetype='ts*.bpch', filename='ts_ctm.nc')
+    # A new datablock is written to the same (still running) file
+    mk_test_bpch_file(bpch_file, arrs[:2], taus=[0., 24.])
+    bpch_to_netCDF(folder=folder, filetype='ts*.bpch', filename='ts_ctm.nc',
+                   append=True)
+    mk_test_bpch_file(bpch_file, arrs, taus=[0., 24., 48.])
+    for n in range(2):
+        bpch_to_netCDF(folder=folder, filetype='ts*.bpch',
+                       filename='ts_ctm.nc', append=True)
+    with netCDF4.Dataset(os.path.join(folder, 'ts_ctm.nc'), 'r') as rootgrp:
+        assert np.allclose(rootgrp['time'][:], [0., 24., 48.])
+        var = rootgrp['IJ_AVG_S__TRACER_1']
+        assert np.allclose(var[:].mean(axis=(1, 2, 3)), [0, 1, 2])
+        assert rootgrp.bpch_files == 'ts.ctm.bpch'
+
+
+def test_bpch_to_netCDF_append_to_partly_written_file(tmp_path):
+    folder = str(tmp_path)
+    bpch_file = os.path.join(folder, 'ts.ctm.bpch')
+    nc_file = os.path.join(folder, 'ts_ctm.nc')
+    # Two tracers are written for each time step, one at a time
+    arrs = [np.full((72, 46, 3), n) for n in range(6)]
+    taus = [0., 0., 24., 24., 48., 48.]
+    tracers = [1, 2, 1, 2, 1, 2]
+    mk_test_bpch_file(bpch_file, arrs, taus=taus, tracer=tracers)
+    full_size = os.path.getsize(bpch_file)
+    ndatablock = (full_size - 136) // 6
+    # The file is cut part way through the data of the 4th datablock ...
+    os.truncate(bpch_file, 136 + ndatablock*3 + 500)
+    headers = get_bpch_datablock_headers(bpch_file)
+    assert [i['tau0'] for i in headers] == [0., 0., 24.]
+    bpch_to_netCDF(folder=folder, filetype='ts*.bpch', filename='ts_ctm.nc')
+    # ... and then through the header of the 5th datablock
+    mk_test_bpch_file(bpch_file, arrs, taus=taus, tracer=tracers)
+    os.truncate(bpch_file, 136 + ndatablock*4 + 50)
+    bpch_to_netCDF(folder=folder, filetype='ts*.bpch', filename='ts_ctm.nc',
+                   append=True)
+    with netCDF4.Dataset(nc_file, 'r') as rootgrp:
+        assert np.allclose(rootgrp['time'][:], [0., 24.])
+    # The rest of the 2nd time step is added once the file is complete
+    mk_test_bpch_file(bpch_file, arrs, taus=taus, tracer=tracers)
+    bpch_to_netCDF(folder=folder, filetype='ts*.bpch', filename='ts_ctm.nc',
+                   append=True)
+    with netCDF4.Dataset(nc_file, 'r') as rootgrp:
+        assert np.allclose(rootgrp['time'][:], [0., 24., 48.])
+        var = rootgrp['IJ_AVG_S__TRACER_1']
+        assert np.allclose(var[:].mean(axis=(1, 2, 3)), [0, 2, 4])
+        var = rootgrp['IJ_AVG_S__TRACER_2']
+        assert not np.ma.is_masked(var[:])
+        assert np.allclose(var[:].mean(axis=(1, 2, 3)), [1, 3, 5])
+    # Corruption before the end of the file is still an error
+    with open(bpch_file, 'r+b') as file_:
+        file_.seek(136 + ndatablock - 4)
+        file_.write(np.array([1], dtype='>i4').tobytes())
+    with pytest.raises(IOError):
+        get_bpch_datablock_headers(bpch_file)
@@ -86,3 +86,86 @@ def test_get_latlonalt4res_default():
     assert len(lat) == 46, 'The default latitude is wrong'
     assert len(lon) == 72, 'The default longitude is wrong'
     assert len(alt) == 47, 'The default altidure is wrong'
+
+
+def test_get_NetCDF_handle(tmp_path):
+    filename = str(tmp_path / 'test.nc')
+    with Dataset(filename, 'w') as ncfile:
+        ncfile.createDimension('lon', 3)
+        ncfile.createVariable('lon', 'f4', ('lon',))[:] = [1, 2, 3]
+    # The same handle is reused for the same file
+    handle = get_NetCDF_handle(filename)
+    assert get_NetCDF_handle(filename) is handle
+    assert np.allclose(handle['lon'][:], [1, 2, 3])
+    # The least recently used handles are closed beyond the max. pool size
+    filename2 = str(tmp_path / 'test2.nc')
+    with Dataset(filename2, 'w') as ncfile:
+        ncfile.createDimension('lon', 1)
+    set_NetCDF_handle_pool_maxsize(1)
+    get_NetCDF_handle(filename2)
+    assert not handle.isopen()
+    close_NetCDF_handles()
+    set_NetCDF_handle_pool_maxsize(32)
+    get_NetCDF_handle(filename)
+    handle = get_NetCDF_handle(filename2)
+    assert len(NetCDF_handle_pool) == 2
+    # Reducing the max. pool size closes the least recently used handles
+    set_NetCDF_handle_pool_maxsize(1)
+    assert list(NetCDF_handle_pool.values())[0][0] is handle
+    set_NetCDF_handle_pool_maxsize(32)
+    reset_NetCDF_handle_pool()
+    assert len(NetCDF_handle_pool) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_NetCDF_read_lock_after_fork():
+    import threading
+    # Another thread holds the read lock when the process is forked
+    locked, done = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with NetCDF_read_lock:
+            locked.set()
+            done.wait()
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    locked.wait()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # The (reset) lock can be used by the child
+            os._exit(0 if NetCDF_read_lock.acquire(timeout=5) else 1)
+        NIU, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+    finally:
+        done.set()
+        thread.join()
+
+
+def test_cache_array_output(tmp_path):
+    wd = tmp_path / 'wd'
+    wd.mkdir()
+    (wd / 'ctm.nc').write_bytes(b'1')
+    calls = []
+
+    @cache_array_output
+    def get_arr(wd, scale=1., debug=False):
+        calls.append(wd)
+        return np.arange(4.) * scale
+    set_array_cache(str(tmp_path / 'cache'), max_size=1.)
+    try:
+        arr = get_arr(str(wd), scale=2.)
+        cached_arr = get_arr(str(wd), 2., debug=True)
+        assert isinstance(cached_arr, np.memmap)
+        assert np.allclose(arr, cached_arr)
+        assert len(calls) == 1
+        # New arguments or modified source files are not read from the cache
+        get_arr(str(wd), scale=3.)
+        (wd / 'ctm.nc').write_bytes(b'12')
+        get_arr(str(wd), scale=2.)
+        assert len(calls) == 3
+        # Least recently used arrays are removed above the max. cache size
+        trim_array_cache(max_size=0.)
+        assert len(os.listdir(str(tmp_path / 'cache'))) == 0
+    finally:
+        set_array_cache(None)
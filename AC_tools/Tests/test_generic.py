@@ -1,4 +1,5 @@
 from ..bpch2netCDF import *
+from ..generic import *
 import logging
 import pytest
 logging.basicConfig(filename='test.log', level=logging.DEBUG)
@@ -9,4 +10,27 @@ def test_get_folder():
     return
 
 
+def test_get_NetCDF_write_encoding():
+    dims = ('time', 'lon', 'lat', 'lev')
+    shape = (0, 72, 46, 47)
+    # Map profile - a full field per chunk
+    enc = get_NetCDF_write_encoding(profile='map', dims=dims, shape=shape)
+    assert enc == {'chunksizes': (1, 72, 46, 47)}
+    # Time series profile - long time chunks over small tiles
+    enc = get_NetCDF_write_encoding(profile='timeseries', dims=dims,
+                                    shape=(8760, 72, 46, 47), time_chunk=24)
+    assert enc['chunksizes'] == (24, 8, 8, 1)
+    # Archive profile - compressed and (optionally) bit rounded
+    enc = get_NetCDF_write_encoding(profile='archive', dims=dims, shape=shape,
+                                    dtype='f4', nsd=3)
+    assert enc['zlib'] and enc['shuffle']
+    assert enc['significant_digits'] == 3
+    # Coordinates are not chunked or bit rounded
+    enc = get_NetCDF_write_encoding(profile='archive', dims=('time',),
+                                    shape=(0,), nsd=3)
+    assert ('chunksizes' not in enc) and ('significant_digits' not in enc)
+    assert get_NetCDF_write_encoding(profile=None, dims=dims,
+                                     shape=shape) == {}
+
+
 logging.info('GEOSChem test complete')
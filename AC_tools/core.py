@@ -18,6 +18,348 @@ import os
 import inspect
 from math import log10, floor
 import math
+import collections
+import threading
+
+
+class ForkSafeRLock(object):
+    """
+    Re-entrant lock that can be reset (e.g. in forked child processes)
+
+    Notes
+    -----
+     - Resetting keeps the same object, so modules that imported the lock
+     (e.g. via "from .core import *") use the reset lock too.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+
+    def reset(self):
+        self.lock = threading.RLock()
+
+    def acquire(self, *args, **kwargs):
+        return self.lock.acquire(*args, **kwargs)
+
+    def release(self):
+        self.lock.release()
+
+    def __enter__(self):
+        return self.lock.__enter__()
+
+    def __exit__(self, *args):
+        return self.lock.__exit__(*args)
+
+
+# Pool of open NetCDF file handles, most recently used last.
+# (see get_NetCDF_handle)
+NetCDF_handle_pool = collections.OrderedDict()
+NetCDF_handle_pool_lock = threading.Lock()
+NetCDF_handle_pool_maxsize = 32
+NetCDF_handles_from_parent = []
+# The NetCDF-C library is not thread safe, so reads from threads are serialised
+NetCDF_read_lock = ForkSafeRLock()
+
+
+def set_NetCDF_handle_pool_maxsize(maxsize=32):
+    """
+    Set the max. number of files to keep open in the NetCDF handle pool
+
+    Parameters
+    ----------
+    maxsize (int): max. number of files to keep open (least recently used
+    files are closed first)
+
+    Returns
+    -------
+    (None)
+    """
+    global NetCDF_handle_pool_maxsize
+    with NetCDF_read_lock, NetCDF_handle_pool_lock:
+        NetCDF_handle_pool_maxsize = maxsize
+        close_least_recently_used_NetCDF_handles()
+
+
+def close_least_recently_used_NetCDF_handles():
+    """
+    Close the least recently used pooled NetCDF files above the max. pool size
+
+    Notes
+    -----
+     - Only call while holding NetCDF_read_lock and NetCDF_handle_pool_lock
+    """
+    while len(NetCDF_handle_pool) > NetCDF_handle_pool_maxsize:
+        NIU, (old_handle, NIU) = NetCDF_handle_pool.popitem(last=False)
+        old_handle.close()
+
+
+def get_NetCDF_handle(filename, mode='r'):
+    """
+    Get an open NetCDF file from a process-wide pool of (reused) handles
+
+    Parameters
+    ----------
+    filename (str): NetCDF file to open
+    mode (str): mode to open file in ('r' or 'a')
+
+    Returns
+    -------
+    (netCDF4.Dataset)
+
+    Notes
+    -----
+     - Do not close the returned Dataset (or use it in a "with" statement),
+     use close_NetCDF_handles instead.
+     - Handles are reopened if the file has been modified since it was opened
+     - Handles are only closed (e.g. reopened, or the least recently used
+     files above the max. pool size, see set_NetCDF_handle_pool_maxsize) while
+     holding NetCDF_read_lock. So, if other threads may use the pool, get and
+     read from handles while holding NetCDF_read_lock.
+    """
+    filename = os.path.abspath(filename)
+    mtime = os.path.getmtime(filename)
+    key = (filename, mode)
+    with NetCDF_read_lock, NetCDF_handle_pool_lock:
+        if key in NetCDF_handle_pool:
+            handle, handle_mtime = NetCDF_handle_pool.pop(key)
+            # Reuse handle, unless (another process) has updated the file
+            if (handle_mtime == mtime) or (mode != 'r'):
+                NetCDF_handle_pool[key] = (handle, handle_mtime)
+                return handle
+            logging.debug('Reopening modified file: {}'.format(filename))
+            handle.close()
+        handle = Dataset(filename, mode)
+        NetCDF_handle_pool[key] = (handle, mtime)
+        # Close the least recently used files if above the max. size
+        close_least_recently_used_NetCDF_handles()
+    return handle
+
+
+def close_NetCDF_handles(filename=None):
+    """
+    Close pooled NetCDF file handle(s) (see get_NetCDF_handle)
+
+    Parameters
+    ----------
+    filename (str): file to close handles for (default: close all files)
+
+    Returns
+    -------
+    (None)
+    """
+    with NetCDF_read_lock, NetCDF_handle_pool_lock:
+        for key in list(NetCDF_handle_pool.keys()):
+            if isinstance(filename, type(None)) or \
+                    (key[0] == os.path.abspath(filename)):
+                handle, NIU = NetCDF_handle_pool.pop(key)
+                if handle.isopen():
+                    handle.close()
+
+
+def flush_NetCDF_handles():
+    """
+    Write any pending changes for pooled NetCDF handles opened in append mode
+    """
+    with NetCDF_read_lock, NetCDF_handle_pool_lock:
+        for (filename, mode), (handle, NIU) in NetCDF_handle_pool.items():
+            if (mode != 'r') and handle.isopen():
+                handle.sync()
+
+
+def reset_NetCDF_handle_pool():
+    """
+    Empty the NetCDF handle pool without closing the files
+
+    Notes
+    -----
+     - This is called in forked child processes, as handles inherited from
+     the parent process cannot be safely used (or closed) by the child.
+     - The locks are reset too, as they may have been held by another thread
+     of the parent process when it forked.
+    """
+    global NetCDF_handle_pool_lock
+    # Keep references so the parent's files are not closed on garbage collection
+    NetCDF_handles_from_parent.extend([i for i, NIU in
+                                       NetCDF_handle_pool.values()])
+    NetCDF_handle_pool.clear()
+    NetCDF_handle_pool_lock = threading.Lock()
+    NetCDF_read_lock.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_NetCDF_handle_pool)
+
+
+# Opt-in on-disk cache of arrays extracted from model output
+# (see cache_array_output)
+array_cache_dir = os.environ.get('AC_TOOLS_ARRAY_CACHE', None)
+array_cache_max_size = 10.  # GB
+
+
+def set_array_cache(folder=None, max_size=None):
+    """
+    Switch on (or off) the on-disk cache of extracted arrays
+
+    Parameters
+    ----------
+    folder (str): folder to save cached arrays to (None switches cache off)
+    max_size (float): max. size of the cache (GB), least recently used arrays
+    are removed first
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - The cache can also be switched on by setting the AC_TOOLS_ARRAY_CACHE
+     environment variable to a folder.
+    """
+    global array_cache_dir, array_cache_max_size
+    array_cache_dir = folder
+    if not isinstance(max_size, type(None)):
+        array_cache_max_size = max_size
+    if not isinstance(folder, type(None)):
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+
+def clear_array_cache(folder=None):
+    """
+    Remove all cached arrays (see cache_array_output)
+    """
+    import glob
+    if isinstance(folder, type(None)):
+        folder = array_cache_dir
+    if isinstance(folder, type(None)):
+        return
+    for filename in glob.glob(os.path.join(folder, '*.npy')):
+        os.remove(filename)
+
+
+def get_array_cache_key(func, args, kwargs):
+    """
+    Get key for a call of a function from its source files and arguments
+
+    Parameters
+    ----------
+    func (function): function being called (needs a "wd" argument)
+    args, kwargs (list, dict): arguments the function is called with
+
+    Returns
+    -------
+    (str) or None if the call cannot be cached
+
+    Notes
+    -----
+     - The key includes the path, size and modification time of the NetCDF
+     and bpch files in the working directory (wd), so arrays are not reused
+     after the model output has changed.
+    """
+    import glob
+    import hashlib
+    import datetime
+    try:
+        call = inspect.signature(func).bind(*args, **kwargs)
+    except TypeError:
+        return None
+    call.apply_defaults()
+    call = dict(call.arguments)
+    for key in ('verbose', 'debug'):
+        call.pop(key, None)
+    # Only cache calls with simple (i.e. not array) arguments and a given wd
+    simple_types = (str, int, float, bool, type(None), type,
+                    datetime.datetime, np.dtype)
+
+    def is_simple(value):
+        if isinstance(value, (list, tuple)):
+            return all([is_simple(i) for i in value])
+        return isinstance(value, simple_types)
+    if not all([is_simple(i) for i in call.values()]):
+        return None
+    wd = call.get('wd', None)
+    if isinstance(wd, type(None)) or not os.path.isdir(wd):
+        return None
+    # Files the arrays are extracted from
+    files = glob.glob(os.path.join(wd, '*.nc')) + \
+        glob.glob(os.path.join(wd, '*bpch*'))
+    sources = []
+    for filename in sorted(set(files)):
+        stat = os.stat(filename)
+        sources.append((os.path.abspath(filename), stat.st_size,
+                        stat.st_mtime_ns))
+    call['wd'] = os.path.abspath(wd)
+    key = repr((func.__module__, func.__name__, sources,
+                sorted(call.items())))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def cache_array_output(func):
+    """
+    Decorator to cache arrays returned by a function as .npy files on disk
+
+    Notes
+    -----
+     - Only used if a cache folder has been set (see set_array_cache)
+     - Cached arrays are returned as (copy-on-write) memory-mapped arrays, so
+     only the parts of the array used are read from disk.
+     - Only plain (or unmasked) numpy arrays are cached.
+    """
+    import functools
+    import tempfile
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if isinstance(array_cache_dir, type(None)):
+            return func(*args, **kwargs)
+        key = get_array_cache_key(func, args, kwargs)
+        if isinstance(key, type(None)):
+            return func(*args, **kwargs)
+        filename = os.path.join(array_cache_dir, key+'.npy')
+        if os.path.exists(filename):
+            logging.debug('Using cached array for {}'.format(func.__name__))
+            # Mark as recently used
+            os.utime(filename, None)
+            return np.load(filename, mmap_mode='c')
+        arr = func(*args, **kwargs)
+        if np.ma.isMaskedArray(arr):
+            if np.ma.is_masked(arr):
+                return arr
+            arr = arr.data
+        if type(arr) != np.ndarray:
+            return arr
+        # Get key again, as source files may have been made (e.g. ctm.nc)
+        key = get_array_cache_key(func, args, kwargs)
+        if not os.path.exists(array_cache_dir):
+            os.makedirs(array_cache_dir)
+        with tempfile.NamedTemporaryFile(dir=array_cache_dir, suffix='.tmp',
+                                         delete=False) as file_:
+            np.save(file_, arr)
+        os.replace(file_.name, os.path.join(array_cache_dir, key+'.npy'))
+        trim_array_cache()
+        return arr
+    return wrapper
+
+
+def trim_array_cache(folder=None, max_size=None):
+    """
+    Remove the least recently used cached arrays above max. cache size (GB)
+    """
+    import glob
+    if isinstance(folder, type(None)):
+        folder = array_cache_dir
+    if isinstance(max_size, type(None)):
+        max_size = array_cache_max_size
+    files = []
+    for filename in glob.glob(os.path.join(folder, '*.npy')):
+        stat = os.stat(filename)
+        files.append((stat.st_mtime, stat.st_size, filename))
+    total_size = sum([i[1] for i in files])
+    for NIU, size, filename in sorted(files):
+        if total_size <= max_size*1E9:
+            break
+        os.remove(filename)
+        total_size -= size
 
 
 def get_dir(input, loc='earth0'):
@@ -324,7 +666,8 @@ def get_latlonalt4res(res=None, centre=True, hPa=False, nest=None,
     if centre:
         try:
             # Extract lat and lon from model output data file
-            with Dataset(data_fname, 'r') as d:
+            with NetCDF_read_lock:
+                d = get_NetCDF_handle(data_fname)
                 lat = d[lat_var][:]
                 lon = d[lon_var][:]
         except:
@@ -335,7 +678,8 @@ def get_latlonalt4res(res=None, centre=True, hPa=False, nest=None,
                 lat_var = 'lat'
                 print(('Now using: ', lon_var, lat_var))
                 # Extract lat and lon from model output data file
-                with Dataset(data_fname, 'r') as d:
+                with NetCDF_read_lock:
+                    d = get_NetCDF_handle(data_fname)
                     lat = d[lat_var][:]
                     lon = d[lon_var][:]
             except IOError:
@@ -350,13 +694,14 @@ def get_latlonalt4res(res=None, centre=True, hPa=False, nest=None,
     if (not centre) and (res not in exception_res):
         # Extract lat and lon from model output data file
         try:
-            with Dataset(data_fname, 'r') as d:
+            with NetCDF_read_lock:
+                d = get_NetCDF_handle(data_fname)
                 lat = d[lat_bounds][:]
                 lon = d[lon_bounds][:]
-                # Select lower edge of each bound, and final upper edge
-                lat = [i[0] for i in lat]+[lat[-1][1]]
-                lon = [i[0] for i in lon]+[lon[-1][1]]
-                lat, lon = [np.array(i) for i in (lat, lon)]
+            # Select lower edge of each bound, and final upper edge
+            lat = [i[0] for i in lat]+[lat[-1][1]]
+            lon = [i[0] for i in lon]+[lon[-1][1]]
+            lat, lon = [np.array(i) for i in (lat, lon)]
         except:
             try:
                 print('WARNING: coord vars not found! -using abrvs.')
@@ -365,7 +710,8 @@ def get_latlonalt4res(res=None, centre=True, hPa=False, nest=None,
                 lat_var = 'lat'
                 print(('Now using: ', lon_var, lat_var))
                 # Extract lat and lon from model output data file
-                with Dataset(data_fname, 'r') as d:
+                with NetCDF_read_lock:
+                    d = get_NetCDF_handle(data_fname)
                     lat = d[lat_var][:]
                     lon = d[lon_var][:]
             except IOError:
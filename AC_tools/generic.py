@@ -638,9 +638,122 @@ def get_2D_solartime_array4_date(date=None, ncfile=None, res='4x5',
     return df.unstack().values
 
 
+# Named layouts (chunking/compression) for NetCDF files written by AC_tools
+NetCDF_write_profiles = {
+    # A whole (lon, lat, lev) field per chunk - for reading maps/time steps
+    'map': {'time_chunk': 1, 'tile_size': None, 'lev_chunk': None,
+            'zlib': False},
+    # Many time steps over small lon/lat tiles - for site/point time series
+    'timeseries': {'time_chunk': 720, 'tile_size': 8, 'lev_chunk': 1,
+                   'zlib': False},
+    # Map chunks, but compressed for storage
+    'archive': {'time_chunk': 1, 'tile_size': None, 'lev_chunk': None,
+                'zlib': True, 'complevel': 4, 'shuffle': True},
+}
+
+
+def get_NetCDF_write_encoding(profile=None, dims=None, shape=None, dtype=None,
+                              nsd=None, **kwargs):
+    """
+    Get the chunking/compression settings for a NetCDF variable for a profile
+
+    Parameters
+    -------
+    profile (str): name of write profile (map, timeseries, or archive)
+    dims (tuple): names of the dimensions of the variable
+    shape (tuple): length of each dimension (0 or None for unlimited)
+    dtype (np.dtype): type of the variable (bit rounding is only for floats)
+    nsd (int): number of significant digits to keep via bit rounding
+    kwargs (dict): values to use instead of those in the profile
+    (e.g. time_chunk=24, tile_size=4, complevel=9)
+
+    Returns
+    -------
+    (dict) of keyword arguments for netCDF4.Dataset.createVariable
+
+    Notes
+    -----
+     - Chunk sizes and bit rounding are only set for variables with time and
+     lon/lat dims (i.e. not for coordinates or 1D tables)
+     - See NetCDF_write_profiles for settings for each profile
+    """
+    if isinstance(profile, type(None)):
+        return {}
+    settings = NetCDF_write_profiles[profile].copy()
+    settings.update(kwargs)
+    encoding = {}
+    # Compression
+    if settings['zlib']:
+        encoding['zlib'] = True
+        encoding['complevel'] = settings.get('complevel', 4)
+        encoding['shuffle'] = settings.get('shuffle', True)
+    # Only chunk (and bit round) gridded fields, not coordinates or tables
+    time_dims = ('time', 'time_counter')
+    lon_lat_dims = ('lon', 'lat', 'longitude', 'latitude')
+    dims = tuple(dims)
+    has_time = any([i in time_dims for i in dims])
+    has_lon_lat = any([i in lon_lat_dims for i in dims])
+    if has_time and has_lon_lat:
+        # Only keep "nsd" significant digits of floats (via bit rounding)
+        is_float = isinstance(dtype, type(None)) or \
+            np.issubdtype(np.dtype(dtype), np.floating)
+        if (not isinstance(nsd, type(None))) and is_float:
+            encoding['significant_digits'] = nsd
+            encoding['quantize_mode'] = 'GranularBitRound'
+        # Chunking
+        chunksizes = []
+        for dim, size in zip(dims, shape):
+            size = size or 0
+            if dim in time_dims:
+                chunk = settings['time_chunk']
+            elif dim in lon_lat_dims:
+                chunk = settings['tile_size']
+            elif ('lev' in dim) or ('model_level_number' in dim):
+                chunk = settings['lev_chunk']
+            else:
+                chunk = None
+            # Use the full dimension if no chunk size given
+            if isinstance(chunk, type(None)):
+                chunk = size
+            if size > 0:
+                chunk = min(chunk, size)
+            chunksizes += [max(int(chunk), 1)]
+        encoding['chunksizes'] = tuple(chunksizes)
+    return encoding
+
+
+def get_xr_encoding4write_profile(ds, profile=None, nsd=None, **kwargs):
+    """
+    Get encoding for xr.Dataset.to_netcdf to write a dataset with a profile
+
+    Parameters
+    -------
+    ds (xr.Dataset): dataset to write to NetCDF
+    profile (str): name of write profile (map, timeseries, or archive)
+    nsd (int): number of significant digits to keep via bit rounding
+    kwargs (dict): values to use instead of those in the profile
+
+    Returns
+    -------
+    (dict) of encoding for each variable in dataset
+    """
+    if isinstance(profile, type(None)):
+        return None
+    encoding = {}
+    for var in ds.data_vars:
+        da = ds[var]
+        encoding[var] = get_NetCDF_write_encoding(profile=profile,
+                                                  dims=da.dims,
+                                                  shape=da.shape,
+                                                  dtype=da.dtype, nsd=nsd,
+                                                  **kwargs)
+    return encoding
+
+
 def save_2D_arrays_to_3DNetCDF(ars=None, dates=None, res='4x5', lons=None,
                                lats=None, varname='MASK', Description=None, Contact=None,
-                               filename='misc_output', var_type='f8', debug=False):
+                               filename='misc_output', var_type='f8',
+                               write_profile=None, nsd=None, debug=False):
     """
     makes a NetCDF from a list of dates and list of (lon, lat) arrays
 
@@ -654,6 +767,8 @@ def save_2D_arrays_to_3DNetCDF(ars=None, dates=None, res='4x5', lons=None,
     filename (str): name for output netCDF file
     varname (str): name for variable in NetCDF
     var_type (str): variable type (e.g. 'f8' (64-bit floating point))
+    write_profile (str): chunking/compression profile (map, timeseries, archive)
+    nsd (int): number of significant digits to keep via bit rounding
 
     Returns
     -------
@@ -737,7 +852,12 @@ def save_2D_arrays_to_3DNetCDF(ars=None, dates=None, res='4x5', lons=None,
 
     # - Create new NetCDF variable (as f8) with common dimensions
     # (e.g. 'f8' = 64-bit floating point, 'i8'=(64-bit singed integer) )
-    ncfile.createVariable(varname, var_type, ('time', 'lat', 'lon'), )
+    dims = ('time', 'lat', 'lon')
+    encoding = get_NetCDF_write_encoding(profile=write_profile, dims=dims,
+                                         shape=(len(dates), len(lats),
+                                                len(lons)),
+                                         dtype=var_type, nsd=nsd)
+    ncfile.createVariable(varname, var_type, dims, **encoding)
     # Close NetCDF
     ncfile.close()
 
@@ -859,7 +979,7 @@ def interpolate_sparse_grid2value(Y_CORDS=None, X_CORDS=None,
 
 
 def split_NetCDF_by_month(folder=None, filename=None, ext_str='',
-                          file_prefix='ts_ctm'):
+                          file_prefix='ts_ctm', write_profile=None, nsd=None):
     """
     Split a NetCDF file by month into new NetCDF files using xarray
 
@@ -869,6 +989,8 @@ def split_NetCDF_by_month(folder=None, filename=None, ext_str='',
     filename (str): the NetCDF filename (e.g. ctm.nc)
     file_prefix (str): prefix to attach to new saved file
     ext_str (str): extra string for new filenames
+    write_profile (str): chunking/compression profile (map, timeseries, archive)
+    nsd (int): number of significant digits to keep via bit rounding
     """
     import xarray as xr
     # --- Open data
@@ -893,7 +1015,9 @@ def split_NetCDF_by_month(folder=None, filename=None, ext_str='',
                                                 str(month_))
         logging.info('saving month NetCDF as: {}'.format(file2save))
         # Save the file...
-        ds_tmp.to_netcdf(folder+file2save)
+        encoding = get_xr_encoding4write_profile(ds_tmp, profile=write_profile,
+                                                 nsd=nsd)
+        ds_tmp.to_netcdf(folder+file2save, encoding=encoding)
         # Delete temporary dataset
         del ds_tmp
 
@@ -13,6 +13,8 @@ import sys
 import glob
 import os
 import netCDF4
+import numpy as np
+import pandas as pd
 if sys.version_info.major < 3:
     try:
         import iris
@@ -72,6 +74,127 @@ def convert_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
     return
 
 
+def set_process_memory_limit(max_mem=None):
+    """
+    Limit the (virtual) memory the current process can use
+
+    Parameters
+    ----------
+    max_mem (float): memory limit in GB (None for no limit)
+
+    Returns
+    -------
+    (None)
+    """
+    if isinstance(max_mem, type(None)):
+        return
+    import resource
+    max_bytes = int(max_mem * 1E9)
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+def convert_to_netCDF4pool(kwargs):
+    """
+    Call convert_to_netCDF with a dictionary of arguments (for use by pools)
+    """
+    convert_to_netCDF(**kwargs)
+    return os.path.join(kwargs['folder'], kwargs['filename'])
+
+
+def convert_to_netCDF_in_parallel(jobs=None, n_workers=None,
+                                  max_mem_per_worker=None):
+    """
+    Run convert_to_netCDF for a list of jobs over a pool of processes
+
+    Parameters
+    ----------
+    jobs (list): list of dictionaries of arguments for convert_to_netCDF
+    n_workers (int): number of processes to use (default: number of CPUs)
+    max_mem_per_worker (float): memory limit per process in GB (None=no limit)
+
+    Returns
+    -------
+    (list) of the NetCDF files made (in the same order as jobs)
+    """
+    import multiprocessing
+    logging.info('Converting {} job(s) with {} workers'.format(len(jobs),
+                                                              n_workers))
+    pool = multiprocessing.Pool(processes=n_workers,
+                                initializer=set_process_memory_limit,
+                                initargs=(max_mem_per_worker,),
+                                maxtasksperchild=1)
+    try:
+        files = pool.map(convert_to_netCDF4pool, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    return files
+
+
+def merge_NetCDF_files_along_time(files=None, output_file=None,
+                                  time_dim='time', write_profile=None,
+                                  nsd=None):
+    """
+    Merge NetCDF files with the same variables into one file along time
+
+    Parameters
+    ----------
+    files (list): NetCDF files to merge (in time order)
+    output_file (str): full path of NetCDF file to create
+    time_dim (str): name of the time dimension (made unlimited)
+    write_profile (str): chunking/compression profile (map, timeseries, archive)
+    nsd (int): number of significant digits to keep via bit rounding
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - Files are copied a variable at a time, so only a single variable from
+     a single file is held in memory at once.
+    """
+    with netCDF4.Dataset(files[0], 'r') as template, \
+            netCDF4.Dataset(output_file, 'w', format='NETCDF4') as ncfile:
+        # Copy the dimensions, variables and attributes of the first file
+        ncfile.setncatts(template.__dict__)
+        for name, dim in template.dimensions.items():
+            if name == time_dim:
+                ncfile.createDimension(name, None)
+            else:
+                ncfile.createDimension(name, len(dim))
+        if not isinstance(write_profile, type(None)):
+            from .generic import get_NetCDF_write_encoding
+        for name, var in template.variables.items():
+            encoding = {}
+            if not isinstance(write_profile, type(None)):
+                encoding = get_NetCDF_write_encoding(profile=write_profile,
+                                                     dims=var.dimensions,
+                                                     shape=var.shape,
+                                                     dtype=var.dtype, nsd=nsd)
+            ncvar = ncfile.createVariable(name, var.datatype, var.dimensions,
+                                          **encoding)
+            ncvar.setncatts(var.__dict__)
+            if time_dim not in var.dimensions:
+                ncvar[:] = var[:]
+        # Append the time varying variables from each file in turn
+        n_time = 0
+        for file_ in files:
+            logging.debug('Merging {} into {}'.format(file_, output_file))
+            with netCDF4.Dataset(file_, 'r') as rootgrp:
+                n_file = len(rootgrp.dimensions[time_dim])
+                for name, var in rootgrp.variables.items():
+                    if (time_dim not in var.dimensions) or \
+                            (name not in ncfile.variables):
+                        continue
+                    ind = var.dimensions.index(time_dim)
+                    slices = [slice(None)] * len(var.dimensions)
+                    slices[ind] = slice(n_time, n_time+n_file)
+                    ncfile.variables[name][tuple(slices)] = var[:]
+            n_time += n_file
+    logging.info('Merged {} files into {}'.format(len(files), output_file))
+
+
 def hemco_to_netCDF(folder, hemco_file_list=None, remake=False):
     """
     Conbine HEMCO diagnostic output files to a single NetCDF file.
@@ -136,8 +259,9 @@ def hemco_to_netCDF(folder, hemco_file_list=None, remake=False):
 
 def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
                    remake=False, filetype="*ctm.bpch*",
-                   check4_trac_avg_if_no_ctm_bpch=True, backend='PyGChem',
-                   verbose=False, **kwargs):
+                   check4_trac_avg_if_no_ctm_bpch=True, backend='numpy',
+                   append=False, write_profile=None, nsd=None, verbose=False,
+                   **kwargs):
     """
     Converts GEOS-Chem ctm.bpch output file(s) to NetCDF
 
@@ -149,11 +273,22 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
     remake (bool): overwrite existing NetCDF file
     filetype (str): string with wildcards to match filenames
     ( e.g. *ctm.bpch*, trac_avg.*, or *ts*bpch* )
+    backend (str): reader to use (numpy, PyGChem, xbpch, iris or PNC)
+    append (bool): add new bpch files/times to an existing NetCDF file
+    write_profile (str): chunking/compression profile (map, timeseries, archive)
+    nsd (int): number of significant digits to keep via bit rounding
     verbose (bool): print (minor) logging to screen
 
     Returns
     -------
     (None) saves a NetCDF file to disk
+
+    Notes
+    -----
+     - The default "numpy" backend reads the bpch files directly and writes
+     the NetCDF one datablock at a time (see bpch_to_netCDF_via_numpy)
+     - append=True (numpy backend only) adds the datablocks from bpch files
+     and times not already in the NetCDF (see append_bpch_to_netCDF_via_numpy)
     """
     import os
     # Check if file already exists and warn about remaking
@@ -165,26 +300,24 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
     output_file = os.path.join(folder, filename)
 
     # If the netCDf file already exists dont overwrite it without remake=True.
-    if not remake:
+    append = append and os.path.exists(output_file) and not remake
+    if not remake and not append:
         if os.path.exists(output_file):
             logging.warning(output_file + ' already exists. Not recreating.')
             return
+    if append and (backend != 'numpy'):
+        logging.error("append=True is only setup for backend='numpy'")
+        raise ValueError("append=True is only setup for backend='numpy'")
+    # Close any pooled (read) handles for the file before it is changed
+    if os.path.exists(output_file):
+        from .core import close_NetCDF_handles
+        close_NetCDF_handles(output_file)
 
     # Look for files if file list is not provided.
     if isinstance(bpch_file_list, type(None)):
-        logging.debug("Searching for the following bpch filetype: {filetype}"
-                      .format(filetype=filetype))
-        bpch_files = glob.glob(folder + '/' + filetype)
-        # Also check if directory contains *trac_avg* files, if no ctm.bpch
-        if (len(bpch_files) == 0) and check4_trac_avg_if_no_ctm_bpch:
-            filetype = '*trac_avg*'
-            logging.info('WARNING! - now trying filetype={}'.format(filetype))
-            bpch_files = glob.glob(folder + '/' + filetype)
-        # Raise error if no files matching filetype
-        if len(bpch_files) == 0:
-            logging.error("No bpch files ({}) found in {}".format(filetype,
-                                                                  folder))
-            raise IOError("{} contains no bpch files.".format(folder))
+        bpch_files = get_bpch_files_in_folder(
+            folder=folder, filetype=filetype,
+            check4_trac_avg_if_no_ctm_bpch=check4_trac_avg_if_no_ctm_bpch)
 
     # Use the specified files.
     else:
@@ -204,7 +337,17 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
     if verbose:
         print(("Creating a netCDF from {} file(s).".format(len(bpch_files)) +
                " This can take some time..."))
-    if backend == 'PyGChem':
+    if append:
+        # Just add datablocks not already in the NetCDF
+        append_bpch_to_netCDF_via_numpy(bpch_files=bpch_files,
+                                        output_file=output_file, folder=folder,
+                                        write_profile=write_profile, nsd=nsd)
+    elif backend == 'numpy':
+        # Read the bpch datablocks directly and write them one at a time
+        bpch_to_netCDF_via_numpy(bpch_files=bpch_files,
+                                 output_file=output_file, folder=folder,
+                                 write_profile=write_profile, nsd=nsd)
+    elif backend == 'PyGChem':
         # Load all the files into memory
         bpch_data = datasets.load(bpch_files)
         # Save the netCDF file
@@ -214,7 +357,11 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
         # Load all the files into memory (as xarray dataset object)
         ds = xbpch.open_mfbpchdataset(bpch_files)
         # save through xarray dataset object
-        ds.to_netcdf(output_file, unlimited_dims={'time_counter': True})
+        from .generic import get_xr_encoding4write_profile
+        encoding = get_xr_encoding4write_profile(ds, profile=write_profile,
+                                                 nsd=nsd)
+        ds.to_netcdf(output_file, unlimited_dims={'time_counter': True},
+                     encoding=encoding)
     elif backend == 'iris':
         #    iris.fileformats.netcdf.save(data, output_file)
         print('WARNING NetCDF made by iris is non CF-compliant')
@@ -249,6 +396,37 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
     return
 
 
+def get_bpch_files_in_folder(folder=None, filetype="*ctm.bpch*",
+                             check4_trac_avg_if_no_ctm_bpch=True):
+    """
+    Get a list of the bpch files in a folder that match a given filetype
+
+    Parameters
+    ----------
+    folder (str): working directory for data files
+    filetype (str): string with wildcards to match filenames
+    check4_trac_avg_if_no_ctm_bpch (bool): look for *trac_avg* files if none
+
+    Returns
+    -------
+    (list)
+    """
+    logging.debug("Searching for the following bpch filetype: {filetype}"
+                  .format(filetype=filetype))
+    bpch_files = glob.glob(folder + '/' + filetype)
+    # Also check if directory contains *trac_avg* files, if no ctm.bpch
+    if (len(bpch_files) == 0) and check4_trac_avg_if_no_ctm_bpch:
+        filetype = '*trac_avg*'
+        logging.info('WARNING! - now trying filetype={}'.format(filetype))
+        bpch_files = glob.glob(folder + '/' + filetype)
+    # Raise error if no files matching filetype
+    if len(bpch_files) == 0:
+        logging.error("No bpch files ({}) found in {}".format(filetype,
+                                                              folder))
+        raise IOError("{} contains no bpch files.".format(folder))
+    return bpch_files
+
+
 def bpch_to_netCDF_via_PNC(format='bpch2', filename='ctm.nc',
                            output_file=None, bpch_file=None, folder=None):
     """ Convert bpch to NetCDF using PNC as backend """
@@ -266,6 +444,766 @@ def bpch_to_netCDF_via_PNC(format='bpch2', filename='ctm.nc',
     pnc.pncwrite(infile, output_file)
 
 
+# Record layouts of GEOS-Chem binary punch (bpch) files.
+# These are big-endian Fortran unformatted sequential files, so each record is
+# wrapped by 4 byte (big-endian int) markers giving the length of the record.
+bpch_file_header_dtype = np.dtype([('ftype', 'S40')])
+bpch_title_dtype = np.dtype([('title', 'S80')])
+bpch_datablock_header1_dtype = np.dtype([
+    ('modelname', 'S20'), ('lonres', '>f4'), ('latres', '>f4'),
+    ('halfpolar', '>i4'), ('center180', '>i4'),
+])
+bpch_datablock_header2_dtype = np.dtype([
+    ('category', 'S40'), ('tracer', '>i4'), ('unit', 'S40'), ('tau0', '>f8'),
+    ('tau1', '>f8'), ('reserved', 'S40'), ('dim', '>i4', (6,)), ('skip', '>i4'),
+])
+bpch_data_dtype = np.dtype('>f4')
+# Time in bpch files is given as "tau" (hours since 1985-01-01 00:00:00)
+bpch_time_units = 'hours since 1985-01-01 00:00:00'
+
+
+def read_fortran_record(file_, dtype=None):
+    """
+    Read a single (big-endian) Fortran unformatted record from an open file
+
+    Parameters
+    ----------
+    file_ (file object): bpch file opened in binary mode
+    dtype (np.dtype): numpy dtype to use to interpret the record
+
+    Returns
+    -------
+    (np.array) or (None) if the end of the file has been reached
+
+    Notes
+    -----
+     - A record cut short by the end of the file (e.g. in a file that is
+     still being written) is treated as the end of the file
+    """
+    marker = file_.read(4)
+    if len(marker) == 0:
+        return None
+    if len(marker) == 4:
+        nbytes = int(np.frombuffer(marker, dtype='>i4')[0])
+        record = file_.read(nbytes)
+        end_marker = file_.read(4)
+    if (len(marker) < 4) or (len(record) < nbytes) or (len(end_marker) < 4):
+        logging.warning('Incomplete record at the end of {}'.format(
+            file_.name))
+        return None
+    # Check the closing record marker
+    end_marker = np.frombuffer(end_marker, dtype='>i4')
+    if int(end_marker[0]) != nbytes:
+        err_msg = 'Corrupt Fortran record in {}'.format(file_.name)
+        logging.error(err_msg)
+        raise IOError(err_msg)
+    if isinstance(dtype, type(None)):
+        return record
+    return np.frombuffer(record, dtype=dtype)
+
+
+def read_bpch_diaginfo(filename):
+    """
+    Read the diagnostic categories from a GEOS-Chem diaginfo.dat file
+
+    Parameters
+    ----------
+    filename (str): full path to diaginfo.dat file
+
+    Returns
+    -------
+    (dict) of tracer number offset for each category (e.g. 'IJ-AVG-$')
+    """
+    diaginfo = {}
+    with open(filename, 'r') as file_:
+        for line in file_:
+            # Skip comments and blank lines
+            if line.startswith('#') or (len(line.strip()) == 0):
+                continue
+            items = line.split()
+            diaginfo[items[1]] = int(items[0])
+    return diaginfo
+
+
+def read_bpch_tracerinfo(filename):
+    """
+    Read the tracer details from a GEOS-Chem tracerinfo.dat file
+
+    Parameters
+    ----------
+    filename (str): full path to tracerinfo.dat file
+
+    Returns
+    -------
+    (dict) of tracer details (name, full_name, molwt, C, scale, unit)
+    keyed by tracer number (inc. category offset)
+    """
+    tracerinfo = {}
+    with open(filename, 'r') as file_:
+        for line in file_:
+            # Skip comments and blank lines
+            if line.startswith('#') or (len(line.strip()) == 0):
+                continue
+            items = line.split()
+            # Name is the first item and the numbers are the last ones.
+            # (the full name in between can contain spaces)
+            try:
+                tracerinfo[int(items[-3])] = {
+                    'name': items[0],
+                    'full_name': ' '.join(items[1:-5]),
+                    'molwt': float(items[-5]),
+                    'C': int(items[-4]),
+                    'scale': float(items[-2]),
+                    'unit': items[-1],
+                }
+            except (ValueError, IndexError):
+                logging.debug('Skipped tracerinfo line: {}'.format(line))
+    return tracerinfo
+
+
+def get_bpch_datablock_headers(bpch_file):
+    """
+    Get the headers of all the datablocks in a bpch file (the data is skipped)
+
+    Parameters
+    ----------
+    bpch_file (str): full path to the bpch file
+
+    Returns
+    -------
+    (list) of dictionaries with datablock details, inc. the byte offset of the
+    data ('offset') and its shape as (lon, lat, lev) ('shape')
+
+    Notes
+    -----
+     - Only complete datablocks are returned, so a file that is still being
+     written to is read up to its last complete datablock
+    """
+    headers = []
+    with open(bpch_file, 'rb') as file_:
+        file_size = os.fstat(file_.fileno()).st_size
+        ftype = read_fortran_record(file_, dtype=bpch_file_header_dtype)
+        if (ftype is None) or (b'CTM bin' not in ftype['ftype'][0]):
+            err_msg = '{} is not a bpch file'.format(bpch_file)
+            logging.error(err_msg)
+            raise IOError(err_msg)
+        # Skip the title record
+        read_fortran_record(file_, dtype=bpch_title_dtype)
+        while True:
+            header1 = read_fortran_record(file_,
+                                          dtype=bpch_datablock_header1_dtype)
+            if header1 is None:
+                break
+            header2 = read_fortran_record(file_,
+                                          dtype=bpch_datablock_header2_dtype)
+            if header2 is None:
+                break
+            # Skip over the data record, but save where it is.
+            marker = file_.read(4)
+            offset = file_.tell()
+            nbytes = -1
+            if len(marker) == 4:
+                nbytes = int(np.frombuffer(marker, dtype='>i4')[0])
+            if (nbytes < 0) or (offset + nbytes + 4 > file_size):
+                logging.warning('Incomplete datablock at the end of {}'.format(
+                    bpch_file))
+                break
+            file_.seek(nbytes, os.SEEK_CUR)
+            end_marker = np.frombuffer(file_.read(4), dtype='>i4')
+            if int(end_marker[0]) != nbytes:
+                err_msg = 'Corrupt Fortran record in {}'.format(bpch_file)
+                logging.error(err_msg)
+                raise IOError(err_msg)
+            dim = [int(i) for i in header2['dim'][0]]
+            headers.append({
+                'modelname': header1['modelname'][0].decode().strip(),
+                'lonres': float(header1['lonres'][0]),
+                'latres': float(header1['latres'][0]),
+                'halfpolar': int(header1['halfpolar'][0]),
+                'center180': int(header1['center180'][0]),
+                'category': header2['category'][0].decode().strip(),
+                'tracer': int(header2['tracer'][0]),
+                'unit': header2['unit'][0].decode().strip(),
+                'tau0': float(header2['tau0'][0]),
+                'tau1': float(header2['tau1'][0]),
+                'shape': tuple(dim[:3]),
+                'origin': tuple(dim[3:]),
+                'offset': offset,
+                'nbytes': nbytes,
+            })
+    return headers
+
+
+def read_bpch_datablock(bpch_file, header, file_=None):
+    """
+    Read a single datablock from a bpch file using its header
+
+    Parameters
+    ----------
+    bpch_file (str): full path to the bpch file
+    header (dict): datablock header (from get_bpch_datablock_headers)
+    file_ (file object): (optional) already opened bpch file to read from
+
+    Returns
+    -------
+    (np.array) of the datablock in (lon, lat, lev) order
+    """
+    count = int(np.prod(header['shape']))
+    if isinstance(file_, type(None)):
+        with open(bpch_file, 'rb') as file_:
+            file_.seek(header['offset'])
+            data = np.fromfile(file_, dtype=bpch_data_dtype, count=count)
+    else:
+        file_.seek(header['offset'])
+        data = np.fromfile(file_, dtype=bpch_data_dtype, count=count)
+    # Data is stored in Fortran ordering
+    return data.reshape(header['shape'], order='F').astype(np.float32)
+
+
+def get_bpch_metadata(folder=None, diaginfo_file='diaginfo.dat',
+                      tracerinfo_file='tracerinfo.dat'):
+    """
+    Get the diaginfo and tracerinfo (GAMAP) metadata for bpch files in a folder
+
+    Parameters
+    ----------
+    folder (str): directory to look for diaginfo.dat and tracerinfo.dat in
+    diaginfo_file, tracerinfo_file (str): filenames of GAMAP metadata files
+
+    Returns
+    -------
+    (tuple) of dictionaries (diaginfo, tracerinfo), empty if files not found
+    """
+    diaginfo, tracerinfo = {}, {}
+    diaginfo_file = os.path.join(folder, diaginfo_file)
+    tracerinfo_file = os.path.join(folder, tracerinfo_file)
+    if os.path.exists(diaginfo_file) and os.path.exists(tracerinfo_file):
+        diaginfo = read_bpch_diaginfo(diaginfo_file)
+        tracerinfo = read_bpch_tracerinfo(tracerinfo_file)
+    else:
+        logging.warning('diaginfo.dat/tracerinfo.dat not in {}'.format(folder) +
+                        ', using tracer numbers for names')
+    return diaginfo, tracerinfo
+
+
+def get_bpch_var_name(header, diaginfo={}, tracerinfo={}):
+    """
+    Get the NetCDF (PyGChem/iris style) name for a bpch datablock
+
+    Parameters
+    ----------
+    header (dict): datablock header (from get_bpch_datablock_headers)
+    diaginfo (dict): category offsets (from read_bpch_diaginfo)
+    tracerinfo (dict): tracer details (from read_bpch_tracerinfo)
+
+    Returns
+    -------
+    (str) e.g. IJ_AVG_S__O3
+    """
+    category = header['category']
+    tracer_num = header['tracer'] + diaginfo.get(category, 0)
+    try:
+        tracer = tracerinfo[tracer_num]['name']
+    except KeyError:
+        tracer = 'TRACER_{}'.format(tracer_num)
+    var = category.replace('-', '_').replace('$', 'S')
+    return '{}__{}'.format(var, tracer)
+
+
+def get_bpch_lon_lat(header):
+    """
+    Get lon/lat centres and edges for a bpch datablock's grid
+
+    Parameters
+    ----------
+    header (dict): datablock header (from get_bpch_datablock_headers)
+
+    Returns
+    -------
+    (tuple) of np.arrays - lon centres, lat centres, lon edges, lat edges
+    """
+    lonres, latres = header['lonres'], header['latres']
+    # Global grid (centred on the date line and with half-sized polar boxes)
+    nlon = int(round(360. / lonres))
+    lon_e = -180. - (lonres / 2.) + (np.arange(nlon+1) * lonres)
+    if header['halfpolar']:
+        nlat = int(round(180. / latres)) + 1
+        lat_e = np.arange(nlat+1) * latres - 90. - (latres / 2.)
+        lat_e[0], lat_e[-1] = -90., 90.
+    else:
+        nlat = int(round(180. / latres))
+        lat_e = np.arange(nlat+1) * latres - 90.
+    # Select the (potentially nested) region the datablock covers
+    ni, nj = header['shape'][:2]
+    i0, j0 = header['origin'][0]-1, header['origin'][1]-1
+    lon_e = lon_e[i0:i0+ni+1]
+    lat_e = lat_e[j0:j0+nj+1]
+    lon_c = (lon_e[:-1] + lon_e[1:]) / 2.
+    lat_c = (lat_e[:-1] + lat_e[1:]) / 2.
+    return lon_c, lat_c, lon_e, lat_e
+
+
+def bpch_to_netCDF_via_numpy(bpch_files=None, output_file=None, folder=None,
+                             diaginfo_file='diaginfo.dat',
+                             tracerinfo_file='tracerinfo.dat',
+                             write_profile=None, nsd=None):
+    """
+    Convert bpch files to a single NetCDF, reading datablocks directly via numpy
+
+    Parameters
+    ----------
+    bpch_files (list): list of bpch files (full paths) to convert
+    output_file (str): full path for the NetCDF file to create
+    folder (str): directory to look for diaginfo.dat and tracerinfo.dat in
+    diaginfo_file, tracerinfo_file (str): filenames of GAMAP metadata files
+    write_profile (str): chunking/compression profile (map, timeseries, archive)
+    nsd (int): number of significant digits to keep via bit rounding
+
+    Returns
+    -------
+    (None) saves a NetCDF file to disk
+
+    Notes
+    -----
+     - Only the datablock headers are held in memory, each datablock is then
+     read and written to the NetCDF file in turn.
+     - Variables are saved in PyGChem/iris form (time, lon, lat, lev) with
+     "ctm_units" attributes, as expected by get_GC_output.
+    """
+    if isinstance(folder, type(None)):
+        folder = os.path.dirname(bpch_files[0])
+    # Get the tracer names from GAMAP files in folder (if present)
+    diaginfo, tracerinfo = get_bpch_metadata(folder=folder,
+                                             diaginfo_file=diaginfo_file,
+                                             tracerinfo_file=tracerinfo_file)
+    # Scan the headers of all the files
+    headers = []
+    for bpch_file in sorted(bpch_files):
+        for header in get_bpch_datablock_headers(bpch_file):
+            header['file'] = bpch_file
+            header['var'] = get_bpch_var_name(header, diaginfo=diaginfo,
+                                              tracerinfo=tracerinfo)
+            headers.append(header)
+    if len(headers) == 0:
+        raise IOError('No datablocks found in bpch files')
+    times = np.array(sorted(set([i['tau0'] for i in headers])))
+    # Use the grid of the largest (horizontal) datablock for coordinates
+    ref = max(headers, key=lambda x: x['shape'][0]*x['shape'][1])
+    lon_c, lat_c, lon_e, lat_e = get_bpch_lon_lat(ref)
+    # Name vertical dimensions by number of levels
+    nlevs = sorted(set([i['shape'][2] for i in headers if i['shape'][2] > 1]))
+    lev_dims = {}
+    for nlev in nlevs:
+        lev_dims[nlev] = 'model_level_number_{}'.format(nlev)
+    if len(nlevs) > 0:
+        lev_dims[nlevs[-1]] = 'model_level_number'
+    with netCDF4.Dataset(output_file, 'w', format='NETCDF4') as ncfile:
+        # Setup the coordinates
+        ncfile.createDimension('time', None)
+        ncfile.createDimension('longitude', len(lon_c))
+        ncfile.createDimension('latitude', len(lat_c))
+        ncfile.createDimension('bnds', 2)
+        for nlev, dim in lev_dims.items():
+            ncfile.createDimension(dim, nlev)
+            lev = ncfile.createVariable(dim, 'i4', (dim,))
+            lev[:] = np.arange(1, nlev+1)
+        time = ncfile.createVariable('time', 'f8', ('time',))
+        time.units = bpch_time_units
+        time.calendar = 'standard'
+        time[:] = times
+        lon = ncfile.createVariable('longitude', 'f4', ('longitude',))
+        lon.units = 'degrees_east'
+        lon.bounds = 'longitude_bnds'
+        lon[:] = lon_c
+        lat = ncfile.createVariable('latitude', 'f4', ('latitude',))
+        lat.units = 'degrees_north'
+        lat.bounds = 'latitude_bnds'
+        lat[:] = lat_c
+        lon_bnds = ncfile.createVariable('longitude_bnds', 'f4',
+                                         ('longitude', 'bnds'))
+        lon_bnds[:] = np.stack([lon_e[:-1], lon_e[1:]], axis=-1)
+        lat_bnds = ncfile.createVariable('latitude_bnds', 'f4',
+                                         ('latitude', 'bnds'))
+        lat_bnds[:] = np.stack([lat_e[:-1], lat_e[1:]], axis=-1)
+        ncfile.modelname = ref['modelname']
+        # Record the files converted (used to append new files later)
+        ncfile.bpch_files = ';'.join(sorted(set([os.path.basename(i['file'])
+                                                 for i in headers])))
+        ncfile.bpch_files_stat = get_bpch_files_stat_str(
+            set([i['file'] for i in headers]))
+        # Now write each datablock in turn (opening each bpch file once)
+        for bpch_file in sorted(set([i['file'] for i in headers])):
+            with open(bpch_file, 'rb') as file_:
+                for header in [i for i in headers if i['file'] == bpch_file]:
+                    write_bpch_datablock2netCDF(ncfile, header, file_=file_,
+                                                ref=ref, times=times,
+                                                lev_dims=lev_dims,
+                                                diaginfo=diaginfo,
+                                                tracerinfo=tracerinfo,
+                                                write_profile=write_profile,
+                                                nsd=nsd)
+        set_bpch_last_tau0(ncfile, headers)
+    logging.info('Converted {} datablocks to {}'.format(len(headers),
+                                                       output_file))
+
+
+def set_bpch_last_tau0(ncfile, headers):
+    """
+    Record the last time (tau0) written for each variable in a NetCDF file
+
+    Parameters
+    ----------
+    ncfile (netCDF4.Dataset): NetCDF file opened in write/append mode
+    headers (list): datablock headers written (inc. the variable name, 'var')
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - Saved as the "bpch_last_tau0" attribute of each variable, so that
+     datablocks are appended by variable and time (GEOS-Chem writes a time
+     step one datablock at a time, so a time step can be partly written)
+    """
+    last_taus = {}
+    for header in headers:
+        var = header['var']
+        last_taus[var] = max(header['tau0'], last_taus.get(var, -np.inf))
+    for var, tau0 in last_taus.items():
+        ncvar = ncfile.variables[var]
+        ncvar.bpch_last_tau0 = max(tau0, getattr(ncvar, 'bpch_last_tau0',
+                                                 -np.inf))
+
+
+def get_bpch_files_stat_str(bpch_files, stat_str=''):
+    """
+    Get a string of the name, size and modification time of bpch files
+
+    Parameters
+    ----------
+    bpch_files (list): list of bpch files (full paths)
+    stat_str (str): existing string to update (e.g. from a NetCDF attribute)
+
+    Returns
+    -------
+    (str) of "name:size:mtime_ns" for each file, separated by ";"
+
+    Notes
+    -----
+     - Saved as the "bpch_files_stat" attribute of NetCDF files, so files that
+     are still being written to (e.g. ctm.bpch) are scanned again if changed
+    """
+    stats = read_bpch_files_stat_str(stat_str)
+    for bpch_file in bpch_files:
+        stat = os.stat(bpch_file)
+        stats[os.path.basename(bpch_file)] = (stat.st_size, stat.st_mtime_ns)
+    return ';'.join(['{}:{}:{}'.format(k, v[0], v[1])
+                     for k, v in sorted(stats.items())])
+
+
+def read_bpch_files_stat_str(stat_str=''):
+    """
+    Read a string of bpch file sizes and modification times into a dictionary
+
+    Parameters
+    ----------
+    stat_str (str): string from get_bpch_files_stat_str
+
+    Returns
+    -------
+    (dict) of (size, mtime_ns) by file name
+    """
+    stats = {}
+    for item in stat_str.split(';'):
+        if item.count(':') < 2:
+            continue
+        name, size, mtime_ns = item.rsplit(':', 2)
+        stats[name] = (int(size), int(mtime_ns))
+    return stats
+
+
+def append_bpch_to_netCDF_via_numpy(bpch_files=None, output_file=None,
+                                    folder=None, time_dim='time',
+                                    write_profile=None, nsd=None):
+    """
+    Append datablocks from bpch files that are not in a NetCDF file already
+
+    Parameters
+    ----------
+    bpch_files (list): list of bpch files (full paths) to add if new
+    output_file (str): full path of the NetCDF file (from bpch_to_netCDF)
+    folder (str): directory to look for diaginfo.dat and tracerinfo.dat in
+    time_dim (str): name of the (unlimited) time dimension
+    write_profile (str): chunking/compression profile for any new variables
+    nsd (int): number of significant digits to keep via bit rounding
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - Files are skipped if their name, size and modification time are
+     recorded in the NetCDF's "bpch_files_stat" attribute (i.e. unchanged
+     since they were added), and datablocks are skipped if their variable has
+     already been written for their time (tau0). New times are added to the
+     end of the time dimension.
+     - Variables without a "bpch_last_tau0" attribute are taken to be
+     written up to the last time in the NetCDF.
+    """
+    if isinstance(folder, type(None)):
+        folder = os.path.dirname(bpch_files[0])
+    diaginfo, tracerinfo = get_bpch_metadata(folder=folder)
+    with netCDF4.Dataset(output_file, 'a') as ncfile:
+        try:
+            done_files = ncfile.bpch_files.split(';')
+        except AttributeError:
+            done_files = []
+        stat_str = getattr(ncfile, 'bpch_files_stat', '')
+        done_stats = read_bpch_files_stat_str(stat_str)
+        existing_times = ncfile.variables[time_dim][:]
+        # Get the last time written for each variable
+        last_tau0 = -np.inf
+        if len(existing_times) > 0:
+            last_tau0 = float(existing_times.max())
+        last_taus = dict([(k, getattr(v, 'bpch_last_tau0', last_tau0))
+                          for k, v in ncfile.variables.items()])
+        # Scan the headers of new (or changed) files for new times
+        headers = []
+        for bpch_file in sorted(bpch_files):
+            stat = os.stat(bpch_file)
+            done_stat = done_stats.get(os.path.basename(bpch_file))
+            if done_stat == (stat.st_size, stat.st_mtime_ns):
+                continue
+            for header in get_bpch_datablock_headers(bpch_file):
+                header['file'] = bpch_file
+                header['var'] = get_bpch_var_name(header, diaginfo=diaginfo,
+                                                  tracerinfo=tracerinfo)
+                if header['tau0'] <= last_taus.get(header['var'], -np.inf):
+                    continue
+                headers.append(header)
+        # Record the files scanned (so unchanged files are not scanned again)
+        stat_str = get_bpch_files_stat_str(bpch_files, stat_str=stat_str)
+        if len(headers) == 0:
+            ncfile.bpch_files_stat = stat_str
+            logging.info('No new datablocks to add to {}'.format(output_file))
+            return
+        new_times = np.setdiff1d([i['tau0'] for i in headers], existing_times)
+        if (len(new_times) > 0) and (new_times[0] < last_tau0):
+            err_msg = 'New times must be after those in {}'.format(output_file)
+            logging.error(err_msg)
+            raise ValueError(err_msg)
+        times = np.concatenate([np.array(existing_times), new_times])
+        ncfile.variables[time_dim][len(existing_times):] = new_times
+        # Get (or add) the vertical dimensions
+        lev_dims = {}
+        for name, dim in ncfile.dimensions.items():
+            if name.startswith('model_level_number'):
+                lev_dims[len(dim)] = name
+        for nlev in set([i['shape'][2] for i in headers]):
+            if (nlev > 1) and (nlev not in lev_dims):
+                lev_dims[nlev] = 'model_level_number_{}'.format(nlev)
+                ncfile.createDimension(lev_dims[nlev], nlev)
+        # Use the grid origin of the coordinates already in the file
+        lon = ncfile.variables['longitude'][:]
+        lat = ncfile.variables['latitude'][:]
+        lon_c, lat_c, lon_e, lat_e = get_bpch_lon_lat(headers[0])
+        origin = headers[0]['origin']
+        ref = {'origin': (origin[0] - np.argmin(np.abs(lon-lon_c[0])),
+                          origin[1] - np.argmin(np.abs(lat-lat_c[0])))}
+        for bpch_file in sorted(set([i['file'] for i in headers])):
+            with open(bpch_file, 'rb') as file_:
+                for header in [i for i in headers if i['file'] == bpch_file]:
+                    write_bpch_datablock2netCDF(ncfile, header, file_=file_,
+                                                ref=ref, times=times,
+                                                lev_dims=lev_dims,
+                                                diaginfo=diaginfo,
+                                                tracerinfo=tracerinfo,
+                                                write_profile=write_profile,
+                                                nsd=nsd)
+        set_bpch_last_tau0(ncfile, headers)
+        done_files += [os.path.basename(i['file']) for i in headers]
+        ncfile.bpch_files = ';'.join(sorted(set(done_files)))
+        ncfile.bpch_files_stat = stat_str
+    logging.info('Appended {} datablocks to {}'.format(len(headers),
+                                                      output_file))
+
+
+def write_bpch_datablock2netCDF(ncfile, header, file_=None, ref=None,
+                                times=None, lev_dims={}, diaginfo={},
+                                tracerinfo={}, write_profile=None, nsd=None):
+    """
+    Write a single bpch datablock to an open NetCDF file
+
+    Parameters
+    ----------
+    ncfile (netCDF4.Dataset): NetCDF file opened in write/append mode
+    header (dict): datablock header (from get_bpch_datablock_headers)
+    file_ (file object): (optional) already opened bpch file to read from
+    ref (dict): datablock header whose grid the NetCDF coordinates use
+    times (np.array): tau values of the NetCDF time dimension
+    lev_dims (dict): name of the vertical dimension for each number of levels
+    diaginfo (dict): category offsets (from read_bpch_diaginfo)
+    tracerinfo (dict): tracer details (from read_bpch_tracerinfo)
+    write_profile (str): chunking/compression profile (map, timeseries, archive)
+    nsd (int): number of significant digits to keep via bit rounding
+
+    Returns
+    -------
+    (None)
+    """
+    var = header['var']
+    nlev = header['shape'][2]
+    if var not in ncfile.variables:
+        dims = ('time', 'longitude', 'latitude')
+        if nlev > 1:
+            dims += (lev_dims[nlev],)
+        encoding = {}
+        if not isinstance(write_profile, type(None)):
+            from .generic import get_NetCDF_write_encoding
+            shape = [len(ncfile.dimensions[i]) for i in dims]
+            encoding = get_NetCDF_write_encoding(profile=write_profile,
+                                                 dims=dims, shape=shape,
+                                                 dtype='f4', nsd=nsd)
+        ncvar = ncfile.createVariable(var, 'f4', dims, **encoding)
+        ncvar.ctm_units = header['unit']
+        ncvar.category = header['category']
+        ncvar.tracer = header['tracer']
+        tracer_num = header['tracer'] + diaginfo.get(header['category'], 0)
+        if tracer_num in tracerinfo:
+            ncvar.long_name = tracerinfo[tracer_num]['full_name']
+            ncvar.molwt = tracerinfo[tracer_num]['molwt']
+    data = read_bpch_datablock(header['file'], header, file_=file_)
+    if nlev == 1:
+        data = data[..., 0]
+    # Place (nested) datablocks within the file's grid
+    i0 = header['origin'][0] - ref['origin'][0]
+    j0 = header['origin'][1] - ref['origin'][1]
+    ni, nj = header['shape'][:2]
+    t_ind = int(np.searchsorted(times, header['tau0']))
+    ncfile.variables[var][t_ind, i0:i0+ni, j0:j0+nj, ...] = data
+
+
+def get_bpch_index(folder=None, bpch_files=None, filetype="*ctm.bpch*",
+                   index_filename='bpch_index.csv', remake=False,
+                   save_index=True):
+    """
+    Get a catalog of the datablocks in bpch files (headers only, no data)
+
+    Parameters
+    ----------
+    folder (str): working directory for data files
+    bpch_files (list): list of bpch files to index (default: all in folder)
+    filetype (str): string with wildcards to match filenames
+    index_filename (str): name of the sidecar index file saved in folder
+    remake (bool): rescan all the files, even if an index exists
+    save_index (bool): save the (updated) index to disk
+
+    Returns
+    -------
+    (pd.DataFrame) with a row per datablock (inc. 'file', 'var', 'tau0' and
+    the byte 'offset' of the data)
+
+    Notes
+    -----
+     - The saved index is reused for files whose modification time has not
+     changed, so only new or updated bpch files are rescanned.
+    """
+    folder = get_folder(folder)
+    index_file = os.path.join(folder, index_filename)
+    if isinstance(bpch_files, type(None)):
+        bpch_files = get_bpch_files_in_folder(folder=folder, filetype=filetype)
+    bpch_files = [os.path.basename(i) for i in bpch_files]
+    mtimes = dict([(i, os.path.getmtime(os.path.join(folder, i)))
+                   for i in bpch_files])
+    # Reuse the existing index for files that are unchanged
+    df = pd.DataFrame()
+    if os.path.exists(index_file) and not remake:
+        df = pd.read_csv(index_file)
+        current = df['file'].map(mtimes) == df['mtime']
+        df = df.loc[current, :]
+    files2scan = [i for i in bpch_files if i not in set(df.get('file', []))]
+    if len(files2scan) > 0:
+        logging.info('Indexing {} bpch file(s) in {}'.format(len(files2scan),
+                                                             folder))
+        diaginfo, tracerinfo = get_bpch_metadata(folder=folder)
+        rows = []
+        for bpch_file in sorted(files2scan):
+            headers = get_bpch_datablock_headers(os.path.join(folder,
+                                                              bpch_file))
+            for header in headers:
+                ni, nj, nl = header.pop('shape')
+                i0, j0, l0 = header.pop('origin')
+                header.update({
+                    'file': bpch_file, 'mtime': mtimes[bpch_file],
+                    'var': get_bpch_var_name(header, diaginfo=diaginfo,
+                                             tracerinfo=tracerinfo),
+                    'ni': ni, 'nj': nj, 'nl': nl, 'i0': i0, 'j0': j0, 'l0': l0,
+                })
+                rows.append(header)
+        df = pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
+        if save_index:
+            df.to_csv(index_file, index=False)
+    # Only return the requested files
+    df = df.loc[df['file'].isin(bpch_files), :]
+    return df.sort_values(['var', 'tau0']).reset_index(drop=True)
+
+
+def read_bpch_var_from_index(folder=None, var='IJ_AVG_S__O3', index=None,
+                             start=None, end=None, rtn_units=False):
+    """
+    Read a single variable from bpch files by seeking to its datablocks
+
+    Parameters
+    ----------
+    folder (str): working directory for data files
+    var (str): variable name (in NetCDF form, e.g. IJ_AVG_S__O3)
+    index (pd.DataFrame): datablock index (from get_bpch_index)
+    start, end (datetime.datetime): only read datablocks from start to end
+    rtn_units (bool): also return the (ctm) units of the variable
+
+    Returns
+    -------
+    (np.array) in the same (time, lon, lat, lev) order as the NetCDF files
+    made by bpch_to_netCDF
+    """
+    import datetime
+    folder = get_folder(folder)
+    if isinstance(index, type(None)):
+        index = get_bpch_index(folder=folder)
+    df = index.loc[index['var'] == var, :]
+    if df.shape[0] == 0:
+        logging.error('{} not found in bpch files in {}'.format(var, folder))
+        raise KeyError('{} not in bpch index'.format(var))
+    ni, nj, nl = [int(i) for i in df[['ni', 'nj', 'nl']].values.max(axis=0)]
+    # Select datablocks in time range (bpch times are hours since 1985)
+    tau_ref = datetime.datetime(1985, 1, 1)
+    if not isinstance(start, type(None)):
+        df = df.loc[df['tau0'] >= (start-tau_ref).total_seconds()/3600., :]
+    if not isinstance(end, type(None)):
+        df = df.loc[df['tau0'] < (end-tau_ref).total_seconds()/3600., :]
+    df = df.sort_values('tau0')
+    arr = np.zeros((df.shape[0], ni, nj, nl), dtype=np.float32)
+    # Read each datablock, opening each bpch file once
+    for bpch_file in df['file'].unique():
+        with open(os.path.join(folder, bpch_file), 'rb') as file_:
+            for n, (ind, row) in enumerate(df.iterrows()):
+                if row['file'] != bpch_file:
+                    continue
+                header = {'offset': int(row['offset']),
+                          'shape': (int(row['ni']), int(row['nj']),
+                                    int(row['nl']))}
+                data = read_bpch_datablock(bpch_file, header, file_=file_)
+                arr[n, :data.shape[0], :data.shape[1], :data.shape[2]] = data
+    # Match the NetCDF files, where surface only fields have no level dim.
+    if nl == 1:
+        arr = arr[..., 0]
+    if rtn_units:
+        return arr, df['unit'].values[0]
+    return arr
+
+
 def get_folder(folder):
     """
     Get name of folder that contains ctm.bpch data from command line
@@ -30,12 +30,14 @@ Multiple_sites = False  # True  # NOTE: this option is not currently working
 
 
 def main(wd, vars=None, npwd=None, GRD_input_3D=False, renumerated=False,
-         verbose=False, debug=False):
+         write_profile=None, verbose=False, debug=False):
     """
     Driver to process planeflight output from GEOS-Chem
 
     NOTES:
     ---
+     - write_profile sets the chunking/compression of the NetCDF files made
+     (map, timeseries or archive - see AC_tools.NetCDF_write_profiles)
      - more details on GEOS-Chem's planeflight diagnostic:
      (http://acmg.seas.harvard.edu/geos/doc/man/chapter_13.html) 
     """
@@ -54,11 +56,13 @@ def main(wd, vars=None, npwd=None, GRD_input_3D=False, renumerated=False,
 
     # Make NetCDF as table of all pf files.  ( check for file first )
     if not os.path.isfile(out_nc):
-        mk_NetCDF_of_pf_files(files, ncfilename=out_nc, debug=debug)
+        mk_NetCDF_of_pf_files(files, ncfilename=out_nc,
+                              write_profile=write_profile, debug=debug)
 
     # If 2D data, make 3D (lon, lat, time) NetCDF file
     if GRD_input_3D:
-        make_3D_NetCDF(ncfilename=out_nc, wd=wd, debug=debug)
+        make_3D_NetCDF(ncfilename=out_nc, wd=wd, write_profile=write_profile,
+                       debug=debug)
 
     # Process multiple sites to "subgrouped" NetCDF file
     # NOTE: this is currently not functioning ... TODO
@@ -86,7 +90,8 @@ def get_pf_files(wd, renumerated=False, debug=False):
     return files
 
 
-def mk_NetCDF_of_pf_files(files, ncfilename=None, debug=False):
+def mk_NetCDF_of_pf_files(files, ncfilename=None, write_profile=None,
+                          debug=False):
     """ 
     Make a table like NetCDF file from to any pf output
     """
@@ -115,7 +120,10 @@ def mk_NetCDF_of_pf_files(files, ncfilename=None, debug=False):
             # loop and create variables for each column  (exc. last )
             if debug:
                 print(vars)
-            [ncfile.createVariable(var, var2type(var), ('POINT'))
+            [ncfile.createVariable(var, var2type(var), ('POINT'),
+                                   **AC.get_NetCDF_write_encoding(
+                                       profile=write_profile, dims=('POINT',),
+                                       shape=(0,), dtype=var2type(var)))
              for var in vars]
 
             # close the file
@@ -191,7 +199,7 @@ def get_site_description_vars(vars):
     return [i for i in vars if (i not in known2D)]
 
 
-def make_3D_NetCDF(ncfilename, wd, debug=False):
+def make_3D_NetCDF(ncfilename, wd, write_profile=None, debug=False):
     """ Create NetCDF of 3D arrays for all variables in 2D NetCDF file
          Takes a table form NetCDF and build 3D arrays from lat and lon
          in the given file.  """
@@ -270,7 +278,13 @@ def make_3D_NetCDF(ncfilename, wd, debug=False):
 
     # --- Loop 3D species and create variables (with set dimensions)
     for var in vars3D:
-        ncfile.createVariable(var, var2type(var), ('time', 'lat', 'lon'), )
+        dims = ('time', 'lat', 'lon')
+        encoding = AC.get_NetCDF_write_encoding(profile=write_profile,
+                                                dims=dims,
+                                                shape=(len(timesteps),
+                                                       len(lats), len(lons)),
+                                                dtype=var2type(var))
+        ncfile.createVariable(var, var2type(var), dims, **encoding)
 
     # close NetCDF
     ncfile.close()